@@ -0,0 +1,97 @@
+"""실시간 tick 처리 시간 측정 (로그 설정별)
+
+1. sync: 이전 main.py 설정. root DEBUG, FileHandler + StreamHandler 를 Qt 스레드에서 직접 쓴다
+2. queue DEBUG: setup_logging(DEBUG). JSON lines 파일 쓰기는 QueueListener 스레드에서 한다
+3. queue INFO: setup_logging(). main.py 기본값. hot path 의 debug 메시지를 만들지 않는다
+콘솔 출력은 측정에서 빼기 위해 os.devnull (sync) / CRITICAL (queue) 로 보낸다.
+
+python -m benchmark.bench_logging
+"""
+import logging
+import os
+import tempfile
+import time
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.common import Fid
+from sns_trade_bot.kiwoom.event import KiwoomEventHandler
+from sns_trade_bot.kiwoom.fake import FakeKiwoomOcx
+from sns_trade_bot.kiwoom.parser import format_real_data
+from sns_trade_bot.kiwoom.request import TrRequester
+from sns_trade_bot.kiwoom.scheduler import TrScheduler
+from sns_trade_bot.log_setup import CONSOLE_FORMAT, setup_logging
+from sns_trade_bot.model.data_manager import DataManager
+
+TICK_COUNT = 50000
+CODE_COUNT = 100
+
+
+def create_handler() -> KiwoomEventHandler:
+    data_manager = DataManager()
+    ocx = FakeKiwoomOcx(data_manager)
+    requester = TrRequester(data_manager, ocx, TrScheduler())
+    handler = KiwoomEventHandler(data_manager, ocx, requester, Mock(), the_single_shot=Mock())
+    for i in range(CODE_COUNT):
+        stock = data_manager.get_stock(f'{100000 + i:06d}')
+        stock.qty = 10
+        stock.buy_price = 10000
+        stock.top_price = 10000
+        stock.add_sell_strategy('sell_stop_loss', {'threshold': -50.0, 'from_top': -50.0})
+    return handler
+
+
+def run_ticks(the_handler: KiwoomEventHandler) -> float:
+    real_data_list = [format_real_data('주식체결', {
+        Fid.체결시간.value: '090001', Fid.현재가.value: f'+{10000 + i % 50 * 10}', Fid.거래량.value: '+1',
+        Fid.누적거래량.value: str(i), Fid.최우선_매도호가.value: '+10010', Fid.최우선_매수호가.value: '+10000'})
+        for i in range(CODE_COUNT)]
+    code_list = [f'{100000 + i:06d}' for i in range(CODE_COUNT)]
+    start = time.perf_counter()
+    for i in range(TICK_COUNT):
+        j = i % CODE_COUNT
+        the_handler.on_receive_real_data(code_list[j], '주식체결', real_data_list[j])
+    return time.perf_counter() - start
+
+
+def reset_root_logger():
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+
+
+def run_sync(the_dir: str) -> float:
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(CONSOLE_FORMAT)
+    file_handler = logging.FileHandler(os.path.join(the_dir, 'sync.log'), 'a', 'utf-8')
+    stream_handler = logging.StreamHandler(open(os.devnull, 'w'))
+    file_handler.setFormatter(formatter)
+    stream_handler.setFormatter(formatter)
+    root_logger.addHandler(file_handler)
+    root_logger.addHandler(stream_handler)
+    handler = create_handler()
+    elapsed = run_ticks(handler)
+    reset_root_logger()
+    return elapsed
+
+
+def run_queue(the_dir: str, the_level: int) -> float:
+    listener = setup_logging(the_level, logging.CRITICAL, the_dir)
+    handler = create_handler()
+    elapsed = run_ticks(handler)
+    listener.stop()
+    reset_root_logger()
+    return elapsed
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as temp_dir:
+        result_list = [
+            ('sync DEBUG (FileHandler)', run_sync(temp_dir)),
+            ('queue DEBUG (JSON lines)', run_queue(temp_dir, logging.DEBUG)),
+            ('queue INFO (hot path guard)', run_queue(temp_dir, logging.INFO)),
+        ]
+    base = result_list[0][1]
+    for name, elapsed in result_list:
+        print(f'{name:30s}: {elapsed / TICK_COUNT * 1e6:6.2f} us/tick, {elapsed / base * 100:5.1f} %')
@@ -0,0 +1,92 @@
+"""my_stock_list.json 저장 / 불러오기 비용. 예전 방식 (indent=4 json 전체 다시 쓰기) 과 snapshot + journal 비교
+
+변경 하나를 잃지 않으려면 예전 방식은 변경마다 파일 전체를 다시 써야 한다. journal 은 바뀐 종목 한 줄만 쓴다.
+python -m benchmark.bench_persistence
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.model.journal import Journal
+from sns_trade_bot.strategy.sell_stop_loss import SellStopLoss
+
+STOCK_COUNT = 10000
+CHANGE_COUNT = 1000
+
+
+def create_data_manager(the_snapshot_path: str) -> DataManager:
+    data_manager = DataManager()
+    data_manager.journal = Journal(the_snapshot_path)
+    data_manager.journal.COMPACT_RECORD_COUNT = CHANGE_COUNT * 10  # 재는 동안 합치지 않는다
+    return data_manager
+
+
+def fill(the_data_manager: DataManager):
+    for i in range(STOCK_COUNT):
+        stock = the_data_manager.get_stock(f'{100000 + i:06d}')
+        stock.name = f'종목{i}'
+        stock.target_qty = i % 100
+        stock.add_buy_strategy('buy_on_closing', {})
+        stock.add_sell_strategy(SellStopLoss.NAME, SellStopLoss.DEFAULT_PARAM)
+
+
+def legacy_save(the_data_manager: DataManager, the_path: str):
+    """예전 DataManager.save()"""
+    f = open(the_path, "w", encoding='utf8')
+    stock_list = [stock.get_dic() for stock in the_data_manager.stock_dic.values()]
+    cond_list = [cond.get_dic() for cond in the_data_manager.cond_dic.values()]
+    data = json.dumps({'stock_list': stock_list, 'cond_list': cond_list}, ensure_ascii=False, indent=4)
+    f.write(data)
+    f.close()
+
+
+def legacy_load(the_data_manager: DataManager, the_path: str):
+    """예전 DataManager.load(). 종목에 적용하는 부분은 같다"""
+    with open(the_path, "r", encoding='utf8') as f:
+        data_dic = json.load(f)
+    for loaded_stock in data_dic['stock_list']:
+        the_data_manager._load_stock(loaded_stock)
+
+
+def measure(the_fn) -> float:
+    start = time.perf_counter()
+    the_fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    logging.disable(logging.ERROR)  # 빈 폴더에서 시작하므로 snapshot 이 없다는 로그는 감춘다
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy_path = os.path.join(temp_dir, 'legacy.json')
+        snapshot_path = os.path.join(temp_dir, 'my_stock_list.json')
+        data_manager = create_data_manager(snapshot_path)
+        data_manager.load()
+        fill(data_manager)
+
+        legacy_save_time = measure(lambda: legacy_save(data_manager, legacy_path))
+        snapshot_time = measure(data_manager.save)
+        print(f'{STOCK_COUNT} stocks. save      legacy: {legacy_save_time * 1e3:7.1f} ms '
+              f'({os.path.getsize(legacy_path) / 1e6:.1f} MB), '
+              f'snapshot (fsync + rename): {snapshot_time * 1e3:7.1f} ms '
+              f'({os.path.getsize(snapshot_path) / 1e6:.1f} MB)')
+
+        stock_list = list(data_manager.stock_dic.values())
+        journal_time = measure(lambda: [setattr(stock_list[i], 'target_qty', 1000 + i) for i in range(CHANGE_COUNT)])
+        print(f'{CHANGE_COUNT} changes. journal: {journal_time / CHANGE_COUNT * 1e6:7.1f} us/change, '
+              f'legacy full rewrite per change: {legacy_save_time * 1e6:9.1f} us/change')
+        data_manager.journal.close()
+
+        legacy_load_time = measure(lambda: legacy_load(DataManager(), legacy_path))
+        loaded = create_data_manager(snapshot_path)
+        save = loaded.save
+        save_time_list = []
+        loaded.save = lambda: save_time_list.append(measure(save))  # 다시 적용한 뒤 합치는 시간은 따로 잰다
+        load_time = measure(loaded.load)
+        assert loaded.stock_dic[stock_list[0].code].target_qty == 1000
+        compact_time = sum(save_time_list)
+        print(f'{STOCK_COUNT} stocks. load      legacy: {legacy_load_time * 1e3:7.1f} ms, '
+              f'snapshot + {CHANGE_COUNT} journal records: {(load_time - compact_time) * 1e3:7.1f} ms '
+              f'(+ compact {compact_time * 1e3:.1f} ms)')
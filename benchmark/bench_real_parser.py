@@ -0,0 +1,55 @@
+"""주식체결 실시간 데이터 읽는 비용 측정 (FID 별 get_comm_real_data 와 RealParser 비교)
+
+FakeKiwoomOcx 의 get_comm_real_data 는 dict 조회라서, 실제 OpenAPI 에서는 호출마다 COM 왕복 비용이 더 든다.
+python -m benchmark.bench_real_parser
+"""
+import time
+
+from sns_trade_bot.kiwoom.common import Fid
+from sns_trade_bot.kiwoom.fake import FakeKiwoomOcx
+from sns_trade_bot.kiwoom.parser import RealParser, format_real_data
+
+TICK_COUNT = 200000
+CODE = '005930'
+REAL_DIC = {
+    Fid.체결시간.value: '090001', Fid.현재가.value: '-37200', Fid.전일대비.value: '-550', Fid.등락율.value: '-1.46',
+    Fid.최우선_매도호가.value: '-37250', Fid.최우선_매수호가.value: '-37200', Fid.거래량.value: '-10',
+    Fid.누적거래량.value: '1531190', Fid.누적거래대금.value: '57330', Fid.시가.value: '+37800',
+    Fid.고가.value: '+37900', Fid.저가.value: '-37100', Fid.체결강도.value: '91.02',
+}
+
+
+def run_get_comm_real_data(the_ocx: FakeKiwoomOcx, the_fid_list) -> float:
+    start = time.perf_counter()
+    for _ in range(TICK_COUNT):
+        value_list = [the_ocx.get_comm_real_data(CODE, fid) for fid in the_fid_list]
+        price = int(value_list[0])
+        price = price if price >= 0 else price * (-1)
+        int(value_list[1])
+        for value in value_list[2:]:
+            int(value)
+    return time.perf_counter() - start
+
+
+def run_parser(the_real_data: str) -> float:
+    parser = RealParser()
+    start = time.perf_counter()
+    for _ in range(TICK_COUNT):
+        parser.parse('주식체결', the_real_data)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    ocx = FakeKiwoomOcx()
+    ocx.cur_real_dic[CODE] = REAL_DIC
+    real_data = format_real_data('주식체결', REAL_DIC)
+
+    fid_list2 = [Fid.현재가.value, Fid.체결시간.value]
+    fid_list6 = fid_list2 + [Fid.거래량.value, Fid.누적거래량.value, Fid.최우선_매도호가.value,
+                             Fid.최우선_매수호가.value]
+    for name, elapsed, call_count in [
+        ('get_comm_real_data x2 (현재가, 체결시간)', run_get_comm_real_data(ocx, fid_list2), 2),
+        ('get_comm_real_data x6 (+거래량, 호가)', run_get_comm_real_data(ocx, fid_list6), 6),
+        ('RealParser.parse (6 fields)', run_parser(real_data), 0),
+    ]:
+        print(f'{name:40s}: {elapsed / TICK_COUNT * 1e6:6.2f} us/tick, COM calls/tick: {call_count}')
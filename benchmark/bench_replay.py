@@ -0,0 +1,42 @@
+"""KiwoomEventHandler 의 실시간 이벤트 처리량 측정 (기록된 세션을 최대 속도로 리플레이)
+
+python -m benchmark.bench_replay
+"""
+import datetime
+import logging
+import random
+import tempfile
+
+from sns_trade_bot.kiwoom.recorder import TickRecorder, get_tick_path
+from sns_trade_bot.kiwoom.replay import ReplayEngine
+
+TICK_COUNT = 100000
+CODE_COUNT = 200
+SESSION_SEC = 6 * 3600 + 30 * 60  # 09:00 ~ 15:30
+
+
+def record_session(the_dir: str) -> str:
+    rand = random.Random(0)
+    start = datetime.datetime(2021, 3, 2, 9, 0, 0)
+    now = [int(start.timestamp() * 1e9)]
+    recorder = TickRecorder(the_dir, 60.0, lambda: now[0])
+    code_list = [f'{100000 + i:06d}' for i in range(CODE_COUNT)]
+    price_list = [rand.randrange(1000, 100000, 10) for _ in range(CODE_COUNT)]
+    for i in range(TICK_COUNT):
+        sec = SESSION_SEC * i // TICK_COUNT
+        now[0] = int((start + datetime.timedelta(seconds=sec)).timestamp() * 1e9) + i
+        j = rand.randrange(CODE_COUNT)
+        price_list[j] = max(10, price_list[j] + rand.choice((-10, 0, 10)))
+        hhmmss = (start + datetime.timedelta(seconds=sec)).strftime('%H%M%S')
+        recorder.record(code_list[j], '주식체결', int(hhmmss), price_list[j], rand.randint(-100, 100))
+    recorder.close()
+    return get_tick_path(the_dir, '20210302')[0]
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tick_path = record_session(temp_dir)
+        stat = ReplayEngine(tick_path).run()
+    print(f'{TICK_COUNT} ticks, {CODE_COUNT} codes')
+    print(stat)
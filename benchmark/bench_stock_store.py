@@ -0,0 +1,61 @@
+"""StockStore 컬럼으로 바꾼 뒤의 체결 쓰기 비용과 전체 종목 계산 비용 측정
+
+전체 종목 계산은 Stock 객체를 도는 예전 방식과 StockStore array 연산을 비교한다.
+python -m benchmark.bench_stock_store
+"""
+import random
+import time
+
+from sns_trade_bot.model.data_manager import DataManager, HoldType
+
+TICK_COUNT = 200000
+REPEAT_COUNT = 200
+
+
+def create_data_manager(the_count: int) -> DataManager:
+    rand = random.Random(0)
+    data_manager = DataManager()
+    data_manager.change_tracker.single_shot = lambda msec, fn: None  # 실행 중처럼 변경을 모아두기만 한다
+    for i in range(the_count):
+        stock = data_manager.get_stock(f'{100000 + i:06d}')
+        stock.cur_price = rand.randrange(1000, 100000, 10)
+        if i % 2 == 0:
+            stock.qty = rand.randrange(1, 100)
+            stock.buy_price = stock.cur_price
+    return data_manager
+
+
+def run_tick(the_data_manager: DataManager) -> float:
+    stock_list = list(the_data_manager.stock_dic.values())
+    start = time.perf_counter()
+    for i in range(TICK_COUNT):
+        stock = stock_list[i % len(stock_list)]
+        stock.update_price(1000 + i % 100)
+    return time.perf_counter() - start
+
+
+def run_object_loop(the_data_manager: DataManager) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT_COUNT):
+        [stock.code for stock in the_data_manager.stock_dic.values() if stock.qty > 0]
+        sum(stock.cur_price * stock.qty for stock in the_data_manager.stock_dic.values() if stock.qty > 0)
+    return time.perf_counter() - start
+
+
+def run_vector(the_data_manager: DataManager) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT_COUNT):
+        the_data_manager.get_code_list(HoldType.HOLDING)
+        the_data_manager.get_portfolio_summary()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    data_manager = create_data_manager(100)
+    print(f'tick (Stock.update_price): {run_tick(data_manager) / TICK_COUNT * 1e6:6.2f} us/tick')
+    for count in (50, 500, 5000):
+        data_manager = create_data_manager(count)
+        object_time = run_object_loop(data_manager) / REPEAT_COUNT * 1e6
+        vector_time = run_vector(data_manager) / REPEAT_COUNT * 1e6
+        print(f'{count:5d} stocks. holding codes + eval amount. object loop: {object_time:8.1f} us, '
+              f'StockStore: {vector_time:8.1f} us')
@@ -0,0 +1,72 @@
+"""SellStopLoss 검사 비용. 체결마다 on_price_updated() 를 부르는 경우와 StopLossBatch.evaluate() 비교
+
+보유 종목마다 체결이 한 건씩 온 한 바퀴를 검사하는 시간. 기준을 넘는 종목은 없도록 가격을 움직인다.
+python -m benchmark.bench_stop_loss
+"""
+import logging
+import random
+import time
+
+import numpy as np
+
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.model.stock import Stock
+from sns_trade_bot.strategy.sell_stop_loss import SellStopLoss
+from sns_trade_bot.strategy.stop_loss_batch import StopLossBatch
+
+ROUND_COUNT = 200
+POSITION_COUNT_LIST = [50, 500, 5000]
+
+
+def create_data_manager(the_count: int) -> DataManager:
+    rand = random.Random(0)
+    data_manager = DataManager()
+    data_manager.change_tracker.single_shot = lambda msec, fn: None  # 실행 중처럼 변경을 모아두기만 한다
+    for i in range(the_count):
+        stock = data_manager.get_stock(f'{100000 + i:06d}')
+        stock.buy_price = rand.randrange(1000, 100000, 10)
+        stock.qty = rand.randrange(1, 100)
+        stock.update_price(stock.buy_price)
+        stock.add_sell_strategy(SellStopLoss.NAME, SellStopLoss.DEFAULT_PARAM)
+    return data_manager
+
+
+def run_per_tick(the_data_manager: DataManager) -> float:
+    """update_price() 를 포함한다 (batch 중에도 하는 일이지만 on_price_updated() 와 나누어 재기 어렵다)"""
+    stock_list = list(the_data_manager.stock_dic.values())
+    strategy_list = [stock.sell_strategy_dic[SellStopLoss.NAME] for stock in stock_list]
+    price_list = [stock.buy_price for stock in stock_list]
+    start = time.perf_counter()
+    for i in range(ROUND_COUNT):
+        for stock, strategy, price in zip(stock_list, strategy_list, price_list):
+            stock.update_price(price + i % 2)
+            strategy.on_price_updated()
+    return time.perf_counter() - start
+
+
+def run_batch(the_data_manager: DataManager) -> float:
+    """체결의 가격 쓰기는 batch 여부와 상관없이 하므로 evaluate() 만 잰다"""
+    store = the_data_manager.stock_store
+    batch = StopLossBatch(store, the_data_manager.strategy_index)
+    row_array = np.array([stock.row for stock in the_data_manager.stock_dic.values()])
+    price_array = store.buy_price[row_array].copy()
+    elapsed = 0.0
+    for i in range(ROUND_COUNT):
+        store.cur_price[row_array] = price_array + i % 2
+        store.update_earning_rate(Stock.COMMISSION_FACTOR)
+        start = time.perf_counter()
+        hit_list = batch.evaluate()
+        elapsed += time.perf_counter() - start
+        assert not hit_list
+    return elapsed
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    for count in POSITION_COUNT_LIST:
+        data_manager = create_data_manager(count)
+        per_tick_time = run_per_tick(data_manager) / ROUND_COUNT
+        batch_time = run_batch(data_manager) / ROUND_COUNT
+        print(f'{count:5d} positions. per tick: {per_tick_time * 1e6:8.1f} us/round '
+              f'({count / per_tick_time / 1e6:5.2f} M positions/s), '
+              f'batch: {batch_time * 1e6:7.1f} us/round ({count / batch_time / 1e6:6.2f} M positions/s)')
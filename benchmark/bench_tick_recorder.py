@@ -0,0 +1,65 @@
+"""실시간 tick 하나를 기록하는 비용 측정 (TickRecorder.record 와 debug 로그 한 줄 비교)
+
+python -m benchmark.bench_tick_recorder
+"""
+import logging
+import os
+import tempfile
+import time
+
+from sns_trade_bot.kiwoom.recorder import TickRecorder, load_ticks
+
+TICK_COUNT = 200000
+CODE_COUNT = 500
+
+
+def run_recorder(the_dir: str) -> float:
+    recorder = TickRecorder(the_dir)
+    code_list = [f'{i:06d}' for i in range(CODE_COUNT)]
+    start = time.perf_counter()
+    for i in range(TICK_COUNT):
+        recorder.record(code_list[i % CODE_COUNT], '주식체결', 90000 + i % 60, 10000 + i % 100, 1)
+    elapsed = time.perf_counter() - start
+    recorder.close()
+    return elapsed
+
+
+def run_log(the_dir: str) -> float:
+    file_logger = logging.getLogger('bench_tick_log')
+    file_logger.propagate = False
+    file_logger.setLevel(logging.DEBUG)
+    handler = logging.FileHandler(os.path.join(the_dir, 'tick.log'), 'a', 'utf-8')
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s'))
+    file_logger.addHandler(handler)
+    start = time.perf_counter()
+    for i in range(TICK_COUNT):
+        real_data = f'{90000 + i % 60}\t+{10000 + i % 100}\t1'
+        file_logger.debug(f'code:"{i % CODE_COUNT:06d}", real_type:"주식체결", real_data:"{real_data}"')
+    elapsed = time.perf_counter() - start
+    handler.close()
+    return elapsed
+
+
+def run_load(the_dir: str) -> float:
+    file_name = [name for name in os.listdir(the_dir) if name.endswith('.tick')][0]
+    start = time.perf_counter()
+    tick_array, code_list = load_ticks(os.path.join(the_dir, file_name))
+    volume = int(tick_array['volume'].sum())
+    elapsed = time.perf_counter() - start
+    assert volume == TICK_COUNT
+    return elapsed
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as temp_dir:
+        recorder_time = run_recorder(temp_dir)
+        log_time = run_log(temp_dir)
+        load_time = run_load(temp_dir)
+        tick_size = sum(os.path.getsize(os.path.join(temp_dir, name)) for name in os.listdir(temp_dir)
+                        if name.endswith('.tick'))
+        log_size = os.path.getsize(os.path.join(temp_dir, 'tick.log'))
+    print(f'{TICK_COUNT} ticks, {CODE_COUNT} codes')
+    print(f'{"TickRecorder.record":>20}: {recorder_time / TICK_COUNT * 1e6:6.2f} us/tick, {tick_size / 1e6:6.1f} MB')
+    print(f'{"logger.debug":>20}: {log_time / TICK_COUNT * 1e6:6.2f} us/tick, {log_size / 1e6:6.1f} MB')
+    print(f'{"load_ticks + sum":>20}: {load_time * 1000:6.2f} ms')
@@ -0,0 +1,91 @@
+"""tick 에서 send_order 까지 걸리는 시간 측정 (TR 큐가 조회/slack 작업으로 가득 찬 상황)
+
+python -m benchmark.bench_tr_queue
+"""
+import queue
+import statistics
+import threading
+import time
+
+from sns_trade_bot.kiwoom.common import Job, JobType, JobPriority
+from sns_trade_bot.kiwoom.scheduler import TrScheduler
+
+SLACK_POST_TIME = 0.05  # slack webhook 1회 왕복
+QUERY_TIME = 0.002  # comm_rq_data 호출
+MSG_COUNT = 20
+QUERY_COUNT = 10
+TRIAL_COUNT = 5
+
+
+def slack_post():
+    time.sleep(SLACK_POST_TIME)
+
+
+def comm_rq_data():
+    time.sleep(QUERY_TIME)
+    return 0
+
+
+def run_legacy() -> float:
+    """기존 Kiwoom.worker_run: FIFO queue.Queue + 작업마다 0.2초 sleep"""
+    tr_queue = queue.Queue()
+    done = threading.Event()
+    sent_time = []
+
+    def send_order():
+        sent_time.append(time.perf_counter())
+        done.set()
+        return 0
+
+    def worker_run():
+        while True:
+            job = tr_queue.get()
+            job()
+            time.sleep(0.2)
+            tr_queue.task_done()
+
+    threading.Thread(target=worker_run, daemon=True).start()
+    for _ in range(QUERY_COUNT):
+        tr_queue.put(Job(comm_rq_data))
+    for _ in range(MSG_COUNT):
+        tr_queue.put(Job(slack_post))
+    tick_time = time.perf_counter()
+    tr_queue.put(Job(send_order))
+    done.wait()
+    return sent_time[0] - tick_time
+
+
+def run_scheduler(use_priority: bool) -> float:
+    scheduler = TrScheduler()
+    done = threading.Event()
+    sent_time = []
+
+    def send_order():
+        sent_time.append(time.perf_counter())
+        done.set()
+        return 0
+
+    # use_priority=False 이면 모든 작업을 같은 lane 에 넣어 FIFO 로 처리
+    msg_priority = JobPriority.NOTIFICATION if use_priority else JobPriority.QUERY
+    order_priority = JobPriority.ORDER if use_priority else JobPriority.QUERY
+    threading.Thread(target=scheduler.run, daemon=True).start()
+    for _ in range(QUERY_COUNT):
+        scheduler.put(Job(comm_rq_data, job_type=JobType.QUERY))
+    for _ in range(MSG_COUNT):
+        scheduler.put(Job(slack_post, priority=msg_priority))
+    tick_time = time.perf_counter()
+    scheduler.put(Job(send_order, job_type=JobType.ORDER, priority=order_priority))
+    done.wait()
+    return sent_time[0] - tick_time
+
+
+def report(name, latency_list):
+    print(f'{name:>20}: median {statistics.median(latency_list) * 1000:9.2f} ms, '
+          f'max {max(latency_list) * 1000:9.2f} ms ({len(latency_list)} trials)')
+
+
+if __name__ == '__main__':
+    print(f'flood: {QUERY_COUNT} queries + {MSG_COUNT} slack posts ({SLACK_POST_TIME * 1000:.0f} ms each)')
+    report('legacy (sleep 0.2s)', [run_legacy()])
+    report('fifo scheduler', [run_scheduler(False) for _ in range(TRIAL_COUNT)])
+    report('priority scheduler', [run_scheduler(True) for _ in range(TRIAL_COUNT)])
@@ -1,11 +1,54 @@
 import enum
+from concurrent.futures import Future
+from typing import Optional
+
+
+class JobType(enum.Enum):
+    NONE = 0  # OpenAPI 조회 제한과 무관한 작업 (로그인, slack 메시지 등)
+    QUERY = 1  # 조회 TR (comm_rq_data, comm_kw_rq_data)
+    ORDER = 2  # 주문 (send_order)
+    CONDITION = 3  # 조건검색 (send_condition)
+
+
+class JobPriority(enum.IntEnum):  # 값이 작을수록 먼저 처리
+    ORDER = 0  # 주문
+    QUERY = 1  # 조회 TR, 조건검색
+    NOTIFICATION = 2  # slack 메시지 등
+
+
+DEFAULT_PRIORITY_DIC = {
+    JobType.NONE: JobPriority.QUERY,
+    JobType.QUERY: JobPriority.QUERY,
+    JobType.ORDER: JobPriority.ORDER,
+    JobType.CONDITION: JobPriority.QUERY,
+}
+
+
+class ErrCode(enum.IntEnum):
+    OP_ERR_NONE = 0  # 정상처리
+    OP_ERR_SISE_OVERFLOW = -200  # 과도한 시세조회로 인한 통신불가
+    OP_ERR_RQ_STRUCT_FAIL = -201  # 입력 구조체 생성 실패
+    OP_ERR_RQ_STRING_FAIL = -202  # 요청전문 작성 실패
+    OP_ERR_ORD_OVERFLOW = -308  # 주문전송 과부하
 
 
 class Job:
-    def __init__(self, fn, *args, **kwargs):
+    def __init__(self, fn, *args, job_type: JobType = JobType.NONE, priority: JobPriority = None, key=None,
+                 merge=None, **kwargs):
+        """
+        :param key: 같은 key 의 작업이 아직 큐에 있으면 새로 넣지 않고 기존 작업에 합친다 (TR 코드 + 입력값)
+        :param merge: merge(pending_job, new_job). 기존 작업에 새 작업의 입력을 합칠 때 사용 (None 이면 그대로 둠)
+        """
         self.fn = fn
         self.args = args
         self.kwargs = kwargs
+        self.job_type = job_type
+        self.priority = DEFAULT_PRIORITY_DIC[job_type] if priority is None else priority
+        self.key = key
+        self.merge = merge
+        self.future = Future()  # 작업 반환값 (OpenAPI 호출 결과) 으로 완료됨
+        self.put_time: float = 0.0  # 큐에 들어간 시각 (scheduler 가 기록)
+        self.retry_count: int = 0
 
     def __call__(self):
         return self.fn(*self.args, **self.kwargs)
@@ -23,6 +66,13 @@ class ScnNo(enum.Enum):
     당일손익상세요청 = '7777'
 
 
+# 관심종목정보요청(OPTKWFID) 을 나눠 보낼 화면번호 목록 (3333 ~ 3342)
+INTEREST_SCN_NO_LIST = [str(int(ScnNo.INTEREST.value) + i) for i in range(10)]
+MAX_KW_CODE_COUNT = 100  # CommKwRqData() 한 번에 조회할 수 있는 최대 종목 수
+# 실시간 등록에 사용할 화면번호 목록 (2222 ~ 2271)
+REAL_SCN_NO_LIST = [str(int(ScnNo.REAL.value) + i) for i in range(50)]
+
+
 class RqName(enum.Enum):
     INTEREST_CODE = 'RQ_MULTI_CODE_QUERY'  # 관심종목정보요청 (OPTKWFID)
     BALANCE = 'RQ_BALANCE'  # 계좌평가현황요청 (OPW00004)
@@ -31,7 +81,23 @@ class RqName(enum.Enum):
     당일손익상세요청 = 'RQ_TODAY'
 
 
+def get_order_rq_name(the_order_key: int) -> str:
+    """주문마다 다른 rq_name 을 써서 TR 응답의 주문번호를 OrderBook 의 주문에 붙인다. 'RQ_ORDER_12'"""
+    return f'{RqName.ORDER.value}_{the_order_key}'
+
+
+def get_order_key(the_rq_name: str) -> Optional[int]:
+    """get_order_rq_name() 의 반대. 주문 rq_name 이 아니거나 key 가 없으면 None"""
+    prefix = RqName.ORDER.value + '_'
+    if not the_rq_name.startswith(prefix) or not the_rq_name[len(prefix):].isdigit():
+        return None
+    return int(the_rq_name[len(prefix):])
+
+
 class TrCode(enum.Enum):
+    관심종목정보요청 = 'OPTKWFID'
+    계좌평가현황요청 = 'OPW00004'
+    주식기본정보요청 = 'opt10001'
     당일손익상세요청 = 'opt10077'
 
 
@@ -54,6 +120,8 @@ class Fid(enum.IntEnum):
     체결가 = 910
     체결량 = 911
     현재가 = 10
+    거래량 = 15  # 체결량. +: 매수체결, -: 매도체결
+    누적거래량 = 13
     최우선_매도호가 = 27
     최우선_매수호가 = 28
     단위체결가 = 914
@@ -83,6 +151,26 @@ class Fid(enum.IntEnum):
     상한가 = 305
     하한가 = 306
 
+    # 주식체결
+    전일대비 = 11
+    등락율 = 12
+    누적거래대금 = 14
+    시가 = 16
+    고가 = 17
+    저가 = 18
+    전일대비기호 = 25
+    전일거래량대비 = 26
+    거래대금증감 = 29
+    전일거래량대비_비율 = 30
+    거래회전율 = 31
+    거래비용 = 32
+    체결강도 = 228
+    시가총액_억 = 311
+    장구분 = 290
+    KO접근도 = 691
+    상한가발생시간 = 567
+    하한가발생시간 = 568
+
     # 장시작시간
     장운영구분 = 215
     체결시간 = 20
@@ -1,6 +1,6 @@
 import logging
 import sys
-from typing import List
+from typing import Optional, TYPE_CHECKING
 
 from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
@@ -8,22 +8,76 @@ from PyQt5.QtWidgets import QApplication
 from sns_trade_bot.model.data_manager import DataManager, DataType, HoldType
 from sns_trade_bot.model.stock import Stock
 from sns_trade_bot.model.condition import Condition, SignalType
-from sns_trade_bot.kiwoom.common import Job, ScnNo, RqName, EventHandler, TrResultKey, Fid, TrCode
-from sns_trade_bot.kiwoom.internal import KiwoomOcx
+from sns_trade_bot.model.order import OrderSide
+from sns_trade_bot.kiwoom.common import ScnNo, RqName, EventHandler, TrResultKey, Fid, get_order_key
+from sns_trade_bot.kiwoom.request import TrRequester
+from sns_trade_bot.kiwoom.pager import TrPager
+from sns_trade_bot.kiwoom.invoker import MainThreadInvoker
+from sns_trade_bot.kiwoom.parser import ChejanRecord, RealParser
+from sns_trade_bot.kiwoom.subscription import SubscriptionManager
+from sns_trade_bot.kiwoom.recorder import TickRecorder
+from sns_trade_bot.kiwoom.session import SessionScheduler, get_sec_of_day
+from sns_trade_bot.strategy.stop_loss_batch import StopLossBatch
+
+if TYPE_CHECKING:  # QAxContainer 가 없는 환경에서도 FakeKiwoomOcx 로 쓸 수 있도록
+    from sns_trade_bot.kiwoom.internal import KiwoomOcx
 
 logger = logging.getLogger(__name__)
 
 
 class KiwoomEventHandler(EventHandler):
     data_manager: DataManager
-    ocx: KiwoomOcx
-
-    def __init__(self, the_data_manager, the_ocx, the_tr_queue, the_on_connect):
+    ocx: 'KiwoomOcx'
+
+    # (이벤트 이름, 장 시각, 메소드 이름). 전략의 on_time() 은 TARGET_TIME 별로 따로 등록된다
+    SESSION_EVENT_LIST = [
+        ('account_before_open', '084001', '_request_account_detail'),  # 장시작 20분전
+        ('slack_before_open', '084010', '_send_account_to_slack'),
+        ('real_subscription', '085000', '_start_subscription'),  # 장시작 10분전. 실시간 등록 시작
+        ('account_before_close', '152100', '_request_account_detail'),
+        ('buy_on_closing_cond', '152200', '_check_buy_on_closing_cond'),
+        ('interest_price', '152300', '_request_interest_price'),
+        ('today_earning', '153200', '_request_today_earning'),  # 장마감 후
+        ('account_after_close', '153220', '_request_account_detail'),
+        ('slack_after_close', '153240', '_send_account_to_slack'),
+        ('arrange_strategy', '153300', 'arrange_strategy'),  # 전략 정리 후 save
+        ('exit', '153400', '_exit'),
+    ]
+
+    def __init__(self, the_data_manager, the_ocx, the_requester, the_on_connect, the_recorder=None,
+                 the_single_shot=None, the_clock=get_sec_of_day):
+        """
+        :param the_recorder: 실시간 / 체결 / 조건검색 이벤트를 기록할 TickRecorder
+        :param the_single_shot: single_shot(msec, fn). None 이면 QTimer.singleShot. 리플레이에서는 가상 시계 기준 타이머
+        :param the_clock: 세션 이벤트에 쓸 시계 (0 시부터의 초)
+        """
         self.data_manager = the_data_manager
         self.ocx = the_ocx
-        self.tr_queue = the_tr_queue
+        self.requester: TrRequester = the_requester
+        self.pager = TrPager(the_ocx)
+        self.pager.register(RqName.BALANCE.value, self.requester.account_detail)
+        self.pager.register(RqName.당일손익상세요청.value, self.requester.today_earning)
+        self.today_earning_single_dic = {}  # 당일손익상세요청 페이지를 모아서 slack 메시지 하나로 보낸다
+        self.today_earning_multi_dic = {}
+        self.real_parser = RealParser()
+        self.subscription = SubscriptionManager(the_data_manager, the_ocx)
+        self.data_manager.add_listener(self.subscription)
         self.on_connect_callback = the_on_connect
-        self.is_closing_called: bool = False
+        self.recorder: Optional[TickRecorder] = the_recorder
+        self.single_shot = the_single_shot if the_single_shot is not None else QTimer.singleShot
+        self.invoker = MainThreadInvoker()  # TR 스레드의 콜백을 Qt 스레드에서 실행
+        self.session = SessionScheduler(self.single_shot, the_clock)
+        self.data_manager.signal_arbiter.single_shot = self.single_shot  # 한 이벤트에서 나온 신호를 모아서 주문
+        self.data_manager.change_tracker.single_shot = self.single_shot  # 변경 알림도 한 차례에 한 번
+        self.data_manager.change_tracker.post = self.invoker.call  # TR 스레드에서 바뀌면 Qt 스레드에서 타이머를 건다
+        self.requester.post = self.invoker.call  # TR 요청 실패 처리도 Qt 스레드에서
+        for name, time_str, method_name in self.SESSION_EVENT_LIST:
+            self.session.add(name, time_str, getattr(self, method_name))
+        strategy_index = self.data_manager.strategy_index
+        self.stop_loss_batch = StopLossBatch(self.data_manager.stock_store, strategy_index)
+        strategy_index.time_listener = self._add_strategy_time
+        for time_str in strategy_index.get_time_list():
+            self._add_strategy_time(time_str)
 
     def on_event_connect(self, err_code):
         if err_code == 0:
@@ -34,6 +88,8 @@ class KiwoomEventHandler(EventHandler):
             logger.info("account_list: %s", account_list)
             self.data_manager.set_account_list(account_list)
 
+            self.session.start()
+
             # Let manager know
             self.on_connect_callback()
         else:
@@ -41,10 +97,11 @@ class KiwoomEventHandler(EventHandler):
 
     def on_receive_tr_data(self, screen_no: str, rq_name: str, tr_code: str, record_name: str, pre_next: str, unused1,
                            unused2, unused3, unused4):
-        logger.debug(
-            f'screen_no:"{screen_no}", rq_name:"{rq_name}", tr_code:"{tr_code}", record_name:"{record_name}", '
-            f'pre_next:"{pre_next}", unused1:"{unused1}", unused2:"{unused2}", unused3:"{unused3}", '
-            f'unused4:"{unused4}"')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f'screen_no:"{screen_no}", rq_name:"{rq_name}", tr_code:"{tr_code}", record_name:"{record_name}", '
+                f'pre_next:"{pre_next}", unused1:"{unused1}", unused2:"{unused2}", unused3:"{unused3}", '
+                f'unused4:"{unused4}"')
 
         if rq_name == RqName.INTEREST_CODE.value:
             count = self.ocx.get_repeat_cnt(tr_code, '관심종목정보')
@@ -59,8 +116,9 @@ class KiwoomEventHandler(EventHandler):
                 stock.name = name
                 stock.cur_price = price
                 logger.info(f'{name}({code}) price:"{price}"')
-            self.ocx.disconnect_real_data(ScnNo.INTEREST.value)
-            self.data_manager.set_updated(DataType.TABLE_BALANCE)
+            self.ocx.disconnect_real_data(screen_no)
+            if self.requester.on_interest_chunk_received():  # 마지막 chunk 를 받았을 때 한 번만 갱신
+                self.data_manager.set_updated(DataType.TABLE_BALANCE)
         elif rq_name == RqName.BALANCE.value:
             self.print_tr_data(tr_code, record_name, 0, TrResultKey.BALANCE_SINGLE)
             account_name = self.ocx.get_comm_data(tr_code, record_name, 0, '계좌명')
@@ -74,22 +132,18 @@ class KiwoomEventHandler(EventHandler):
             cash2 = int(cash2_str)
             buy_total = int(buy_total_str)
             print_count = int(print_count_str)
-            count = self.ocx.get_repeat_cnt(tr_code, '종목별계좌평가현황')
             logger.info(f'account_name:"{account_name}", cur_balance:{cur_balance}, cash:{cash}, cash2:{cash2}, '
-                        f'buy_total:{buy_total}, print_count:{print_count}, count:{count}')
-            for i in range(count):
-                self.print_tr_data(tr_code, record_name, i, TrResultKey.BALANCE_MULTI)
-                code_raw = self.ocx.get_comm_data(tr_code, record_name, i, '종목코드')  # A096530
-                name = self.ocx.get_comm_data(tr_code, record_name, i, '종목명')  # 씨젠
-                qty_str = self.ocx.get_comm_data(tr_code, record_name, i, '보유수량')  # 000000000010
-                buy_price_str = self.ocx.get_comm_data(tr_code, record_name, i, '평균단가')  # 000000037650
-                cur_price_str = self.ocx.get_comm_data(tr_code, record_name, i, '현재가')  # 000000037200
-                earning_rate_str = self.ocx.get_comm_data(tr_code, record_name, i, '손익율')  # -00000014688
-                code = code_raw[1:]  # Remove 'A'
-                qty = int(qty_str)
-                buy_price = int(buy_price_str)
-                cur_price = int(cur_price_str)
-                earning_rate = float(earning_rate_str) / 10000
+                        f'buy_total:{buy_total}, print_count:{print_count}, page:{self.pager.get_page(rq_name)}')
+            # 현재 페이지를 모두 읽은 뒤 다음 페이지를 요청한다
+            for row in self.pager.on_page(rq_name, tr_code, record_name, pre_next):
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f'  {row}')
+                code = row['종목코드'][1:]  # A096530. Remove 'A'
+                name = row['종목명']  # 씨젠
+                qty = int(row['보유수량'])  # 000000000010
+                buy_price = int(row['평균단가'])  # 000000037650
+                cur_price = int(row['현재가'])  # 000000037200
+                earning_rate = float(row['손익율']) / 10000  # -00000014688
                 logger.info(f'{name}({code}) qty:{qty}, buy_price:{buy_price}, cur_price:{cur_price}, '
                             f'earning_rate:{earning_rate}')
                 stock = self.data_manager.get_stock(code)
@@ -98,7 +152,8 @@ class KiwoomEventHandler(EventHandler):
                 stock.qty = qty
                 stock.buy_price = buy_price
                 stock.earning_rate = earning_rate
-            self.data_manager.set_updated(DataType.TABLE_BALANCE)
+            if self.pager.is_last_page(rq_name):
+                self.data_manager.set_updated(DataType.TABLE_BALANCE)
         elif rq_name == RqName.CODE_INFO.value:
             self.print_tr_data(tr_code, record_name, 0, TrResultKey.CODE_SINGLE)
             code = self.ocx.get_comm_data(tr_code, record_name, 0, '종목코드').strip()
@@ -114,114 +169,77 @@ class KiwoomEventHandler(EventHandler):
                 self.data_manager.set_updated(DataType.TABLE_BALANCE)
             else:
                 logger.error("error!!")
-        elif rq_name == RqName.ORDER.value:
+        elif rq_name.startswith(RqName.ORDER.value):
             order_id = self.ocx.get_comm_data(tr_code, record_name, 0, '주문번호').strip()
             logger.info(f'order_id:"{order_id}"')
-            # TODO: Handle error case (empty order_id)
+            order_key = get_order_key(rq_name)
+            if order_key is not None:
+                self.data_manager.order_book.set_order_id(order_key, order_id)  # 빈 주문번호면 주문 실패
+            elif not order_id:
+                logger.error(f'order failed. rq_name:"{rq_name}"')
         elif rq_name == RqName.당일손익상세요청.value:
-            single_dic = {}
+            page = self.pager.get_page(rq_name)
             self.print_tr_data(tr_code, record_name, 0, TrResultKey.TODAY_SINGLE)
             당일실현손익_str: str = self.ocx.get_comm_data(tr_code, record_name, 0, '당일실현손익').strip()
-            single_dic['당일실현손익'] = 당일실현손익_str
-            count = self.ocx.get_repeat_cnt(tr_code, '당일실현손익상세')
-            logger.info(f'당일실현손익:"{당일실현손익_str}",  count:{count}')
-            multi_dic = {}
-            for i in range(count):
-                self.print_tr_data(tr_code, record_name, i, TrResultKey.TODAY_MULTI)
-                name = self.ocx.get_comm_data(tr_code, record_name, i, '종목명')
-                code = self.ocx.get_comm_data(tr_code, record_name, i, '종목코드')
-                cur_dic = {
-                    '매입단가': self.ocx.get_comm_data(tr_code, record_name, i, '매입단가'),
-                    '체결가': self.ocx.get_comm_data(tr_code, record_name, i, '체결가'),
-                    '체결량': self.ocx.get_comm_data(tr_code, record_name, i, '체결량'),
-                    '당일매도손익': self.ocx.get_comm_data(tr_code, record_name, i, '당일매도손익'),
-                    '손익율': self.ocx.get_comm_data(tr_code, record_name, i, '손익율')
+            logger.info(f'당일실현손익:"{당일실현손익_str}", page:{page}')
+            if page == 0:
+                self.today_earning_single_dic = {'당일실현손익': 당일실현손익_str}
+                self.today_earning_multi_dic = {}
+            multi_dic = self.today_earning_multi_dic  # 페이지를 모아서 마지막 페이지에서 한 번 보낸다
+            for row in self.pager.on_page(rq_name, tr_code, record_name, pre_next):
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f'  {row}')
+                multi_dic[f'{row["종목명"]}({row["종목코드"]})'] = {
+                    '매입단가': row['매입단가'],
+                    '체결가': row['체결가'],
+                    '체결량': row['체결량'],
+                    '당일매도손익': row['당일매도손익'],
+                    '손익율': row['손익율']
                 }
-                multi_dic[f'{name}({code})'] = cur_dic
-            from sns_trade_bot.slack.webhook import MsgSender
-            send_today_job = Job(MsgSender.send_multi_dic_msg, single_dic, multi_dic)
-            self.tr_queue.put(send_today_job)
+            if self.pager.is_last_page(rq_name):
+                if page:
+                    self.today_earning_single_dic['page_count'] = page + 1
+                from sns_trade_bot.slack.webhook import MsgSender
+                MsgSender.send_multi_dic_msg(self.today_earning_single_dic, multi_dic)
+                self.today_earning_multi_dic = {}
 
     def on_receive_real_data(self, code: str, real_type: str, real_data: str):
-        logger.debug(f'code:"{code}", real_type:"{real_type}", real_data:"{real_data}"')
+        if logger.isEnabledFor(logging.DEBUG):  # 실시간 이벤트마다 메시지를 만들지 않도록
+            logger.debug(f'code:"{code}", real_type:"{real_type}", real_data:"{real_data}"')
         if real_type == '장시작시간':
-            cur_time_str = self.ocx.get_comm_real_data(code, 20)
-            if cur_time_str == '084000':
-                logger.info("장시작시간 20분전. 1초 후 계좌정보 확인")
-                QTimer().singleShot(1000, self._request_account_detail)  # ms 후에 함수 실행
-                logger.info("장시작시간 20분전. 10초 후 slack 메시지 발송")
-                QTimer().singleShot(10000, self._send_account_to_slack)
-
-            elif cur_time_str == '085000':
-                logger.info("장시작시간 10분전. set_real_reg")
-                target_code_list = self.data_manager.get_code_list(HoldType.TARGET)
-                self._set_real_reg(target_code_list)
-
-            elif cur_time_str == '085900':
-                for stock in self.data_manager.stock_dic.values():
-                    if stock.remained_buy_qty == 0:
-                        for strategy in stock.buy_strategy_dic.values():
-                            if strategy.enabled:
-                                strategy.on_time(cur_time_str)
-
-            elif cur_time_str == '152100':
-                self._request_account_detail()
-
-            elif cur_time_str == '152200':
-                self._check_buy_on_closing_cond()
-
-            elif cur_time_str == '152300':
-                self._request_multi_code_info()
-
-            elif cur_time_str == "152800":  # 15시 28분.
-                for stock in self.data_manager.stock_dic.values():
-                    if stock.remained_buy_qty == 0:
-                        for strategy in stock.buy_strategy_dic.values():
-                            if strategy.enabled:
-                                strategy.on_time(cur_time_str)
-
-            elif cur_time_str == '152900':
-                logger.info("장마감시간 1분전. 180초 후 계좌정보 확인")
-                QTimer().singleShot(180000, self._request_today_earning)
-                logger.info("장마감시간 1분전. 200초 후 계좌정보 확인")
-                QTimer().singleShot(200000, self._request_account_detail)
-                logger.info("장마감시간 1분전. 220초 후 slack 메시지 발송")
-                QTimer().singleShot(220000, self._send_account_to_slack)
-                logger.info("장마감시간 1분전. 240초 후 전략 정리 후 save")
-                QTimer().singleShot(240000, self.arrange_strategy)
-                logger.info("장마감시간 1분전. 300초 후 프로그램 종료")
-                QTimer().singleShot(300000, self._exit)
+            market_time = self._parse_real_data(code, real_type, real_data)
+            if self.recorder is not None:
+                self.recorder.record(code, real_type, market_time.time, market_time.market_type,
+                                     market_time.remained_time)
+            if market_time.time:  # 빈 값이면 0 이 된다. 그 값으로 시계를 맞추지 않는다
+                self.session.sync(f'{market_time.time:06d}')
+            self.session.poll()
 
         elif real_type == '주식체결':
-            price_str = self.ocx.get_comm_real_data(code, Fid.현재가.value)
-            cur_price = int(price_str)
-            cur_price = cur_price if cur_price >= 0 else cur_price * (-1)
-
-            stock = self.data_manager.get_stock(code)
-            stock.cur_price = cur_price
-            stock.update_earning_rate()
+            tick = self._parse_real_data(code, real_type, real_data)
+            if self.recorder is not None:
+                self.recorder.record(code, real_type, tick.time, tick.price, tick.volume)
 
+            stock = self.data_manager.stock_dic.get(code)
+            if stock is None:  # 관리하지 않는 종목. Stock 을 새로 만들지 않는다
+                return
+            stock.update_price(tick.price)
+            stop_loss_batch = self.stop_loss_batch
+            stop_loss_batch.tick_count += 1
+            if not stop_loss_batch.is_armed:  # 체결이 오는 동안만 타이머를 건다
+                stop_loss_batch.is_armed = True
+                self.single_shot(StopLossBatch.INTERVAL_MSEC, self._on_stop_loss_batch_timer)
+
+            entry = self.data_manager.strategy_index.get(code)
+            if entry is None:  # 활성 전략이 없는 종목
+                return
+            # 전략이 enabled 를 바꾸면 색인의 list 가 새로 만들어지므로 순회 중인 list 는 그대로다
             if stock.qty > 0 and stock.remained_sell_qty == 0:
-                for strategy in stock.sell_strategy_dic.values():
-                    if strategy.enabled:
-                        strategy.on_price_updated()
+                for strategy in entry.tick_sell_list if stop_loss_batch.active else entry.sell_list:
+                    strategy.on_price_updated()
             if stock.remained_buy_qty == 0:
-                for strategy in stock.buy_strategy_dic.values():
-                    if strategy.enabled:
-                        strategy.on_price_updated()
-
-            # 장마감 동시호가 시간 되기 전 (3시 18분경)
-            cur_time_str = self.ocx.get_comm_real_data(code, Fid.체결시간.value)
-            cur_time = int(cur_time_str)
-            if self.is_closing_called is False and 151800 < cur_time < 151805:
-                logger.info(f'is_closing_called:{self.is_closing_called}. cur_time:{cur_time}')
-                for stock in self.data_manager.stock_dic.values():
-                    if stock.qty > 0 and stock.remained_sell_qty == 0:
-                        for strategy in stock.sell_strategy_dic.values():
-                            if strategy.enabled:
-                                strategy.on_time(cur_time_str)
-                self.is_closing_called = True
-                logger.info(f'is_closing_called:{self.is_closing_called}. cur_time:{cur_time}')
+                for strategy in entry.buy_list:
+                    strategy.on_price_updated()
 
     def on_receive_msg(self, scr_no: str, rq_name: str, tr_code: str, msg: str):
         logger.info(f'scr_no:"{scr_no}", rq_name:"{rq_name}", tr_code:"{tr_code}", msg:"{msg}"')
@@ -233,59 +251,56 @@ class KiwoomEventHandler(EventHandler):
         :param item_cnt: 아이템 개수
         :param fid_list: 데이터리스트 (';'로 구분)
         """
-        logger.info(f'gubun:"{gubun}", item_cnt:{item_cnt}, fid_list:"{fid_list}"')
-        fid_str_list = fid_list.split(";")
-        for fid_str in fid_str_list:
-            fid = int(fid_str)
-            ret = self.ocx.get_chejan_data(fid)
-            key_str = f'{Fid(fid).name}({fid})' if fid in Fid.__members__.values() else f'UNKNOWN({fid_str})'
-            logger.debug(f'  {key_str}: "{ret}"')
-
-        code = self.ocx.get_chejan_data(Fid.종목코드.value)
-        code = code[1:]  # Remove 'A'
-        name = self.ocx.get_chejan_data(Fid.종목명.value)
+        # 주문 상태를 먼저 갱신하고, 로그 / 기록은 그 다음에 한다. FID 값은 ChejanRecord 가 한 번씩만 읽는다
+        chejan = ChejanRecord(self.ocx.get_chejan_data, fid_list)
+        code = chejan.get(Fid.종목코드)[1:]  # Remove 'A'
 
         if gubun == '0':  # 주문접수 or 주문체결
-            order_id = self.ocx.get_chejan_data(Fid.주문번호.value)
-            status = self.ocx.get_chejan_data(Fid.주문상태.value)  # '접수' or '체결'
-            order_type = self.ocx.get_chejan_data(Fid.매도수구분.value)  # '1':매도, '2':매수
-            time_str = self.ocx.get_chejan_data(Fid.주문_체결시간.value)  # 주문/체결시간 (HHMMSSMS)
-            time = int(time_str)
+            status = chejan.get(Fid.주문상태)  # '접수', '체결' or '확인' (정정 / 취소)
+            order_type = chejan.get(Fid.매도수구분)  # '1':매도, '2':매수
+            self._update_order(chejan, code, status, order_type)
+
+        elif gubun == '1':  # 잔고통보
+            qty = int(chejan.get(Fid.보유수량))
+            buy_price = int(chejan.get(Fid.매입단가))
+            is_new_stock = code not in self.data_manager.stock_dic
+            stock = self.data_manager.get_stock(code)
+            stock.qty = qty
+            stock.buy_price = buy_price
+            if qty == 0:
+                # TODO: 매수 전략 다른 게 있으면, 계속 실시간 받아야 함.
+                self.data_manager.remove_stock(code)
+            if qty == 0 or is_new_stock:
+                self.data_manager.set_updated(DataType.TABLE_BALANCE)  # 실시간 등록 목록도 다시 맞춘다
+
+        logger.info(f'gubun:"{gubun}", item_cnt:{item_cnt}, fid_list:"{fid_list}"')
+        if logger.isEnabledFor(logging.DEBUG):
+            chejan.dump(logger)
+
+        name = chejan.get(Fid.종목명)
+        if gubun == '0':
+            order_id = chejan.get(Fid.주문번호)
+            time_str = chejan.get(Fid.주문_체결시간)  # 주문/체결시간 (HHMMSSMS)
             if status == '접수':
                 logger.info(
                     f'{name}({code}) 주문접수. order_id:"{order_id}", order_type:"{order_type}", time_str:"{time_str}"')
             if status == '체결':
-                remained_qty = self.ocx.get_chejan_data(Fid.미체결수량.value)
-                remained_qty = int(remained_qty)
+                remained_qty = chejan.get_int(Fid.미체결수량)
                 logger.info(f'{name}({code}) 주문체결. order_id:"{order_id}", order_type:"{order_type}", '
                             f'time_str:"{time_str}", remained_qty:{remained_qty}')
-                stock = self.data_manager.get_stock(code)
-
-                if order_type == '1':  # 매도
-                    stock.remained_sell_qty = remained_qty
-
-                if order_type == '2':  # 매수
-                    stock.remained_buy_qty = remained_qty
-                    # TODO: 종목 실시간 등록 및 조건식 실시간 재적용(?)
-
-                if remained_qty == 0 and 90100 < time < 151400:
+                if remained_qty == 0 and 90100 < int(time_str) < 151400:
                     from sns_trade_bot.slack.webhook import MsgSender
-                    send_balance_job = Job(MsgSender.send_balance, list(self.data_manager.stock_dic.values()))
-                    self.tr_queue.put(send_balance_job)
+                    MsgSender.send_balance(list(self.data_manager.stock_dic.values()))
 
-        elif gubun == '1':  # 잔고통보
-            qty = int(self.ocx.get_chejan_data(Fid.보유수량.value))
-            order_type = self.ocx.get_chejan_data(Fid.매도_매수구분.value)  # '1':매도, '2':매수
-            buy_price = int(self.ocx.get_chejan_data(Fid.매입단가.value))
+        elif gubun == '1':
+            order_type = chejan.get(Fid.매도_매수구분)  # '1':매도, '2':매수
             logger.info(f'{name}({code}) 잔고통보. order_type:"{order_type}", qty:{qty}, buy_price:{buy_price}')
-            stock = self.data_manager.get_stock(code)
-            stock.qty = qty
-            stock.buy_price = buy_price
             if qty == 0:
                 logger.info(f'{name}({code}) 청산 완료!!')
-                # TODO: 매수 전략 다른 게 있으면, 계속 실시간 받아야 함.
-                self.ocx.set_real_remove(ScnNo.REAL.value, code)
-                self.data_manager.remove_stock(code)
+
+        if self.recorder is not None:  # 리플레이에 필요한 것은 위에서 읽은 FID 뿐이다. 기록하려고 더 읽지 않는다
+            self.recorder.record_event('chejan', {'gubun': gubun, 'fid_list': fid_list,
+                                                  'fid_dic': chejan.get_fetched_dic()})
 
     def on_receive_real_condition(self, code: str, event_type: str, cond_name: str, cond_index: str):
         """조검검색 실시간 편입, 이탈 종목을 받을 시점을 알려준다.
@@ -295,7 +310,11 @@ class KiwoomEventHandler(EventHandler):
         :param cond_name: 조건명
         :param cond_index: 조건명 인덱스
         """
-        logger.debug(f'code:{code}, type:{event_type}, cond_name:{cond_name}, cond_index:{cond_index}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'code:{code}, type:{event_type}, cond_name:{cond_name}, cond_index:{cond_index}')
+        if self.recorder is not None:
+            self.recorder.record_event('real_condition', {'code': code, 'event_type': event_type,
+                                                          'cond_name': cond_name, 'cond_index': cond_index})
         condition: Condition = self.data_manager.get_cond(int(cond_index))
 
         if condition.signal_type == SignalType.SELL and event_type == 'I':  # 매도 조건식 편입
@@ -330,6 +349,9 @@ class KiwoomEventHandler(EventHandler):
     def on_receive_tr_condition(self, scr_no: str, code_list_str: str, cond_name, index: int, has_next: int):
         logger.debug(f'scr_no:"{scr_no}", code_list_str:"{code_list_str}", cond_name:"{cond_name}",  index:{index}, '
                      f'has_next:{has_next}')
+        if self.recorder is not None:
+            self.recorder.record_event('tr_condition', {'scr_no': scr_no, 'code_list_str': code_list_str,
+                                                        'cond_name': cond_name, 'index': index, 'has_next': has_next})
         if len(code_list_str) == 0:
             return
 
@@ -357,83 +379,115 @@ class KiwoomEventHandler(EventHandler):
             self.data_manager.add_all_temp_stock()
 
     def print_tr_data(self, tr_code, record_name, index, item_list):
+        if not logger.isEnabledFor(logging.DEBUG):  # 로그 때문에 get_comm_data() 를 호출하지 않도록
+            return
         logger.debug(f'---- tr_code:"{tr_code}", record_name:"{record_name}", index:{index}')
         for item in item_list:
             out_str = self.ocx.get_comm_data(tr_code, record_name, index, item)
             logger.debug(f'  "{item}" : "{out_str}"')
 
-    # TODO: Reduce duplicated function
+    def _parse_real_data(self, code: str, real_type: str, real_data: str):
+        record = self.real_parser.parse(real_type, real_data)
+        if record is None:  # real_data 의 FID 순서가 예상과 다르면 예전처럼 FID 별로 읽는다
+            record = self.real_parser.parse_by_fid(real_type, lambda fid: self.ocx.get_comm_real_data(code, fid))
+        return record
+
+    def _update_order(self, the_chejan: ChejanRecord, the_code: str, the_status: str, the_order_type: str):
+        """접수 / 체결 / 취소 확인을 OrderBook 에 반영한다. Stock 의 미체결수량도 이것으로 바뀐다"""
+        order_book = self.data_manager.order_book
+        order_id = the_chejan.get(Fid.주문번호)
+        order_class = the_chejan.get(Fid.주문구분)  # '+매수', '-매도', '매수취소', '매도정정' ...
+        if '취소' in order_class or '정정' in order_class:
+            if the_status == '확인' and '취소' in order_class:
+                order_book.cancel(the_chejan.get(Fid.원주문번호), order_class)
+            return  # 정정은 아직 내지 않는다
+        if the_order_type not in ('1', '2'):
+            logger.warning(f'unexpected order_type:"{the_order_type}", order_id:"{order_id}"')
+            return
+        side = OrderSide(the_order_type)
+        qty = the_chejan.get_int(Fid.주문수량)
+        if the_status == '접수':
+            order_book.on_accepted(order_id, the_code, side, qty)
+        elif the_status == '체결':
+            order_book.on_filled(order_id, the_code, side, qty, the_chejan.get_int(Fid.미체결수량),
+                                 abs(the_chejan.get_int(Fid.체결가)))
+            # TODO: 매수 체결 시 종목 실시간 등록 및 조건식 실시간 재적용(?)
+
+    def _on_stop_loss_batch_timer(self):
+        for strategy in self.stop_loss_batch.on_timer():
+            if strategy.enabled:
+                strategy.on_price_updated()  # 기준을 넘은 종목만 다시 확인하고 매도 신호
+
+    def _add_strategy_time(self, the_time_str: str):
+        self.session.add(f'strategy_{the_time_str}', the_time_str, lambda: self._on_strategy_time(the_time_str))
+
+    def _on_strategy_time(self, the_time_str: str):
+        for entry in self.data_manager.strategy_index.get_time_entry_list(the_time_str):
+            stock = entry.stock
+            if stock.qty > 0 and stock.remained_sell_qty == 0:
+                for strategy in entry.sell_list:
+                    strategy.on_time(the_time_str)
+            if stock.remained_buy_qty == 0:
+                for strategy in entry.buy_list:
+                    strategy.on_time(the_time_str)
+
     def _request_account_detail(self):
-        logger.info(f'account: {self.data_manager.account}')
-        self.ocx.set_input_value('계좌번호', self.data_manager.account)
-        self.ocx.set_input_value('비밀번호', '')  # 사용안함(공백)
-        self.ocx.set_input_value('상장폐지조회구분', '0')  # 0:전체, 1: 상장폐지종목제외
-        self.ocx.set_input_value('비밀번호입력매체구분', '00')  # 고정값?
-        tr_code = 'OPW00004'  # 계좌평가현황요청
-        is_next = 0  # 연속조회요청 여부 (0:조회 , 2:연속)
-        return self.ocx.comm_rq_data(RqName.BALANCE.value, tr_code, is_next, ScnNo.BALANCE.value)
-
-    # TODO: Reduce duplicated function
+        self.requester.account_detail()
+
     def _request_today_earning(self):
-        logger.info(f'account: {self.data_manager.account}')
-        self.ocx.set_input_value('계좌번호', self.data_manager.account)
-        self.ocx.set_input_value('비밀번호', '')  # 사용안함(공백)
-        self.ocx.set_input_value('종목코드', '')  # 전문 조회할 종목코드
-        is_next = 0  # 연속조회요청 여부 (0:조회 , 2:연속)
-        return self.ocx.comm_rq_data(RqName.당일손익상세요청.value, TrCode.당일손익상세요청.value, is_next,
-                                     ScnNo.당일손익상세요청.value)
-
-    # TODO: Reduce duplicated function
-    def _request_multi_code_info(self):
-        the_code_list = self.data_manager.get_code_list(HoldType.INTEREST)
-        logger.debug(f'the_code_list: {the_code_list}')
-        count = len(the_code_list)
-        if count == 0:
-            logger.error('code_list is empty!!')
-            return -1
-        code_list_str = ";".join(the_code_list)  # 종목리스트
-        is_next = 0  # 연속조회요청 여부
-        code_count = count  # 종목개수
-        type_flag = 0  # 조회구분 (0: 주식관심종목정보 , 선물옵션관심종목정보)
-        rq_name = RqName.INTEREST_CODE.value  # 사용자구분 명
-        scn_no = ScnNo.INTEREST.value  # 화면변호
-        return self.ocx.comm_kw_rq_data(code_list_str, is_next, code_count, type_flag, rq_name, scn_no)
+        self.requester.today_earning()
+
+    def _request_interest_price(self):
+        self.requester.multi_code_info(self.data_manager.get_code_list(HoldType.INTEREST))
+
+    def _start_subscription(self):
+        self.subscription.start()
 
     def _send_account_to_slack(self):
+        """보유 종목과 합계, 미체결 주문을 slack 으로 보낸다.
+
+        관심 종목 (보유수량 0) 은 예전에도 MsgSender.send_balance() 가 건너뛰었으므로 보내지 않는다.
+        전체 목록 대신 보유 종목만 골라서 넘기고, 합계는 get_portfolio_summary() 로 한 번에 구한다.
+        """
         from sns_trade_bot.slack.webhook import MsgSender
-        MsgSender.send_balance(list(self.data_manager.stock_dic.values()))
+        holding_list = [self.data_manager.stock_dic[code] for code in self.data_manager.get_code_list(HoldType.HOLDING)]
+        MsgSender.send_balance(holding_list, self.data_manager.get_portfolio_summary())
+        open_order_list = self.data_manager.order_book.get_open_order_list()
+        if open_order_list:
+            MsgSender.send_open_order_list(open_order_list)
 
     # TODO: Make it private
     def arrange_strategy(self):
         for stock in self.data_manager.stock_dic.values():
             if stock.qty > 0:
                 logger.debug(f'clear buy_strategy_dic of {stock.name}')
-                stock.buy_strategy_dic.clear()
+                stock.clear_buy_strategy()
                 if 'sell_stop_loss' not in stock.sell_strategy_dic.keys():
                     logger.debug(f'add sell_stop_loss to {stock.name}')
                     from sns_trade_bot.strategy.sell_stop_loss import SellStopLoss
-                    stock.sell_strategy_dic['sell_stop_loss'] = SellStopLoss(stock, SellStopLoss.DEFAULT_PARAM)
+                    stock.add_sell_strategy(SellStopLoss.NAME, SellStopLoss.DEFAULT_PARAM)
         self.data_manager.set_updated(DataType.TABLE_BALANCE)
         self.data_manager.save()
 
+    def close(self):
+        """종료 전에 기록 중인 파일을 닫는다. 여러 번 불려도 된다"""
+        if self.recorder is not None:
+            self.recorder.close()  # 버퍼에 남은 tick / 이벤트를 쓴다
+        self.data_manager.journal.close()  # fsync 하지 않은 종목 변경을 디스크에 남긴다
+
     def _exit(self):
         logger.info('exit SnsTradeBot')
-        # TODO: Pass app?
-        app.quit()
-
-    def _set_real_reg(self, the_code_list: List[str]):
-        code_list_str = ';'.join(the_code_list)
-        fid_list = "9001;10;13"  # 종목코드,업종코드;현재가;누적거래량
-        real_type = "0"  # 0: 최초 등록, 1: 같은 화면에 종목 추가
-        self.ocx.set_real_reg(ScnNo.REAL.value, code_list_str, fid_list, real_type)
+        self.close()
+        app = QApplication.instance()
+        if app is not None:
+            app.quit()
 
     def _check_buy_on_closing_cond(self):
         for cond in self.data_manager.cond_dic.values():
             if cond.signal_type is SignalType.BUY_ON_CLOSING:
                 query_type = 0  # 일반조회
                 logger.info(f'send_condition(0). ScnNo.COND_BUY. index:{cond.index}, name:{cond.name}')
-                ret = self.ocx.send_condition(ScnNo.COND_BUY.value, cond.name, cond.index, query_type)
-                logger.debug(f'send_condition(0). ret: {ret}')
+                self.requester.send_condition(ScnNo.COND_BUY.value, cond, query_type)
 
 
 if __name__ == "__main__":
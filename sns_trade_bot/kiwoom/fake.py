@@ -0,0 +1,495 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Set, Tuple
+
+from sns_trade_bot.kiwoom.common import EventHandler, ErrCode, Fid, TrCode
+from sns_trade_bot.kiwoom.parser import format_real_data
+
+logger = logging.getLogger(__name__)
+
+
+class FakeStock:
+    def __init__(self, the_code: str, the_name: str, the_price: int):
+        self.code = the_code
+        self.name = the_name
+        self.base_price = the_price  # 기준가 (전일 종가)
+        self.price = the_price
+        self.volume = 0  # 누적거래량
+
+
+class FakeKiwoomOcx:
+    """KiwoomOcx 와 같은 메소드를 가진 순수 파이썬 모의 OCX. Qt ActiveX 없이 리눅스에서도 동작한다.
+
+    요청에 대한 응답 이벤트는 가상 시계 기준으로 event heap 에 쌓이고, run() / advance() 를 호출한 스레드에서
+    EventHandler 로 전달된다. 같은 seed 면 같은 순서로 같은 데이터가 나온다.
+    TR / 주문 / 조건검색 요청이 RATE_LIMIT_DIC 를 넘으면 실제 OpenAPI 처럼 -200 / -308 / 0 을 돌려준다.
+    """
+    LATENCY_DIC = {'connect': 0.1, 'tr': 0.05, 'order': 0.02, 'chejan': 0.01, 'condition': 0.1}  # unit: sec
+    RATE_LIMIT_DIC = {'tr': (5, 1.0), 'order': (5, 1.0), 'condition': (1, 1.0)}  # (횟수, 기간)
+    PAGE_SIZE = 20  # 연속조회 한 페이지의 행 수
+    START_TIME = 9 * 3600  # 가상 시계 0 초에 해당하는 장 시각 (09:00:00)
+
+    def __init__(self, the_data_manager=None, the_seed: int = 0, the_latency_dic: Dict[str, float] = None,
+                 the_rate_limit_dic: Dict[str, Tuple[int, float]] = None):
+        self.data_manager = the_data_manager  # KiwoomOcx 와 생성자를 맞추기 위한 것. 사용하지 않음
+        self.latency_dic = dict(self.LATENCY_DIC, **(the_latency_dic or {}))
+        self.rate_limit_dic = dict(self.RATE_LIMIT_DIC, **(the_rate_limit_dic or {}))
+        self.random = random.Random(the_seed)
+        self.handler: EventHandler = EventHandler()
+        self.lock = threading.RLock()
+        self.now = 0.0
+        self.event_heap: List[Tuple[float, int, Callable, tuple]] = []
+        self.seq = itertools.count()
+        self.request_time_dic: Dict[str, Deque[float]] = {kind: deque() for kind in self.rate_limit_dic}
+        self.overflow_count = 0  # 요청 제한에 걸린 횟수
+        self.dispatch_count = 0  # EventHandler 로 전달한 이벤트 수
+
+        self.connected = False
+        self.account_list = ['1234567890']
+        self.stock_dic: Dict[str, FakeStock] = {}
+        self.holding_dic: Dict[str, List[int]] = {}  # 종목코드 -> [보유수량, 매입단가]
+        self.cash = 10000000
+        self.realized_earning = 0  # 당일실현손익
+        self.today_trade_list: List[Dict[str, str]] = []  # 당일 매도 체결 내역
+        self.cond_dic: Dict[int, Tuple[str, List[str]]] = {}  # index -> (조건명, 종목코드 list)
+        self.order_no = itertools.count(1)
+        self.fill_order = True  # False 면 주문 접수(TR)만 응답하고 체결 이벤트는 보내지 않는다
+
+        self.input_dic: Dict[str, str] = {}
+        self.tr_offset_dic: Dict[str, int] = {}  # tr_code -> 다음 페이지 시작 행
+        self.cur_tr: Tuple[Dict[str, str], List[Dict[str, str]]] = ({}, [])  # 수신 중인 TR (single, multi)
+        self.cur_real_dic: Dict[str, Dict[int, str]] = {}  # 종목코드 -> 마지막 실시간 데이터
+        self.cur_chejan: Dict[int, str] = {}
+        self.real_reg_dic: Dict[str, Set[str]] = {}  # 화면번호 -> 실시간 등록 종목코드 set
+
+    # 모의 시장 설정
+    def add_stock(self, the_code: str, the_name: str, the_price: int):
+        self.stock_dic[the_code] = FakeStock(the_code, the_name, the_price)
+
+    def create_market(self, the_count: int):
+        """the_count 개의 종목을 만든다. 종목코드는 100000 부터"""
+        for i in range(the_count):
+            price = self.random.randrange(1000, 100000, 10)
+            self.add_stock(f'{100000 + i:06d}', f'모의종목{i}', price)
+
+    def set_holding(self, the_code: str, the_qty: int, the_buy_price: int):
+        self.holding_dic[the_code] = [the_qty, the_buy_price]
+
+    def add_condition(self, the_index: int, the_name: str, the_code_list: List[str]):
+        self.cond_dic[the_index] = (the_name, list(the_code_list))
+
+    def get_registered_code_set(self) -> Set[str]:
+        with self.lock:
+            return set().union(*self.real_reg_dic.values())
+
+    # 가상 시계
+    def clock(self) -> float:
+        return self.now
+
+    def get_sec_of_day(self) -> float:
+        """가상 시계의 장 시각 (0 시부터의 초). 세션 이벤트 시계로 쓸 수 있다"""
+        return self.START_TIME + self.now
+
+    def get_time_str(self) -> str:
+        sec = self.START_TIME + int(self.now)
+        return f'{sec // 3600 % 24:02d}{sec // 60 % 60:02d}{sec % 60:02d}'
+
+    def schedule(self, the_delay: float, the_fn: Callable, *args):
+        with self.lock:
+            heapq.heappush(self.event_heap, (self.now + the_delay, next(self.seq), the_fn, args))
+
+    def pending_count(self) -> int:
+        with self.lock:
+            return len(self.event_heap)
+
+    def advance(self, the_seconds: float):
+        """가상 시계를 the_seconds 만큼 진행하며 그 사이의 이벤트를 전달한다. TrScheduler 의 sleep 으로 쓸 수 있다"""
+        self.run_until(self.now + the_seconds)
+
+    def run_until(self, the_time: float) -> int:
+        count = 0
+        while True:
+            with self.lock:
+                if not self.event_heap or self.event_heap[0][0] > the_time:
+                    self.now = max(self.now, the_time)
+                    return count
+                event_time, _, fn, args = heapq.heappop(self.event_heap)
+                self.now = max(self.now, event_time)
+            fn(*args)
+            count += 1
+
+    def run(self) -> int:
+        """쌓인 이벤트를 모두 전달한다. 이벤트 처리 중에 생긴 이벤트도 포함"""
+        count = 0
+        while True:
+            with self.lock:
+                if not self.event_heap:
+                    return count
+                event_time, _, fn, args = heapq.heappop(self.event_heap)
+                self.now = max(self.now, event_time)
+            fn(*args)
+            count += 1
+
+    # 시세 / 조건검색 이벤트 (시나리오)
+    def push_tick(self, the_delay: float, the_code: str, the_price: int = None):
+        """the_price 가 None 이면 random walk 로 가격을 만든다"""
+        self.schedule(the_delay, self._fire_tick, the_code, the_price)
+
+    def generate_ticks(self, the_count: int, the_interval: float):
+        """the_interval 간격으로 실시간 등록된 종목 중 하나의 체결을 the_count 번 만든다"""
+        for i in range(the_count):
+            self.schedule(the_interval * (i + 1), self._fire_random_tick)
+
+    def push_market_time(self, the_delay: float, the_time_str: str):
+        """장시작시간 실시간 이벤트 (the_time_str: HHMMSS)"""
+        self.schedule(the_delay, self._fire_market_time, the_time_str)
+
+    def push_real_condition(self, the_delay: float, the_code: str, the_event_type: str, the_index: int):
+        """조건검색 실시간 편입("I") / 이탈("D")"""
+        self.schedule(the_delay, self._fire_real_condition, the_code, the_event_type, the_index)
+
+    # KiwoomOcx
+    def set_event_handler(self, event_handler: EventHandler):
+        self.handler = event_handler
+
+    def comm_connect(self) -> int:
+        self.schedule(self.latency_dic['connect'], self._fire_connect)
+        return 0
+
+    def comm_rq_data(self, rq_name: str, tr_code: str, is_next: int, scn_no: str) -> int:
+        with self.lock:
+            if not self._check_rate('tr'):
+                return ErrCode.OP_ERR_SISE_OVERFLOW.value
+            input_dic, self.input_dic = self.input_dic, {}
+            if tr_code == TrCode.계좌평가현황요청.value:
+                single, multi = self._build_balance()
+            elif tr_code == TrCode.주식기본정보요청.value:
+                single, multi = self._build_code_info(input_dic.get('종목코드', '')), []
+            elif tr_code == TrCode.당일손익상세요청.value:
+                single, multi = {'당일실현손익': str(self.realized_earning)}, list(self.today_trade_list)
+            else:
+                logger.error(f'unsupported tr_code:"{tr_code}"')
+                return ErrCode.OP_ERR_RQ_STRING_FAIL.value
+            offset = self.tr_offset_dic.get(tr_code, 0) if is_next == 2 else 0
+            row_list = multi[offset:offset + self.PAGE_SIZE]
+            pre_next = '2' if offset + self.PAGE_SIZE < len(multi) else '0'
+            self.tr_offset_dic[tr_code] = offset + self.PAGE_SIZE
+        self.schedule(self.latency_dic['tr'], self._fire_tr, scn_no, rq_name, tr_code, pre_next, single, row_list)
+        return ErrCode.OP_ERR_NONE.value
+
+    def get_login_info(self, tag: str) -> str:
+        if tag == 'ACCNO':
+            return ';'.join(self.account_list) + ';'
+        if tag == 'ACCOUNT_CNT':
+            return str(len(self.account_list))
+        if tag in ('USER_ID', 'USER_NAME'):
+            return 'fake'
+        return ''
+
+    def send_order(self, rq_name: str, scn_no: str, acc_no: str, order_type: int, code: str, qty: int, price: int,
+                   hoga_gb: str, org_order_no: str) -> int:
+        with self.lock:
+            if not self._check_rate('order'):
+                return ErrCode.OP_ERR_ORD_OVERFLOW.value
+            if code not in self.stock_dic or order_type not in (1, 2) or qty <= 0:
+                logger.error(f'unsupported order. code:{code}, order_type:{order_type}, qty:{qty}')
+                return -1
+            order_no = f'{next(self.order_no):07d}'
+        latency = self.latency_dic['order']
+        self.schedule(latency, self._fire_tr, scn_no, rq_name, 'KOA_NORMAL_BUY_KP_ORD', '0', {'주문번호': order_no}, [])
+        if self.fill_order:
+            self.schedule(latency + self.latency_dic['chejan'], self._fire_order_chejan, acc_no, order_no,
+                          order_type, code, qty)
+        return ErrCode.OP_ERR_NONE.value
+
+    def set_input_value(self, item: str, value: str) -> None:
+        with self.lock:
+            self.input_dic[item] = value
+
+    def disconnect_real_data(self, scn_no: str) -> None:
+        with self.lock:
+            self.real_reg_dic.pop(scn_no, None)
+
+    def get_repeat_cnt(self, tr_code: str, record_name: str) -> int:
+        return len(self.cur_tr[1])
+
+    def comm_kw_rq_data(self, arr_code: str, is_next: int, code_count: int, type_flag: int, rq_name: str,
+                        scn_no: str) -> int:
+        with self.lock:
+            if not self._check_rate('tr'):
+                return ErrCode.OP_ERR_SISE_OVERFLOW.value
+            code_list = [code for code in arr_code.split(';') if code]
+            if len(code_list) != code_count or code_count > 100:
+                return ErrCode.OP_ERR_RQ_STRING_FAIL.value
+            row_list = [self._build_interest_row(self.stock_dic[code]) for code in code_list if code in self.stock_dic]
+            self.real_reg_dic.setdefault(scn_no, set()).update(code_list)  # 조회한 종목은 실시간 등록도 된다
+        self.schedule(self.latency_dic['tr'], self._fire_tr, scn_no, rq_name, TrCode.관심종목정보요청.value, '0', {},
+                      row_list)
+        return ErrCode.OP_ERR_NONE.value
+
+    def get_code_list_by_market(self, market: str) -> str:
+        return ';'.join(self.stock_dic.keys()) + ';'
+
+    def get_connect_state(self) -> int:
+        return 1 if self.connected else 0
+
+    def get_master_code_name(self, code: str) -> str:
+        stock = self.stock_dic.get(code)
+        return stock.name if stock else ''
+
+    def get_comm_data(self, tr_code: str, record_name: str, index: int, item_name: str) -> str:
+        single, multi = self.cur_tr
+        if index < len(multi) and item_name in multi[index]:
+            return multi[index][item_name]
+        return single.get(item_name, '')
+
+    def get_comm_real_data(self, code: str, fid: int) -> str:
+        return self.cur_real_dic.get(code, {}).get(fid, '')
+
+    def get_chejan_data(self, fid: int) -> str:
+        return self.cur_chejan.get(fid, '')
+
+    def set_real_reg(self, scn_no: str, code_list_str: str, fid_list_str: str, real_type: str) -> int:
+        code_set = {code for code in code_list_str.split(';') if code}
+        with self.lock:
+            if real_type == '0':
+                self.real_reg_dic[scn_no] = code_set
+            else:
+                self.real_reg_dic.setdefault(scn_no, set()).update(code_set)
+        return 0
+
+    def set_real_remove(self, scn_no: str, del_code: str):
+        with self.lock:
+            if scn_no == 'ALL':
+                self.real_reg_dic.clear()
+            elif del_code == 'ALL':
+                self.real_reg_dic.pop(scn_no, None)
+            elif scn_no in self.real_reg_dic:
+                self.real_reg_dic[scn_no].discard(del_code)
+
+    def get_condition_load(self) -> int:
+        self.schedule(self.latency_dic['condition'], self._fire_condition_ver)
+        return 1
+
+    def get_condition_name_list(self) -> str:
+        return ''.join(f'{index}^{name};' for index, (name, _) in sorted(self.cond_dic.items()))
+
+    def send_condition(self, scn_no: str, condition_name: str, condition_index: int, query_type: int) -> int:
+        with self.lock:
+            if not self._check_rate('condition'):
+                return 0
+            if condition_index not in self.cond_dic:
+                logger.error(f'unknown condition index:{condition_index}')
+                return 0
+            code_list = self.cond_dic[condition_index][1]
+        code_list_str = ''.join(f'{code};' for code in code_list)
+        self.schedule(self.latency_dic['condition'], self._fire_tr_condition, scn_no, code_list_str, condition_name,
+                      condition_index)
+        return 1
+
+    def _check_rate(self, the_kind: str) -> bool:
+        count, period = self.rate_limit_dic[the_kind]
+        time_list = self.request_time_dic[the_kind]
+        while time_list and time_list[0] <= self.now - period:
+            time_list.popleft()
+        if len(time_list) >= count:
+            self.overflow_count += 1
+            logger.warning(f'{the_kind} rate limit exceeded. ({count} per {period} sec)')
+            return False
+        time_list.append(self.now)
+        return True
+
+    # TR 응답 데이터
+    def _build_balance(self) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+        row_list = []
+        cur_balance = 0
+        buy_total = 0
+        for code, (qty, buy_price) in self.holding_dic.items():
+            stock = self.stock_dic[code]
+            cur_balance += qty * stock.price
+            buy_total += qty * buy_price
+            earning_rate = int((stock.price - buy_price) / buy_price * 100 * 10000) if buy_price else 0
+            row_list.append({
+                '종목코드': f'A{code}',
+                '종목명': stock.name,
+                '보유수량': f'{qty:012d}',
+                '평균단가': f'{buy_price:012d}',
+                '현재가': f'{stock.price:012d}',
+                '평가금액': f'{qty * stock.price:012d}',
+                '손익율': f'{earning_rate:012d}',
+                '매입금액': f'{qty * buy_price:012d}',
+            })
+        single = {
+            '계좌명': '모의계좌',
+            '예수금': f'{self.cash:015d}',
+            'D+2추정예수금': f'{self.cash:015d}',
+            '유가잔고평가액': f'{cur_balance:015d}',
+            '총매입금액': f'{buy_total:015d}',
+            '출력건수': f'{len(row_list):04d}',
+        }
+        return single, row_list
+
+    def _build_code_info(self, the_code: str) -> Dict[str, str]:
+        stock = self.stock_dic.get(the_code)
+        if stock is None:
+            return {}
+        return {
+            '종목코드': stock.code,
+            '종목명': stock.name,
+            '기준가': str(stock.base_price),
+            '현재가': self._signed_price(stock),
+            '거래량': str(stock.volume),
+        }
+
+    def _build_interest_row(self, the_stock: FakeStock) -> Dict[str, str]:
+        return {
+            '종목코드': the_stock.code,
+            '종목명': the_stock.name,
+            '현재가': self._signed_price(the_stock),
+            '기준가': str(the_stock.base_price),
+            '전일대비': str(the_stock.price - the_stock.base_price),
+            '거래량': str(the_stock.volume),
+        }
+
+    @staticmethod
+    def _signed_price(the_stock: FakeStock) -> str:
+        """OpenAPI 처럼 기준가보다 낮으면 '-' 를 붙인다"""
+        return f'-{the_stock.price}' if the_stock.price < the_stock.base_price else f'+{the_stock.price}'
+
+    # 이벤트 전달
+    def dispatch(self, the_method_name: str, *args):
+        """EventHandler 의 the_method_name 을 바로 호출한다"""
+        self.dispatch_count += 1
+        getattr(self.handler, the_method_name)(*args)
+
+    def fire_real_data(self, the_code: str, the_real_type: str, the_real_dic: Dict[int, str]):
+        """실시간 데이터를 바로 전달한다. real_data 는 OpenAPI 와 같은 FID 순서이고, get_comm_real_data() 로도 읽을 수 있다"""
+        self.cur_real_dic[the_code] = the_real_dic
+        self.dispatch('on_receive_real_data', the_code, the_real_type, format_real_data(the_real_type, the_real_dic))
+
+    def fire_chejan(self, the_gubun: str, the_chejan: Dict[int, str], the_fid_list_str: str = None):
+        """
+        :param the_fid_list_str: 이벤트의 FID list. None 이면 the_chejan 의 FID. 없는 FID 는 get_chejan_data() 가 '' 를 준다
+        """
+        self.cur_chejan = the_chejan
+        if the_fid_list_str is None:
+            the_fid_list_str = ';'.join(str(fid) for fid in the_chejan)
+        item_cnt = len([fid for fid in the_fid_list_str.split(';') if fid])
+        self.dispatch('on_receive_chejan_data', the_gubun, item_cnt, the_fid_list_str)
+
+    def _fire_connect(self):
+        self.connected = True
+        self.dispatch_count += 1
+        self.handler.on_event_connect(0)
+
+    def _fire_tr(self, the_scn_no, the_rq_name, the_tr_code, the_pre_next, the_single, the_row_list):
+        self.cur_tr = (the_single, the_row_list)
+        self.dispatch_count += 1
+        self.handler.on_receive_tr_data(the_scn_no, the_rq_name, the_tr_code, '', the_pre_next, 0, '', '', '')
+
+    def _fire_tick(self, the_code: str, the_price: int = None):
+        stock = self.stock_dic.get(the_code)
+        if stock is None or the_code not in self.get_registered_code_set():
+            return
+        if the_price is None:
+            the_price = max(10, int(stock.price * (1 + self.random.gauss(0, 0.002))) // 10 * 10)
+        volume = self.random.randint(1, 100)
+        stock.price = the_price
+        stock.volume += volume
+        real_dic = {
+            Fid.체결시간.value: self.get_time_str(),
+            Fid.현재가.value: self._signed_price(stock),
+            Fid.거래량.value: str(volume),
+            Fid.누적거래량.value: str(stock.volume),
+            Fid.최우선_매도호가.value: f'+{the_price + 10}',
+            Fid.최우선_매수호가.value: f'+{the_price}',
+        }
+        self.fire_real_data(the_code, '주식체결', real_dic)
+
+    def _fire_random_tick(self):
+        code_list = sorted(self.get_registered_code_set())
+        if code_list:
+            self._fire_tick(self.random.choice(code_list))
+
+    def _fire_market_time(self, the_time_str: str):
+        real_dic = {Fid.장운영구분.value: '3', Fid.체결시간.value: the_time_str, Fid.장시작예상잔여시간.value: '000000'}
+        self.fire_real_data('', '장시작시간', real_dic)
+
+    def _fire_order_chejan(self, the_acc_no: str, the_order_no: str, the_order_type: int, the_code: str,
+                           the_qty: int):
+        """시장가 주문이 현재가에 모두 체결된 것으로 접수, 체결, 잔고통보 이벤트를 차례로 보낸다"""
+        stock = self.stock_dic[the_code]
+        qty, buy_price = self.holding_dic.get(the_code, [0, 0])
+        side = '2' if the_order_type == 1 else '1'  # 매도수구분 '1':매도, '2':매수. order_type 1: 신규매수
+        order_qty = the_qty if side == '2' else min(the_qty, qty)
+        chejan = {
+            Fid.계좌번호.value: the_acc_no,
+            Fid.주문번호.value: the_order_no,
+            Fid.종목코드.value: f'A{the_code}',
+            Fid.종목명.value: stock.name,
+            Fid.주문상태.value: '접수',
+            Fid.주문수량.value: str(order_qty),
+            Fid.주문가격.value: '0',
+            Fid.미체결수량.value: str(order_qty),
+            Fid.주문구분.value: '+매수' if side == '2' else '-매도',
+            Fid.매도수구분.value: side,
+            Fid.주문_체결시간.value: self.get_time_str(),
+        }
+        self.fire_chejan('0', chejan)
+        chejan = dict(chejan)
+        chejan.update({
+            Fid.주문상태.value: '체결',
+            Fid.미체결수량.value: '0',
+            Fid.체결가.value: str(stock.price),
+            Fid.체결량.value: str(order_qty),
+        })
+        self.fire_chejan('0', chejan)
+
+        if side == '2':
+            buy_price = (qty * buy_price + order_qty * stock.price) // (qty + order_qty)
+            qty += order_qty
+            self.cash -= order_qty * stock.price
+        else:
+            qty -= order_qty
+            earning = (stock.price - buy_price) * order_qty
+            self.cash += order_qty * stock.price
+            self.realized_earning += earning
+            self.today_trade_list.append({
+                '종목명': stock.name,
+                '종목코드': the_code,
+                '매입단가': str(buy_price),
+                '체결가': str(stock.price),
+                '체결량': str(order_qty),
+                '당일매도손익': str(earning),
+                '손익율': f'{(stock.price - buy_price) / buy_price * 100:.2f}' if buy_price else '0.00',
+            })
+        if qty:
+            self.holding_dic[the_code] = [qty, buy_price]
+        else:
+            self.holding_dic.pop(the_code, None)
+        self.fire_chejan('1', {
+            Fid.계좌번호.value: the_acc_no,
+            Fid.종목코드.value: f'A{the_code}',
+            Fid.종목명.value: stock.name,
+            Fid.현재가.value: str(stock.price),
+            Fid.보유수량.value: str(qty),
+            Fid.매입단가.value: str(buy_price),
+            Fid.매도_매수구분.value: side,
+        })
+
+    def _fire_condition_ver(self):
+        self.dispatch_count += 1
+        self.handler.on_receive_condition_ver(1, '')
+
+    def _fire_tr_condition(self, the_scn_no: str, the_code_list_str: str, the_cond_name: str, the_index: int):
+        self.dispatch_count += 1
+        self.handler.on_receive_tr_condition(the_scn_no, the_code_list_str, the_cond_name, the_index, 0)
+
+    def _fire_real_condition(self, the_code: str, the_event_type: str, the_index: int):
+        name = self.cond_dic.get(the_index, ('', []))[0]
+        self.dispatch_count += 1
+        self.handler.on_receive_real_condition(the_code, the_event_type, name, str(the_index))
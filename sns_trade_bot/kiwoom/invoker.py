@@ -0,0 +1,38 @@
+import logging
+import threading
+from typing import Callable
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class MainThreadInvoker(QObject):
+    """TR 스레드의 future 콜백 등에서 model 을 바꿔야 할 때, 그 일을 Qt 스레드의 이벤트 루프에서 실행한다.
+
+    model 의 변경 알림은 QTimer 로 모아서 보내는데, QTimer 는 이벤트 루프가 없는 스레드에서는 끝내 울리지 않는다.
+    Qt 스레드 (이 객체를 만든 스레드) 에서 만들어야 한다.
+    """
+    invoked = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.thread_id = threading.get_ident()
+        self.invoked.connect(self._run, Qt.QueuedConnection)
+
+    def is_main_thread(self) -> bool:
+        return threading.get_ident() == self.thread_id
+
+    def call(self, the_fn: Callable[[], None]):
+        """Qt 스레드면 바로 실행하고, 다른 스레드면 Qt 스레드에 넣고 바로 반환한다"""
+        if self.is_main_thread():
+            the_fn()
+        else:
+            self.invoked.emit(the_fn)
+
+    @staticmethod
+    def _run(the_fn: Callable[[], None]):
+        try:
+            the_fn()
+        except Exception as e:  # 이벤트 루프 밖으로 예외를 내보내지 않는다
+            logger.exception(f'failed to run {the_fn}. {e}')
@@ -1,34 +1,46 @@
-import os
-import queue
 import sys
 import logging
 import threading
 import time
-from datetime import datetime
-from typing import List
+from concurrent.futures import Future
+from typing import List, TYPE_CHECKING
 
 from PyQt5.QtWidgets import *
 from sns_trade_bot.model.data_manager import DataManager, DataType, ModelListener, HoldType
 from sns_trade_bot.model.condition import Condition, SignalType
-from sns_trade_bot.kiwoom.common import Job, RqName, ScnNo, TrCode
-from sns_trade_bot.kiwoom.internal import KiwoomOcx
+from sns_trade_bot.model.order import Order, OrderSide
+from sns_trade_bot.kiwoom.common import ErrCode, Job, JobType, ScnNo, get_order_rq_name
 from sns_trade_bot.kiwoom.event import KiwoomEventHandler
+from sns_trade_bot.kiwoom.scheduler import TrScheduler
+from sns_trade_bot.kiwoom.request import TrRequester
 from sns_trade_bot.slack.webhook import MsgSender
 
+if TYPE_CHECKING:
+    from sns_trade_bot.kiwoom.internal import KiwoomOcx
+
 logger = logging.getLogger(__name__)
 
 
 class Kiwoom:
     data_manager: DataManager
-    ocx: KiwoomOcx
+    ocx: 'KiwoomOcx'
     handler: KiwoomEventHandler
 
-    def __init__(self, the_data_manager):
+    def __init__(self, the_data_manager, the_ocx=None, the_recorder=None):
+        """
+        :param the_ocx: None 이면 KiwoomOcx 를 만든다. 테스트에서는 FakeKiwoomOcx 를 넘긴다
+        :param the_recorder: 실시간 이벤트를 기록할 TickRecorder. None 이면 기록하지 않는다
+        """
         super().__init__()
         self.data_manager = the_data_manager
-        self.ocx = KiwoomOcx(self.data_manager)
-        self.tr_queue = queue.Queue()
-        self.handler = KiwoomEventHandler(self.data_manager, self.ocx, self.tr_queue, self.on_connect)
+        if the_ocx is None:
+            from sns_trade_bot.kiwoom.internal import KiwoomOcx
+            the_ocx = KiwoomOcx(self.data_manager)
+        self.ocx = the_ocx
+        self.tr_queue = TrScheduler()
+        self.requester = TrRequester(self.data_manager, self.ocx, self.tr_queue)
+        self.handler = KiwoomEventHandler(self.data_manager, self.ocx, self.requester, self.on_connect,
+                                          the_recorder)
         self.ocx.set_event_handler(self.handler)
 
         worker_thread = threading.Thread(target=self.worker_run)
@@ -37,13 +49,12 @@ class Kiwoom:
         logger.info('start worker_thread')
 
     def worker_run(self):
-        while True:
-            job = self.tr_queue.get()
-            logger.debug(f'{job.fn.__name__}{job.args}.')
-            ret = job()
-            logger.info(f'{job.fn.__name__}{job.args}. ret:{ret}')
-            time.sleep(0.2)
-            self.tr_queue.task_done()
+        self.tr_queue.run()
+
+    def get_tr_stats(self) -> dict:
+        """ TR 큐 길이 및 JobType 별 대기시간 통계
+        """
+        return self.tr_queue.get_stats()
 
     def tr_connect(self):
         job = Job(self.ocx.comm_connect)
@@ -56,116 +67,79 @@ class Kiwoom:
 
     def check_cond(self, cond: Condition):
         query_type = 0  # 일반조회
-        ret = self.ocx.send_condition(ScnNo.CONDITION.value, cond.name, cond.index, query_type)
-        logger.debug(f'send_condition(0). ret: {ret}')
+        self.requester.send_condition(ScnNo.CONDITION.value, cond, query_type)
 
     def register_cond_list(self, cond_list: List[Condition]):
         query_type = 1  # 실시간조회
         for cond in cond_list:
-            ret = self.ocx.send_condition(ScnNo.COND_REAL.value, cond.name, cond.index, query_type)
-            logger.debug(f'send_condition(1). ret: {ret}')
+            self.requester.send_condition(ScnNo.COND_REAL.value, cond, query_type)
 
-    def tr_multi_code_detail(self, the_code_list: List[str]):
+    def tr_multi_code_detail(self, the_code_list: List[str]) -> Future:
         """ 복수 종목에 대한 기본 정보 요청
         """
-        job = Job(self._request_multi_code_info, the_code_list)
-        logger.debug(f'tr_multi_code_detail(). put')
-        self.tr_queue.put(job)
-
-    def set_real_reg(self, the_code_list: List[str]):
-        code_list_str = ';'.join(the_code_list)
-        fid_list = "9001;10;13"  # 종목코드,업종코드;현재가;누적거래량
-        real_type = "0"  # 0: 최초 등록, 1: 같은 화면에 종목 추가
-        self.ocx.set_real_reg(ScnNo.REAL.value, code_list_str, fid_list, real_type)
+        return self.requester.multi_code_info(the_code_list)
 
-    def tr_account_detail(self):
-        job = Job(self._request_account_detail)
-        logger.debug(f'tr_account_detail(). put')
-        self.tr_queue.put(job)
+    def start_real(self):
+        """ HoldType.TARGET 종목 실시간 등록 시작. 이후 종목이 바뀌면 바뀐 종목만 등록/해제한다
+        """
+        self.handler.subscription.start()
 
-    def tr_code_info(self, the_code: str):
-        job = Job(self._request_code_info, the_code)
-        logger.debug(f'tr_code_info(). put')
-        self.tr_queue.put(job)
+    def tr_account_detail(self) -> Future:
+        return self.requester.account_detail()
 
-    def tr_today_earning(self):
-        job = Job(self._request_today_earning)
-        logger.debug(f'tr_code_info(). put')
-        self.tr_queue.put(job)
+    def tr_code_info(self, the_code: str) -> Future:
+        return self.requester.code_info(the_code)
 
-    def _request_today_earning(self):
-        logger.info(f'account: {self.data_manager.account}')
-        self.ocx.set_input_value('계좌번호', self.data_manager.account)
-        self.ocx.set_input_value('비밀번호', '')  # 사용안함(공백)
-        self.ocx.set_input_value('종목코드', '')  # 전문 조회할 종목코드
-        is_next = 0  # 연속조회요청 여부 (0:조회 , 2:연속)
-        return self.ocx.comm_rq_data(RqName.당일손익상세요청.value, TrCode.당일손익상세요청.value, is_next,
-                                     ScnNo.당일손익상세요청.value)
+    def tr_today_earning(self) -> Future:
+        return self.requester.today_earning()
 
     def tr_buy_order(self, the_code: str, the_qty: int):
+        """신호로 OrderBook 에 들어간 매수 주문을 보낸다. 신호 없이 부르면 (수동 주문) 주문을 새로 만든다"""
         logger.debug(f'tr_buy_order(). the_code:{the_code}, the_qty:{the_qty}')
+        order = self._take_order(the_code, OrderSide.BUY, the_qty)
         order_type = 1  # 신규매수
-        price = 0
-        hoga_gb = '03'  # 시장가
-        org_order_no = ''
-        job = Job(self.ocx.send_order, RqName.ORDER.value, ScnNo.ORDER.value, self.data_manager.account, order_type,
-                  the_code, the_qty, price, hoga_gb, org_order_no)
-        logger.debug(f'tr_buy_order(). put')
-        self.tr_queue.put(job)
+        self._send_order(order, order_type)
 
-        msg = f'Buy `{self.ocx.get_master_code_name(the_code)}`({the_code}) {the_qty}주'
-        send_msg_job = Job(MsgSender.send_msg, msg)
-        self.tr_queue.put(send_msg_job)
-        logger.debug(f'tr_buy_order(). put send_msg')
+        msg = f'Buy `{self.ocx.get_master_code_name(the_code)}`({the_code}) {order.qty}주'
+        MsgSender.send_msg(msg)
 
     def tr_sell_order(self, the_code: str, the_qty: int):
         logger.debug(f'tr_sell_order(). the_code:{the_code}, the_qty:{the_qty}')
+        order = self._take_order(the_code, OrderSide.SELL, the_qty)
         order_type = 2  # 신규매도
-        price = 0
-        hoga_gb = '03'  # 시장가
-        org_order_no = ''
-        job = Job(self.ocx.send_order, RqName.ORDER.value, ScnNo.ORDER.value, self.data_manager.account, order_type,
-                  the_code, the_qty, price, hoga_gb, org_order_no)
-        logger.debug(f'tr_sell_order(). put')
-        self.tr_queue.put(job)
+        self._send_order(order, order_type)
 
         stock = self.data_manager.get_stock(the_code)
-        msg = f'Sell `{self.ocx.get_master_code_name(the_code)}`({the_code}) {the_qty}주. buy:{stock.buy_price},' \
+        msg = f'Sell `{self.ocx.get_master_code_name(the_code)}`({the_code}) {order.qty}주. buy:{stock.buy_price},' \
               f' cur:{stock.cur_price} ({stock.earning_rate:.1f}%)'
-        send_msg_job = Job(MsgSender.send_msg, msg)
-        self.tr_queue.put(send_msg_job)
-        logger.debug(f'tr_sell_order(). put send_msg')
-
-    def _request_account_detail(self):
-        logger.info(f'account: {self.data_manager.account}')
-        self.ocx.set_input_value('계좌번호', self.data_manager.account)
-        self.ocx.set_input_value('비밀번호', '')  # 사용안함(공백)
-        self.ocx.set_input_value('상장폐지조회구분', '0')  # 0:전체, 1: 상장폐지종목제외
-        self.ocx.set_input_value('비밀번호입력매체구분', '00')  # 고정값?
-        tr_code = 'OPW00004'  # 계좌평가현황요청
-        is_next = 0  # 연속조회요청 여부 (0:조회 , 2:연속)
-        return self.ocx.comm_rq_data(RqName.BALANCE.value, tr_code, is_next, ScnNo.BALANCE.value)
-
-    def _request_code_info(self, the_code: str):
-        logger.info(f'code: {the_code}')
-        self.ocx.set_input_value('종목코드', the_code)
-        tr_code = 'opt10001'  # 주식기본정보요청
-        is_next = 0
-        return self.ocx.comm_rq_data(RqName.CODE_INFO.value, tr_code, is_next, ScnNo.CODE.value)
-
-    def _request_multi_code_info(self, the_code_list: List[str]):
-        logger.debug(f'the_code_list: {the_code_list}')
-        count = len(the_code_list)
-        if count == 0:
-            logger.error('code_list is empty!!')
-            return -1
-        code_list_str = ";".join(the_code_list)  # 종목리스트
-        is_next = 0  # 연속조회요청 여부
-        code_count = count  # 종목개수
-        type_flag = 0  # 조회구분 (0: 주식관심종목정보 , 선물옵션관심종목정보)
-        rq_name = RqName.INTEREST_CODE.value  # 사용자구분 명
-        scn_no = ScnNo.INTEREST.value  # 화면변호
-        return self.ocx.comm_kw_rq_data(code_list_str, is_next, code_count, type_flag, rq_name, scn_no)
+        MsgSender.send_msg(msg)
+
+    def _take_order(self, the_code: str, the_side: OrderSide, the_qty: int) -> Order:
+        order_book = self.data_manager.order_book
+        order = order_book.take_unsent(the_code, the_side)
+        if order is None:
+            order = order_book.add(the_code, the_side, the_qty)
+            order.is_sent = True
+        return order
+
+    def _send_order(self, the_order: Order, the_order_type: int):
+        price = 0
+        hoga_gb = '03'  # 시장가
+        org_order_no = ''
+        job = Job(self.ocx.send_order, get_order_rq_name(the_order.key), ScnNo.ORDER.value, self.data_manager.account,
+                  the_order_type, the_order.code, the_order.qty, price, hoga_gb, org_order_no, job_type=JobType.ORDER)
+        logger.debug(f'send_order(). put {the_order}')
+        future = self.tr_queue.put(job)
+        future.add_done_callback(lambda f: self._on_order_sent(the_order, f))
+
+    def _on_order_sent(self, the_order: Order, the_future: Future):
+        """TR 스레드에서 불린다. SendOrder 가 실패하면 주문번호 응답이 오지 않으므로 실패 처리한다.
+        OrderBook 변경은 DataManager listener / 변경 알림 타이머로 이어지므로 Qt 스레드에서 한다
+        """
+        ret = the_future.result() if the_future.exception() is None else None
+        if ret != ErrCode.OP_ERR_NONE.value:
+            logger.error(f'send_order failed. ret:{ret}, {the_order}')
+            self.handler.invoker.call(lambda: self.data_manager.order_book.reject(the_order, f'send_order ret:{ret}'))
 
     def on_connect(self):
         logger.info('on_connect!!')
@@ -177,20 +151,9 @@ class Kiwoom:
 
 
 if __name__ == "__main__":
+    from sns_trade_bot.log_setup import setup_logging
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
-    formatter = logging.Formatter(
-        '%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
-    LOG_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../../log")
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
-    file_name = LOG_DIR + "/" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".log"
-    file_handler = logging.FileHandler(file_name, "a", "utf-8")
-    stream_handler = logging.StreamHandler(sys.stdout)
-    file_handler.setFormatter(formatter)
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    setup_logging(logging.DEBUG, logging.DEBUG)
 
 
     class TempModelListener(ModelListener):
@@ -230,7 +193,7 @@ if __name__ == "__main__":
     kiwoom_manager.tr_multi_code_detail(input_code_list)
     event_loop.exec_()
 
-    kiwoom_manager.set_real_reg(input_code_list)
+    kiwoom_manager.start_real()
 
     time.sleep(2)
     logger.info('test done!')
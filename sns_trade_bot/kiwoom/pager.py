@@ -0,0 +1,78 @@
+import logging
+from typing import Callable, Dict, List
+
+from sns_trade_bot.kiwoom.common import RqName, TrCode, TrResultKey
+
+logger = logging.getLogger(__name__)
+
+
+class PageSpec:
+    def __init__(self, the_tr_code: TrCode, the_multi_record_name: str, the_key_list: List[str]):
+        self.tr_code = the_tr_code
+        self.multi_record_name = the_multi_record_name  # GetRepeatCnt() 에 사용하는 멀티데이터 레코드명
+        self.key_list = the_key_list
+
+
+PAGE_SPEC_DIC: Dict[str, PageSpec] = {
+    RqName.INTEREST_CODE.value: PageSpec(TrCode.관심종목정보요청, '관심종목정보', TrResultKey.INTEREST_CODE_MULTI),
+    RqName.BALANCE.value: PageSpec(TrCode.계좌평가현황요청, '종목별계좌평가현황', TrResultKey.BALANCE_MULTI),
+    RqName.CODE_INFO.value: PageSpec(TrCode.주식기본정보요청, '주식기본정보', TrResultKey.CODE_SINGLE),
+    RqName.당일손익상세요청.value: PageSpec(TrCode.당일손익상세요청, '당일실현손익상세', TrResultKey.TODAY_MULTI),
+}
+
+
+class TrPager:
+    """연속조회(pre_next=2) TR 의 다음 페이지를 요청하고, 수신한 페이지의 행을 돌려준다.
+
+    OpenAPI 는 화면번호마다 수신 버퍼가 하나라서, 같은 화면으로 다음 페이지를 요청하면 아직 읽지 않은 현재 페이지가
+    덮일 수 있다. 그래서 현재 페이지의 행을 모두 읽어둔 뒤에 다음 페이지를 TR 큐에 넣는다.
+    """
+    MAX_PAGE = 100  # 잘못된 pre_next 로 끝없이 요청하지 않도록 제한. 한 번의 조회에서 받는 최대 페이지 수
+
+    def __init__(self, the_ocx):
+        self.ocx = the_ocx
+        self.next_request_dic: Dict[str, Callable[[int], object]] = {}  # rq_name -> request(is_next)
+        self.page_dic: Dict[str, int] = {}  # rq_name -> 현재 페이지 번호 (0 부터)
+
+    def register(self, the_rq_name: str, the_request: Callable[[int], object]):
+        """
+        :param the_request: request(is_next) 형태로 TR 을 TR 큐에 넣는 함수
+        """
+        self.next_request_dic[the_rq_name] = the_request
+
+    def on_page(self, the_rq_name: str, the_tr_code: str, the_record_name: str, the_pre_next: str,
+                the_key_list: List[str] = None) -> List[Dict[str, str]]:
+        """on_receive_tr_data() 에서 호출. 현재 페이지의 행을 읽고, 다음 페이지가 있으면 그 뒤에 요청한다.
+
+        :param the_key_list: 읽을 항목. None 이면 PAGE_SPEC_DIC 의 모든 항목
+        """
+        spec = PAGE_SPEC_DIC[the_rq_name]
+        page = self.page_dic.get(the_rq_name, 0)
+        key_list = spec.key_list if the_key_list is None else the_key_list
+        count = self.ocx.get_repeat_cnt(the_tr_code, spec.multi_record_name)
+        logger.debug(f'{the_rq_name}: page {page}, count {count}, pre_next "{the_pre_next}"')
+        row_list = [{key: self.ocx.get_comm_data(the_tr_code, the_record_name, i, key) for key in key_list}
+                    for i in range(count)]
+        self.page_dic[the_rq_name] = 0
+        if self.has_next(the_pre_next):
+            if page + 1 >= self.MAX_PAGE:
+                logger.error(f'{the_rq_name}: too many pages ({page + 1}). stop requesting')
+            elif the_rq_name in self.next_request_dic:
+                logger.info(f'{the_rq_name}: request page {page + 1}')
+                self.page_dic[the_rq_name] = page + 1
+                self.next_request_dic[the_rq_name](2)
+            else:
+                logger.warning(f'{the_rq_name}: has next page but no request registered')
+        return row_list
+
+    def get_page(self, the_rq_name: str) -> int:
+        """수신 중인 페이지 번호 (on_page() 호출 전 기준). 연속조회가 아니면 0"""
+        return self.page_dic.get(the_rq_name, 0)
+
+    def is_last_page(self, the_rq_name: str) -> bool:
+        """on_page() 호출 뒤 기준. 다음 페이지를 요청하지 않았으면 (마지막 페이지 또는 MAX_PAGE) True"""
+        return self.page_dic.get(the_rq_name, 0) == 0
+
+    @staticmethod
+    def has_next(the_pre_next: str) -> bool:
+        return the_pre_next == '2'
@@ -0,0 +1,215 @@
+import logging
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional
+
+from sns_trade_bot.kiwoom.common import Fid
+
+logger = logging.getLogger(__name__)
+
+# 실시간 타입별 real_data 의 FID 순서 (KOA Studio 실시간 목록). real_data 는 이 순서의 값을 '\t' 로 이은 문자열이다
+# 목록 뒤에 FID 가 더 붙어 와도 앞부분의 위치는 그대로이므로 파싱할 수 있다
+REAL_FID_LAYOUT_DIC: Dict[str, List[int]] = {
+    '주식체결': [
+        Fid.체결시간, Fid.현재가, Fid.전일대비, Fid.등락율, Fid.최우선_매도호가, Fid.최우선_매수호가, Fid.거래량,
+        Fid.누적거래량, Fid.누적거래대금, Fid.시가, Fid.고가, Fid.저가, Fid.전일대비기호, Fid.전일거래량대비,
+        Fid.거래대금증감, Fid.전일거래량대비_비율, Fid.거래회전율, Fid.거래비용, Fid.체결강도, Fid.시가총액_억,
+        Fid.장구분, Fid.KO접근도, Fid.상한가발생시간, Fid.하한가발생시간,
+    ],
+    '장시작시간': [Fid.장운영구분, Fid.체결시간, Fid.장시작예상잔여시간],
+}
+
+
+def to_int(the_value: str) -> int:
+    return int(the_value) if the_value else 0
+
+
+def to_price(the_value: str) -> int:
+    """'+12340', '-12340' -> 12340. 부호는 기준가 대비 등락 표시"""
+    return abs(int(the_value)) if the_value else 0
+
+
+class StockTick:
+    """주식체결 한 건. RealParser 가 같은 객체를 다시 채워서 돌려주므로 다음 이벤트 전까지만 유효하다"""
+    __slots__ = ('time', 'price', 'volume', 'total_volume', 'ask', 'bid', 'real_data')
+
+    # (속성, FID, 변환 함수). fill() 은 이 순서의 값을 받는다
+    FIELD_LIST = [
+        ('time', Fid.체결시간, to_int),  # HHMMSS
+        ('price', Fid.현재가, to_price),
+        ('volume', Fid.거래량, to_int),  # +: 매수체결, -: 매도체결
+        ('total_volume', Fid.누적거래량, to_int),
+        ('ask', Fid.최우선_매도호가, to_price),
+        ('bid', Fid.최우선_매수호가, to_price),
+    ]
+
+    def __init__(self):
+        self.time = 0
+        self.price = 0
+        self.volume = 0
+        self.total_volume = 0
+        self.ask = 0
+        self.bid = 0
+        self.real_data = ''
+
+    def __str__(self):
+        return f'(time:{self.time}, price:{self.price}, volume:{self.volume}, total_volume:{self.total_volume}, ' \
+               f'ask:{self.ask}, bid:{self.bid})'
+
+    def fill(self, the_value_tuple):
+        """FIELD_LIST 를 풀어 쓴 것. 빈 값이 있으면 ValueError"""
+        time_str, price_str, volume_str, total_volume_str, ask_str, bid_str = the_value_tuple
+        self.time = int(time_str)
+        self.price = abs(int(price_str))
+        self.volume = int(volume_str)
+        self.total_volume = int(total_volume_str)
+        self.ask = abs(int(ask_str))
+        self.bid = abs(int(bid_str))
+
+
+class MarketTime:
+    """장시작시간 한 건"""
+    __slots__ = ('market_type', 'time', 'remained_time', 'real_data')
+
+    FIELD_LIST = [
+        ('market_type', Fid.장운영구분, to_int),  # 0:장시작전, 2:장마감전 동시호가, 3:장시작, 4:장마감 ...
+        ('time', Fid.체결시간, to_int),  # HHMMSS
+        ('remained_time', Fid.장시작예상잔여시간, to_int),
+    ]
+
+    def __init__(self):
+        self.market_type = 0
+        self.time = 0
+        self.remained_time = 0
+        self.real_data = ''
+
+    def __str__(self):
+        return f'(market_type:{self.market_type}, time:{self.time}, remained_time:{self.remained_time})'
+
+    def fill(self, the_value_tuple):
+        market_type_str, time_str, remained_time_str = the_value_tuple
+        self.market_type = int(market_type_str)
+        self.time = int(time_str)
+        self.remained_time = int(remained_time_str)
+
+
+REAL_RECORD_CLASS_DIC = {
+    '주식체결': StockTick,
+    '장시작시간': MarketTime,
+}
+
+
+class RealLayout:
+    def __init__(self, the_fid_list: List[int], the_record_class):
+        self.index_dic: Dict[int, int] = {int(fid): i for i, fid in enumerate(the_fid_list)}  # FID -> 위치
+        index_list = [self.index_dic[fid] for _, fid, _ in the_record_class.FIELD_LIST]
+        self.getter = itemgetter(*index_list)
+        # record 가 쓰는 (FID, 위치)
+        self.field_fid_list = [(int(fid), self.index_dic[fid]) for _, fid, _ in the_record_class.FIELD_LIST]
+        self.field_list = the_record_class.FIELD_LIST
+        self.min_count = max(index_list) + 1
+        self.record = the_record_class()
+
+
+class RealParser:
+    """real_data 를 한 번 split 해서 실시간 타입별 record 에 채운다.
+
+    OnReceiveRealData 의 real_data 에 이미 모든 FID 값이 들어있으므로, FID 마다 GetCommRealData() 를 호출하지 않아도 된다.
+    record 는 실시간 타입별로 하나씩 만들어두고 다시 쓴다. record 에 없는 FID 는 get_value() 로 읽는다.
+    """
+
+    def __init__(self, the_layout_dic: Dict[str, List[int]] = None):
+        layout_dic = the_layout_dic if the_layout_dic is not None else REAL_FID_LAYOUT_DIC
+        self.layout_dic: Dict[str, RealLayout] = {
+            real_type: RealLayout(fid_list, REAL_RECORD_CLASS_DIC[real_type])
+            for real_type, fid_list in layout_dic.items()}
+
+    def parse(self, the_real_type: str, the_real_data: str):
+        """
+        :return: StockTick, MarketTime 등. 모르는 실시간 타입이거나 값 개수가 모자라면 None
+        """
+        layout = self.layout_dic.get(the_real_type)
+        if layout is None:
+            return None
+        value_list = the_real_data.split('\t', layout.min_count)  # 필요한 곳까지만 나눈다
+        if len(value_list) < layout.min_count:
+            logger.warning(f'unexpected real_data. real_type:"{the_real_type}", count:{len(value_list)}')
+            return None
+        record = layout.record
+        value_tuple = layout.getter(value_list)
+        try:
+            record.fill(value_tuple)
+        except ValueError:  # 빈 값
+            for (attr, _, convert), value in zip(layout.field_list, value_tuple):
+                setattr(record, attr, convert(value))
+        record.real_data = the_real_data
+        return record
+
+    def parse_by_fid(self, the_real_type: str, the_get_fn: Callable[[int], str]):
+        """real_data 를 쓸 수 없을 때 record 가 쓰는 FID 만 the_get_fn (GetCommRealData) 으로 채운다.
+        나머지 FID 는 빈 값이므로 이후 get_value() 는 '' 를 돌려준다
+        """
+        layout = self.layout_dic[the_real_type]
+        value_list = [''] * len(layout.index_dic)
+        for fid, index in layout.field_fid_list:
+            value_list[index] = the_get_fn(fid)
+        return self.parse(the_real_type, '\t'.join(value_list))
+
+    def get_value(self, the_real_type: str, the_fid: int) -> Optional[str]:
+        """마지막으로 파싱한 real_data 의 FID 값 (문자열)"""
+        layout = self.layout_dic[the_real_type]
+        index = layout.index_dic.get(the_fid)
+        if index is None:
+            return None
+        value_list = layout.record.real_data.split('\t')
+        return value_list[index] if index < len(value_list) else None
+
+
+def format_real_data(the_real_type: str, the_real_dic: Dict[int, str]) -> str:
+    """{FID: 값} -> OpenAPI 와 같은 순서의 real_data. FakeKiwoomOcx 와 벤치마크에서 쓴다"""
+    fid_list = REAL_FID_LAYOUT_DIC.get(the_real_type)
+    if fid_list is None:
+        return '\t'.join(the_real_dic.values())
+    return '\t'.join(the_real_dic.get(int(fid), '') for fid in fid_list)
+
+
+FID_NAME_DIC: Dict[int, str] = {fid.value: fid.name for fid in Fid}  # 로그용 FID 이름
+
+
+class ChejanRecord:
+    """OnReceiveChejanData 한 건. FID 값은 처음 읽을 때 GetChejanData() 로 가져와서 저장해둔다.
+
+    같은 FID 를 여러 번 읽어도 COM 호출은 한 번이고, 로그나 기록이 필요할 때만 나머지 FID 를 읽는다.
+    """
+
+    def __init__(self, the_get_fn: Callable[[int], str], the_fid_list_str: str):
+        """
+        :param the_get_fn: get_chejan_data(fid)
+        :param the_fid_list_str: 이벤트로 받은 FID list (';' 로 구분)
+        """
+        self.get_fn = the_get_fn
+        self.fid_list_str = the_fid_list_str
+        self.value_dic: Dict[int, str] = {}
+
+    def get(self, the_fid: int) -> str:
+        value = self.value_dic.get(the_fid)
+        if value is None:
+            value = self.value_dic[the_fid] = self.get_fn(the_fid)
+        return value
+
+    def get_int(self, the_fid: int) -> int:
+        return to_int(self.get(the_fid).strip())
+
+    def get_fid_list(self) -> List[int]:
+        return [int(fid_str) for fid_str in self.fid_list_str.split(';') if fid_str]
+
+    def get_fetched_dic(self) -> Dict[int, str]:
+        """지금까지 읽은 FID 값. COM 호출을 더 하지 않는다"""
+        return dict(self.value_dic)
+
+    def get_dic(self) -> Dict[int, str]:
+        """이벤트의 모든 FID 값. 아직 읽지 않은 FID 는 이때 읽는다"""
+        return {fid: self.get(fid) for fid in self.get_fid_list()}
+
+    def dump(self, the_logger: logging.Logger):
+        for fid, value in self.get_dic().items():
+            the_logger.debug(f'  {FID_NAME_DIC.get(fid, "UNKNOWN")}({fid}): "{value}"')
@@ -0,0 +1,181 @@
+import datetime
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+TICK_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../tick')
+
+# 레코드 하나 24 byte: 종목 id, 실시간 타입, 체결시간(HHMMSS), 가격, 거래량, 수신시각(ns)
+# 장시작시간 레코드는 가격에 장운영구분, 거래량에 장시작예상잔여시간을 넣는다
+TICK_STRUCT = struct.Struct('<HHIiiq')
+TICK_FIELD_LIST = [('code_id', '<u2'), ('real_type', '<u2'), ('time', '<u4'), ('price', '<i4'), ('volume', '<i4'),
+                   ('recv_ns', '<i8')]
+REAL_TYPE_LIST = ['주식체결', '장시작시간']
+REAL_TYPE_ID_DIC = {real_type: i for i, real_type in enumerate(REAL_TYPE_LIST)}
+
+
+def get_tick_path(the_dir: str, the_date_str: str) -> Tuple[str, str]:
+    """(tick 파일, 종목코드 파일) 경로. 종목코드 파일의 n 번째 줄이 code_id n 의 종목코드"""
+    return os.path.join(the_dir, f'{the_date_str}.tick'), os.path.join(the_dir, f'{the_date_str}.code')
+
+
+def get_event_path(the_tick_path: str) -> str:
+    """tick 파일과 같은 날의 체결/조건검색 이벤트 파일 (JSON lines)"""
+    return os.path.splitext(the_tick_path)[0] + '.jsonl'
+
+
+def load_events(the_event_path: str) -> List[dict]:
+    if not os.path.exists(the_event_path):
+        return []
+    event_list = []
+    with open(the_event_path, encoding='utf8') as f:
+        for line in f:
+            try:
+                event_list.append(json.loads(line))
+            except ValueError:  # 쓰다가 죽은 마지막 줄
+                logger.warning(f'invalid line: "{line.strip()}"')
+    return event_list
+
+
+def load_ticks(the_tick_path: str):
+    """tick 파일을 복사 없이 numpy structured array (memmap) 로 읽는다.
+
+    :return: (array, code_list). 기록 중인 파일이면 마지막의 불완전한 레코드는 제외한다
+    """
+    import numpy as np
+    dtype = np.dtype(TICK_FIELD_LIST)
+    count = os.path.getsize(the_tick_path) // dtype.itemsize
+    code_path = os.path.splitext(the_tick_path)[0] + '.code'
+    with open(code_path, encoding='utf8') as f:
+        code_list = [line.rstrip('\n') for line in f]
+    if count == 0:
+        return np.zeros(0, dtype=dtype), code_list
+    return np.memmap(the_tick_path, dtype=dtype, mode='r', shape=(count,)), code_list
+
+
+class TickRecorder:
+    """실시간 이벤트를 거래일별 고정 길이 바이너리 파일에 추가한다.
+
+    record() 는 버퍼에 쓰기만 하고, fsync 는 별도 스레드가 FSYNC_INTERVAL 마다 한다.
+    종목코드는 파일마다 0 부터 id 를 붙여 .code 파일에 한 줄씩 기록한다.
+    자주 오지 않는 체결 / 조건검색 이벤트는 record_event() 로 .jsonl 파일에 기록한다.
+    """
+    FSYNC_INTERVAL = 1.0  # unit: sec
+    BUFFER_SIZE = 1 << 20
+
+    def __init__(self, the_dir: str = TICK_DIR, the_fsync_interval: float = FSYNC_INTERVAL,
+                 the_clock: Callable[[], int] = time.time_ns):
+        self.dir = the_dir
+        self.fsync_interval = the_fsync_interval
+        self.clock = the_clock
+        self.lock = threading.Lock()
+        self.tick_file = None
+        self.code_file = None
+        self.event_file = None
+        self.next_day_ns = 0  # 이 시각이 지나면 다음 거래일 파일을 연다
+        self.code_id_dic: Dict[str, int] = {}
+        self.record_count = 0
+        os.makedirs(self.dir, exist_ok=True)
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run_fsync, name='tick_recorder')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def record(self, the_code: str, the_real_type: str, the_time: int, the_price: int, the_volume: int):
+        recv_ns = self.clock()
+        with self.lock:
+            if recv_ns >= self.next_day_ns:
+                self._open(recv_ns)
+            code_id = self.code_id_dic.get(the_code)
+            if code_id is None:
+                code_id = self._add_code(the_code)
+            self.tick_file.write(TICK_STRUCT.pack(code_id, REAL_TYPE_ID_DIC[the_real_type], the_time, the_price,
+                                                  the_volume, recv_ns))
+            self.record_count += 1
+
+    def record_event(self, the_kind: str, the_dic: dict):
+        """
+        :param the_kind: 'chejan', 'tr_condition', 'real_condition'
+        :param the_dic: EventHandler 메소드의 인자
+        """
+        recv_ns = self.clock()
+        line = json.dumps({'kind': the_kind, 'recv_ns': recv_ns, **the_dic}, ensure_ascii=False)
+        with self.lock:
+            if recv_ns >= self.next_day_ns:
+                self._open(recv_ns)
+            self.event_file.write(line + '\n')
+
+    def flush(self):
+        """버퍼를 비우고 fsync 한다"""
+        with self.lock:
+            if self.tick_file is None:
+                return
+            file_list = [self.code_file, self.tick_file, self.event_file]
+            for file in file_list:
+                file.flush()
+            fd_list = [file.fileno() for file in file_list]
+        try:
+            for fd in fd_list:
+                os.fsync(fd)
+        except OSError as e:  # 그 사이 다음 거래일 파일로 바뀌어 닫힌 경우
+            logger.debug(f'fsync skipped. {e}')
+
+    def close(self):
+        self.stop_event.set()
+        self.flush()
+        with self.lock:
+            self._close()
+
+    def _open(self, the_recv_ns: int):
+        self._close()
+        date = datetime.datetime.fromtimestamp(the_recv_ns / 1e9).date()
+        next_day = datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time())
+        self.next_day_ns = int(next_day.timestamp() * 1e9)
+        tick_path, code_path = get_tick_path(self.dir, date.strftime('%Y%m%d'))
+        self.code_id_dic = {}
+        if os.path.exists(code_path):  # 같은 날 재시작한 경우 이어서 기록
+            with open(code_path, encoding='utf8') as f:
+                self.code_id_dic = {line.rstrip('\n'): i for i, line in enumerate(f)}
+        self.code_file = open(code_path, 'a', encoding='utf8')
+        self.tick_file = open(tick_path, 'ab', buffering=self.BUFFER_SIZE)
+        self.event_file = open(get_event_path(tick_path), 'a', encoding='utf8')
+        self._truncate_partial(tick_path)
+        logger.info(f'tick_path: {tick_path}, code count: {len(self.code_id_dic)}')
+
+    def _truncate_partial(self, the_tick_path: str):
+        """비정상 종료로 남은 불완전한 마지막 레코드를 잘라낸다"""
+        size = os.path.getsize(the_tick_path)
+        remained = size % TICK_STRUCT.size
+        if remained:
+            logger.warning(f'truncate {remained} bytes of partial record')
+            self.tick_file.truncate(size - remained)
+
+    def _add_code(self, the_code: str) -> int:
+        code_id = len(self.code_id_dic)
+        self.code_id_dic[the_code] = code_id
+        self.code_file.write(f'{the_code}\n')
+        return code_id
+
+    def _close(self):
+        if self.tick_file is not None:
+            self.tick_file.close()
+            self.code_file.close()
+            self.event_file.close()
+            self.tick_file = None
+            self.code_file = None
+            self.event_file = None
+            self.next_day_ns = 0
+
+    def _run_fsync(self):
+        while not self.stop_event.wait(self.fsync_interval):
+            try:
+                self.flush()
+            except Exception as e:  # fsync 스레드는 죽지 않아야 함
+                logger.exception(f'unexpected error: {e}')
@@ -0,0 +1,237 @@
+import argparse
+import contextlib
+import datetime
+import heapq
+import logging
+import queue
+import sys
+import time
+from typing import Iterator, Tuple
+
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.kiwoom.common import Fid
+from sns_trade_bot.kiwoom.event import KiwoomEventHandler
+from sns_trade_bot.kiwoom.fake import FakeKiwoomOcx
+from sns_trade_bot.kiwoom.recorder import REAL_TYPE_LIST, get_event_path, load_events, load_ticks
+from sns_trade_bot.kiwoom.request import TrRequester
+from sns_trade_bot.kiwoom.scheduler import TrScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayDataManager(DataManager):
+    """리플레이 결과로 저장 파일을 덮어쓰지 않도록 save() 를 하지 않고, journal 에도 쓰지 않는다"""
+
+    def save(self):
+        logger.info('skip save in replay')
+
+    def load(self):
+        super().load()
+        self.journal.enabled = False
+
+
+class MutedNotifier:
+    """리플레이 중 slack 메시지를 보내지 않고 로그만 남긴다"""
+
+    def send(self, payload: dict):
+        logger.info(f'muted slack message. blocks:{len(payload.get("blocks", []))}')
+
+    def flush(self):
+        pass
+
+
+class ReplayStat:
+    def __init__(self):
+        self.event_count = 0  # 기록에서 읽어 전달한 이벤트 수
+        self.dispatch_count = 0  # 핸들러가 요청한 TR 응답 등을 포함해 전달한 이벤트 수
+        self.virtual_time = 0.0  # unit: sec
+        self.wall_time = 0.0  # unit: sec
+
+    def get_events_per_sec(self) -> float:
+        return self.event_count / self.wall_time if self.wall_time > 0 else 0.0
+
+    def __str__(self):
+        return f'events:{self.event_count}, dispatched:{self.dispatch_count}, virtual:{self.virtual_time:.1f}s, ' \
+               f'wall:{self.wall_time:.3f}s, {self.get_events_per_sec():.0f} events/s'
+
+
+class ReplayEngine:
+    """TickRecorder 로 기록한 하루치 이벤트를 FakeKiwoomOcx 를 통해 KiwoomEventHandler 로 다시 보낸다.
+
+    시계는 첫 이벤트의 수신시각을 0 으로 하는 가상 시계이고, 핸들러의 타이머와 TR 응답도 이 시계를 따른다.
+    speed 가 1 이면 기록된 속도로, N 이면 N 배속으로, 0 이면 기다리지 않고 최대한 빠르게 보낸다.
+    """
+
+    def __init__(self, the_tick_path: str, the_speed: float = 0.0, the_data_manager: DataManager = None,
+                 the_replay_chejan: bool = True, the_mute_slack: bool = True):
+        """
+        :param the_replay_chejan: True 면 기록된 체결 이벤트를 보내고, 리플레이 중 낸 주문은 체결시키지 않는다.
+            False 면 기록된 체결 이벤트 대신 FakeKiwoomOcx 가 리플레이 가격으로 주문을 체결시킨다.
+        :param the_mute_slack: True 면 run() 동안 slack 메시지를 보내지 않고 로그만 남긴다
+        """
+        self.tick_path = the_tick_path
+        self.is_slack_muted = the_mute_slack
+        self.speed = the_speed
+        self.replay_chejan = the_replay_chejan
+        self.data_manager = the_data_manager if the_data_manager is not None else ReplayDataManager()
+        self.ocx = FakeKiwoomOcx(self.data_manager)
+        self.ocx.fill_order = not the_replay_chejan
+        self.tr_queue = TrScheduler(the_clock=self.ocx.clock, the_sleep=self.ocx.advance)
+        self.requester = TrRequester(self.data_manager, self.ocx, self.tr_queue)
+        self.handler = KiwoomEventHandler(self.data_manager, self.ocx, self.requester, self._on_connect,
+                                          the_single_shot=self._single_shot, the_clock=self.ocx.get_sec_of_day)
+        self.ocx.set_event_handler(self.handler)
+        self.stat = ReplayStat()
+
+    def run(self) -> ReplayStat:
+        with mute_slack() if self.is_slack_muted else contextlib.nullcontext():
+            return self._run()
+
+    def _run(self) -> ReplayStat:
+        tick_array, code_list = load_ticks(self.tick_path)
+        event_list = load_events(get_event_path(self.tick_path))
+        logger.info(f'ticks:{len(tick_array)}, events:{len(event_list)}, codes:{len(code_list)}')
+        if len(tick_array) == 0 and not event_list:
+            return self.stat
+        self._init_market(tick_array, code_list)
+
+        stream = heapq.merge(self._iter_ticks(tick_array, code_list), self._iter_events(event_list))
+        start_ns = None
+        wall_start = time.perf_counter()
+        for recv_ns, _, fire, args in stream:
+            if start_ns is None:
+                start_ns = recv_ns
+                self.ocx.START_TIME = self._get_sec_of_day(recv_ns)
+                self.handler.session.start()  # 기록 시작 전의 세션 이벤트는 건너뛴다
+            virtual_time = (recv_ns - start_ns) / 1e9
+            self.ocx.run_until(virtual_time)  # 그 사이 핸들러가 요청한 TR 응답, 타이머
+            self._run_tr_queue()
+            if self.speed > 0:
+                delay = wall_start + virtual_time / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            fire(*args)
+            self.stat.event_count += 1
+
+        # 기록이 끝난 뒤의 세션 이벤트는 실행하지 않고, 남은 TR 응답 / 타이머만 처리
+        self.handler.session.stop()
+        self.stat.virtual_time = self.ocx.now
+        while self.tr_queue.qsize() or self.ocx.pending_count():
+            if self.tr_queue.qsize():
+                self.tr_queue.run_once()
+            self.ocx.run()
+        self.stat.wall_time = time.perf_counter() - wall_start
+        self.stat.dispatch_count = self.ocx.dispatch_count
+        logger.info(f'replay done. {self.stat}')
+        return self.stat
+
+    def _init_market(self, the_tick_array, the_code_list):
+        """기록된 첫 가격으로 FakeKiwoomOcx 의 종목을 만든다 (TR 조회 / 주문 체결에 사용)"""
+        is_tick = the_tick_array['real_type'] == REAL_TYPE_LIST.index('주식체결')
+        code_id_list = the_tick_array['code_id'][is_tick].tolist()
+        price_list = the_tick_array['price'][is_tick].tolist()
+        for code_id, price in zip(code_id_list, price_list):
+            code = the_code_list[code_id]
+            if code not in self.ocx.stock_dic:
+                self.ocx.add_stock(code, code, abs(price))
+
+    def _iter_ticks(self, the_tick_array, the_code_list) -> Iterator[Tuple]:
+        column_list = [the_tick_array[name].tolist() for name in ('recv_ns', 'code_id', 'real_type', 'time',
+                                                                  'price', 'volume')]
+        for i, (recv_ns, code_id, real_type_id, time_int, price, volume) in enumerate(zip(*column_list)):
+            code = the_code_list[code_id]
+            real_type = REAL_TYPE_LIST[real_type_id]
+            if real_type == '주식체결':
+                real_dic = {Fid.체결시간.value: f'{time_int:06d}', Fid.현재가.value: str(price),
+                            Fid.거래량.value: str(volume)}
+            else:
+                real_dic = {Fid.장운영구분.value: str(price), Fid.체결시간.value: f'{time_int:06d}',
+                            Fid.장시작예상잔여시간.value: f'{volume:06d}'}
+            yield recv_ns, (0, i), self._fire_real_data, (code, real_type, real_dic)
+
+    def _iter_events(self, the_event_list) -> Iterator[Tuple]:
+        for i, event in enumerate(the_event_list):
+            kind = event['kind']
+            if kind == 'chejan':
+                if not self.replay_chejan:
+                    continue
+                fid_dic = {int(fid): value for fid, value in event['fid_dic'].items()}
+                yield event['recv_ns'], (1, i), self.ocx.fire_chejan, (event['gubun'], fid_dic,
+                                                                       event.get('fid_list'))
+            elif kind == 'tr_condition':
+                yield event['recv_ns'], (1, i), self.ocx.dispatch, (
+                    'on_receive_tr_condition', event['scr_no'], event['code_list_str'], event['cond_name'],
+                    event['index'], event['has_next'])
+            elif kind == 'real_condition':
+                yield event['recv_ns'], (1, i), self.ocx.dispatch, (
+                    'on_receive_real_condition', event['code'], event['event_type'], event['cond_name'],
+                    event['cond_index'])
+            else:
+                logger.warning(f'unknown event kind "{kind}"')
+
+    def _fire_real_data(self, the_code: str, the_real_type: str, the_real_dic: dict):
+        if the_real_type == '주식체결':
+            stock = self.ocx.stock_dic.get(the_code)
+            if stock is not None:
+                stock.price = abs(int(the_real_dic[Fid.현재가.value]))
+        self.ocx.fire_real_data(the_code, the_real_type, the_real_dic)
+
+    def _run_tr_queue(self):
+        """지금 보낼 수 있는 TR 만 보낸다. 요청 제한으로 기다려야 하면 다음 이벤트 때 다시 시도"""
+        while True:
+            try:
+                self.tr_queue.run_once(timeout=0)
+            except queue.Empty:
+                return
+
+    def _single_shot(self, the_msec: int, the_fn):
+        self.ocx.schedule(the_msec / 1000, the_fn)
+
+    def _on_connect(self):
+        pass
+
+    @staticmethod
+    def _get_sec_of_day(the_ns: int) -> int:
+        dt = datetime.datetime.fromtimestamp(the_ns / 1e9)
+        return dt.hour * 3600 + dt.minute * 60 + dt.second
+
+
+@contextlib.contextmanager
+def mute_slack():
+    """그 동안 MsgSender 가 slack 대신 MutedNotifier 로 보내게 하고, 끝나면 원래 notifier 로 되돌린다"""
+    try:
+        from sns_trade_bot.slack.webhook import MsgSender
+    except ImportError as e:  # webhook 설정 (keys) 이 없으면 보낼 수도 없다
+        logger.info(f'slack is not configured. {e}')
+        yield
+        return
+    with MsgSender.notifier_lock:
+        notifier, MsgSender.notifier = MsgSender.notifier, MutedNotifier()
+    try:
+        yield
+    finally:
+        with MsgSender.notifier_lock:
+            MsgSender.notifier = notifier
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='기록된 실시간 이벤트를 KiwoomEventHandler 로 다시 보낸다')
+    parser.add_argument('tick_path', help='tick/YYYYMMDD.tick')
+    parser.add_argument('--speed', type=float, default=0.0, help='1: 기록된 속도, N: N 배속, 0: 최대 속도')
+    parser.add_argument('--load', action='store_true', help='my_stock_list.json 의 종목/전략을 불러와서 시작')
+    parser.add_argument('--fill', action='store_true', help='기록된 체결 대신 리플레이 가격으로 주문 체결')
+    args = parser.parse_args()
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    formatter = logging.Formatter(
+        '%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(formatter)
+    logger.addHandler(stream_handler)
+
+    data_manager = ReplayDataManager()
+    if args.load:
+        data_manager.load()
+    engine = ReplayEngine(args.tick_path, args.speed, data_manager, not args.fill)
+    print(engine.run())
@@ -0,0 +1,149 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+from sns_trade_bot.model.data_manager import DataManager, DataType
+from sns_trade_bot.model.condition import Condition
+from sns_trade_bot.kiwoom.common import Job, JobType, RqName, ScnNo, TrCode, INTEREST_SCN_NO_LIST, MAX_KW_CODE_COUNT
+
+logger = logging.getLogger(__name__)
+
+
+def merge_code_list(the_pending_job: Job, the_new_job: Job):
+    """대기 중인 복수종목 조회에 새 종목들을 합친다 (중복 제거, 순서 유지)"""
+    code_list = the_pending_job.args[0]
+    code_set = set(code_list)
+    for code in the_new_job.args[0]:
+        if code not in code_set:
+            code_list.append(code)
+            code_set.add(code)
+
+
+class TrRequester:
+    """TR 요청을 Job 으로 만들어 TR 큐에 넣는다.
+
+    Job 의 key 는 TR 코드 + 입력값이다. 같은 요청이 아직 큐에 있으면 새로 넣지 않고 기존 Job 의 future 를 돌려준다.
+    future 는 OpenAPI 호출의 반환값으로 완료된다.
+    """
+
+    def __init__(self, the_data_manager, the_ocx, the_tr_queue):
+        self.data_manager: DataManager = the_data_manager
+        self.ocx = the_ocx
+        self.tr_queue = the_tr_queue
+        self.interest_lock = threading.Lock()
+        self.interest_remained_count = 0  # 응답을 기다리는 관심종목정보요청 chunk 수
+        self.post: Optional[Callable[[Callable], None]] = None  # TR 스레드의 콜백을 Qt 스레드에서 실행. MainThreadInvoker.call
+
+    def account_detail(self, the_is_next: int = 0) -> Future:
+        """
+        :param the_is_next: 연속조회요청 여부 (0:조회 , 2:연속)
+        """
+        account = self.data_manager.account
+        job = Job(self._request_account_detail, account, the_is_next, job_type=JobType.QUERY,
+                  key=(TrCode.계좌평가현황요청.value, account, the_is_next))
+        logger.debug(f'account_detail(). put')
+        return self.tr_queue.put(job)
+
+    def code_info(self, the_code: str) -> Future:
+        job = Job(self._request_code_info, the_code, job_type=JobType.QUERY,
+                  key=(TrCode.주식기본정보요청.value, the_code))
+        logger.debug(f'code_info(). put')
+        return self.tr_queue.put(job)
+
+    def multi_code_info(self, the_code_list: List[str]) -> Future:
+        """ 복수 종목에 대한 기본 정보 요청. 대기 중인 요청이 있으면 종목을 합친다.
+
+        실행 시 MAX_KW_CODE_COUNT 개씩 나눠 화면번호를 돌려가며 요청하고, future 는 나눈 chunk 수로 완료된다.
+        """
+        job = Job(self._request_multi_code_info, list(the_code_list), key=(TrCode.관심종목정보요청.value,),
+                  merge=merge_code_list)
+        logger.debug(f'multi_code_info(). put')
+        return self.tr_queue.put(job)
+
+    def today_earning(self, the_is_next: int = 0) -> Future:
+        """
+        :param the_is_next: 연속조회요청 여부 (0:조회 , 2:연속)
+        """
+        account = self.data_manager.account
+        job = Job(self._request_today_earning, account, the_is_next, job_type=JobType.QUERY,
+                  key=(TrCode.당일손익상세요청.value, account, the_is_next))
+        logger.debug(f'today_earning(). put')
+        return self.tr_queue.put(job)
+
+    def send_condition(self, the_scn_no: str, the_cond: Condition, the_query_type: int) -> Future:
+        """
+        :param the_query_type: 조회구분(0:일반조회, 1:실시간조회, 2:연속조회)
+        """
+        job = Job(self.ocx.send_condition, the_scn_no, the_cond.name, the_cond.index, the_query_type,
+                  job_type=JobType.CONDITION, key=(the_scn_no, the_cond.index, the_query_type))
+        logger.debug(f'send_condition(). put')
+        return self.tr_queue.put(job)
+
+    def _request_account_detail(self, the_account: str, the_is_next: int):
+        logger.info(f'account: {the_account}')
+        self.ocx.set_input_value('계좌번호', the_account)
+        self.ocx.set_input_value('비밀번호', '')  # 사용안함(공백)
+        self.ocx.set_input_value('상장폐지조회구분', '0')  # 0:전체, 1: 상장폐지종목제외
+        self.ocx.set_input_value('비밀번호입력매체구분', '00')  # 고정값?
+        return self.ocx.comm_rq_data(RqName.BALANCE.value, TrCode.계좌평가현황요청.value, the_is_next,
+                                     ScnNo.BALANCE.value)
+
+    def _request_code_info(self, the_code: str):
+        logger.info(f'code: {the_code}')
+        self.ocx.set_input_value('종목코드', the_code)
+        is_next = 0
+        return self.ocx.comm_rq_data(RqName.CODE_INFO.value, TrCode.주식기본정보요청.value, is_next, ScnNo.CODE.value)
+
+    def on_interest_chunk_received(self) -> bool:
+        """관심종목정보요청 chunk 하나의 처리가 끝났음을 알린다. 마지막 chunk 이면 True
+        """
+        with self.interest_lock:
+            self.interest_remained_count = max(0, self.interest_remained_count - 1)
+            return self.interest_remained_count == 0
+
+    def _request_multi_code_info(self, the_code_list: List[str]):
+        logger.debug(f'the_code_list: {the_code_list}')
+        count = len(the_code_list)
+        if count == 0:
+            logger.error('code_list is empty!!')
+            return -1
+        chunk_list = [the_code_list[i:i + MAX_KW_CODE_COUNT] for i in range(0, count, MAX_KW_CODE_COUNT)]
+        with self.interest_lock:
+            self.interest_remained_count += len(chunk_list)
+        for i, chunk in enumerate(chunk_list):
+            scn_no = INTEREST_SCN_NO_LIST[i % len(INTEREST_SCN_NO_LIST)]
+            future = self.tr_queue.put(Job(self._request_interest_chunk, chunk, scn_no, job_type=JobType.QUERY))
+            future.add_done_callback(self._on_interest_chunk_sent)
+        logger.info(f'{count} codes -> {len(chunk_list)} chunks')
+        return len(chunk_list)
+
+    def _request_interest_chunk(self, the_code_list: List[str], the_scn_no: str):
+        code_list_str = ";".join(the_code_list)  # 종목리스트
+        is_next = 0  # 연속조회요청 여부
+        code_count = len(the_code_list)  # 종목개수
+        type_flag = 0  # 조회구분 (0: 주식관심종목정보 , 선물옵션관심종목정보)
+        rq_name = RqName.INTEREST_CODE.value  # 사용자구분 명
+        return self.ocx.comm_kw_rq_data(code_list_str, is_next, code_count, type_flag, rq_name, the_scn_no)
+
+    def _on_interest_chunk_sent(self, the_future: Future):
+        ret = the_future.exception() or the_future.result()
+        if ret != 0:
+            # 응답이 오지 않으므로 처리가 끝난 것으로 본다
+            logger.error(f'failed to request interest chunk. ret:{ret}')
+            if self.on_interest_chunk_received():  # 마지막 chunk 이면 받은 chunk 들로 갱신한다
+                self._call_on_owner(lambda: self.data_manager.set_updated(DataType.TABLE_BALANCE))
+
+    def _call_on_owner(self, the_fn: Callable[[], None]):
+        if self.post is None:
+            the_fn()
+        else:
+            self.post(the_fn)
+
+    def _request_today_earning(self, the_account: str, the_is_next: int):
+        logger.info(f'account: {the_account}')
+        self.ocx.set_input_value('계좌번호', the_account)
+        self.ocx.set_input_value('비밀번호', '')  # 사용안함(공백)
+        self.ocx.set_input_value('종목코드', '')  # 전문 조회할 종목코드
+        return self.ocx.comm_rq_data(RqName.당일손익상세요청.value, TrCode.당일손익상세요청.value, the_is_next,
+                                     ScnNo.당일손익상세요청.value)
@@ -0,0 +1,293 @@
+import collections
+import logging
+from concurrent.futures import Future
+from functools import partial
+import queue
+import threading
+import time
+from typing import Deque, Dict, List, Tuple
+
+from sns_trade_bot.kiwoom.common import Job, JobType, JobPriority, ErrCode
+
+logger = logging.getLogger(__name__)
+
+# 키움 OpenAPI 요청 제한. JobType 별 (허용횟수, 기간(초)) 목록
+RATE_LIMIT_DIC: Dict[JobType, List[Tuple[int, float]]] = {
+    JobType.QUERY: [(5, 1.0), (100, 60.0)],  # 조회: 1초 5회, 1분 100회
+    JobType.ORDER: [(5, 1.0)],  # 주문: 1초 5회
+    JobType.CONDITION: [(1, 1.0), (20, 60.0)],  # 조건검색: 1초 1회, 1분 20회
+}
+
+OVERFLOW_ERR_LIST = [ErrCode.OP_ERR_SISE_OVERFLOW, ErrCode.OP_ERR_ORD_OVERFLOW]
+
+
+class TokenBucket:
+    """period 초 동안 capacity 개의 토큰을 균등하게 채워 넣는 버킷"""
+
+    def __init__(self, the_capacity: int, the_period: float, the_clock=time.monotonic):
+        self.capacity = the_capacity
+        self.rate = the_capacity / the_period  # 초당 채워지는 토큰 수
+        self.clock = the_clock
+        self.tokens: float = float(the_capacity)
+        self.updated_time: float = the_clock()
+
+    def _refill(self, now: float):
+        if now > self.updated_time:
+            self.tokens = min(float(self.capacity), self.tokens + (now - self.updated_time) * self.rate)
+            self.updated_time = now
+
+    def get_wait_time(self) -> float:
+        """토큰 1개를 얻기 위해 기다려야 하는 시간(초). 바로 사용 가능하면 0"""
+        self._refill(self.clock())
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill(self.clock())
+        self.tokens -= 1.0
+
+    def drain(self):
+        self._refill(self.clock())
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """초당/분당 제한을 동시에 지키기 위해 여러 TokenBucket 을 묶고, 과부하 응답 시 지수적으로 대기한다"""
+    BACK_OFF_BASE = 1.0  # unit: sec
+    BACK_OFF_MAX = 60.0  # unit: sec
+
+    def __init__(self, the_limit_list: List[Tuple[int, float]], the_clock=time.monotonic):
+        self.clock = the_clock
+        self.bucket_list = [TokenBucket(capacity, period, the_clock) for capacity, period in the_limit_list]
+        self.blocked_until: float = 0.0
+        self.back_off_count: int = 0
+
+    def get_wait_time(self) -> float:
+        wait_time = max(0.0, self.blocked_until - self.clock())
+        for bucket in self.bucket_list:
+            wait_time = max(wait_time, bucket.get_wait_time())
+        return wait_time
+
+    def consume(self):
+        for bucket in self.bucket_list:
+            bucket.consume()
+
+    def back_off(self) -> float:
+        back_off_time = min(self.BACK_OFF_MAX, self.BACK_OFF_BASE * (2 ** self.back_off_count))
+        self.back_off_count += 1
+        self.blocked_until = self.clock() + back_off_time
+        for bucket in self.bucket_list:
+            bucket.drain()
+        return back_off_time
+
+    def reset_back_off(self):
+        self.back_off_count = 0
+
+
+class JobStat:
+    def __init__(self):
+        self.count: int = 0
+        self.total_wait: float = 0.0  # 큐 대기 + 제한 대기
+        self.max_wait: float = 0.0
+        self.total_run: float = 0.0
+        self.overflow_count: int = 0
+
+    def get_dic(self):
+        return {
+            'count': self.count,
+            'avg_wait': self.total_wait / self.count if self.count else 0.0,
+            'max_wait': self.max_wait,
+            'avg_run': self.total_run / self.count if self.count else 0.0,
+            'overflow_count': self.overflow_count,
+        }
+
+
+class TrScheduler:
+    """Kiwoom TR 작업 큐.
+
+    JobPriority 별 lane 에서 우선순위가 가장 높은 작업을 꺼내되, 오래 기다린 작업은 AGING_TIME 마다 한 단계씩
+    우선순위를 올려 굶지 않도록 한다. JobType 별 요청 제한에 막힌 작업은 (같은 lane 안에서도) 건너뛰고 실행 가능한 다음
+    작업을 처리한다.
+    key 가 같은 작업이 아직 실행 전이면 새 작업은 큐에 넣지 않고 기존 작업의 future 를 공유한다.
+    """
+    MAX_RETRY = 3
+    AGING_TIME = 5.0  # unit: sec. 이 시간만큼 기다릴 때마다 우선순위 한 단계 상승
+
+    def __init__(self, the_limit_dic: Dict[JobType, List[Tuple[int, float]]] = None, the_clock=time.monotonic,
+                 the_sleep=None):
+        self.clock = the_clock
+        self.sleep = the_sleep  # None 이면 새 작업이 들어올 때 바로 깨어나도록 Condition.wait() 사용
+        self.lane_list: List[Deque[Job]] = [collections.deque() for _ in JobPriority]
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.all_tasks_done = threading.Condition(self.lock)
+        self.unfinished_count = 0
+        self.pending_dic: Dict[object, Job] = {}  # key -> 실행 대기 중인 Job
+        self.coalesced_count = 0
+        limit_dic = RATE_LIMIT_DIC if the_limit_dic is None else the_limit_dic
+        self.limiter_dic: Dict[JobType, RateLimiter] = {
+            job_type: RateLimiter(limit_list, the_clock) for job_type, limit_list in limit_dic.items()
+        }
+        self.stat_dic: Dict[JobType, JobStat] = {job_type: JobStat() for job_type in JobType}
+
+    def put(self, job: Job) -> Future:
+        with self.lock:
+            if job.key is not None:
+                pending_job = self.pending_dic.get(job.key)
+                if pending_job is not None:
+                    if job.merge is not None:
+                        job.merge(pending_job, job)
+                    logger.debug(f'{job.fn.__name__}{job.args}. attach to pending job. key:{job.key}')
+                    self.coalesced_count += 1
+                    return pending_job.future
+                self.pending_dic[job.key] = job
+            job.put_time = self.clock()
+            self.lane_list[job.priority].append(job)
+            self.unfinished_count += 1
+            self.not_empty.notify()
+        return job.future
+
+    def qsize(self) -> int:
+        with self.lock:
+            return sum(len(lane) for lane in self.lane_list)
+
+    def task_done(self):
+        with self.lock:
+            self.unfinished_count -= 1
+            if self.unfinished_count <= 0:
+                self.all_tasks_done.notify_all()
+
+    def join(self):
+        with self.lock:
+            while self.unfinished_count:
+                self.all_tasks_done.wait()
+
+    def run(self):
+        while True:
+            self.run_once()
+
+    def run_once(self, block: bool = True, timeout: float = None):
+        """작업 하나를 꺼내 실행한다. 큐가 비어 있으면 queue.Empty 발생 (block=False 또는 timeout)"""
+        job = self._take(block, timeout)
+        try:
+            return self._execute(job)
+        except Exception as e:
+            logger.exception(f'{job.fn.__name__}{job.args}. {e}')
+            job.future.set_exception(e)
+        finally:
+            self.task_done()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            ret = {job_type.name: stat.get_dic() for job_type, stat in self.stat_dic.items()}
+            ret['queue_depth'] = sum(len(lane) for lane in self.lane_list)
+            ret['lane_depth'] = {priority.name: len(self.lane_list[priority]) for priority in JobPriority}
+            ret['coalesced_count'] = self.coalesced_count
+        return ret
+
+    def _take(self, block: bool, timeout: float) -> Job:
+        deadline = None if timeout is None else self.clock() + timeout
+        with self.lock:
+            while True:
+                lane, index, wait_time = self._select()
+                if lane is not None:
+                    job = lane[index]
+                    del lane[index]
+                    if job.key is not None and self.pending_dic.get(job.key) is job:
+                        del self.pending_dic[job.key]
+                    limiter = self.limiter_dic.get(job.job_type)
+                    if limiter is not None:
+                        limiter.consume()
+                    return job
+                if not block and wait_time is None:
+                    raise queue.Empty
+                if deadline is not None:
+                    remained = deadline - self.clock()
+                    if remained <= 0:
+                        raise queue.Empty
+                    wait_time = remained if wait_time is None else min(wait_time, remained)
+                self._wait(wait_time)
+
+    def _select(self):
+        """실행할 lane 과 그 안의 작업 위치, 실행 가능한 작업이 없을 때 기다려야 할 시간을 반환한다 (self.lock 보유 상태에서 호출).
+
+        lane 의 맨 앞 작업이 요청 제한에 막혀 있으면 그 뒤에서 다른 JobType 의 첫 작업을 찾는다. 같은 JobType 안에서는 순서를 지킨다
+        """
+        now = self.clock()
+        best_lane = None
+        best_index = 0
+        best_score = None
+        wait_time_dic: Dict[JobType, float] = {}  # JobType -> 제한 대기시간
+        for priority, lane in enumerate(self.lane_list):
+            for index, job in enumerate(lane):
+                wait_time = wait_time_dic.get(job.job_type)
+                if wait_time is None:
+                    limiter = self.limiter_dic.get(job.job_type)
+                    wait_time = 0.0 if limiter is None else limiter.get_wait_time()
+                    wait_time_dic[job.job_type] = wait_time
+                if wait_time > 0:
+                    continue
+                score = priority - (now - job.put_time) / self.AGING_TIME
+                if best_score is None or score < best_score:
+                    best_lane = lane
+                    best_index = index
+                    best_score = score
+                break
+        min_wait_time = min((wait_time for wait_time in wait_time_dic.values() if wait_time > 0), default=None)
+        return best_lane, best_index, min_wait_time
+
+    def _wait(self, seconds):
+        if self.sleep is None:
+            self.not_empty.wait(seconds)
+        else:
+            self.lock.release()
+            try:
+                self.sleep(seconds)
+            finally:
+                self.lock.acquire()
+
+    def _execute(self, job: Job):
+        limiter = self.limiter_dic.get(job.job_type)
+        start_time = self.clock()
+        logger.debug(f'{job.fn.__name__}{job.args}.')
+        ret = job()
+        end_time = self.clock()
+        logger.info(f'{job.fn.__name__}{job.args}. ret:{ret}')
+
+        is_overflow = limiter is not None and ret in OVERFLOW_ERR_LIST
+        with self.lock:
+            stat = self.stat_dic[job.job_type]
+            wait = start_time - job.put_time
+            stat.count += 1
+            stat.total_wait += wait
+            stat.max_wait = max(stat.max_wait, wait)
+            stat.total_run += end_time - start_time
+            if is_overflow:
+                stat.overflow_count += 1
+                back_off_time = limiter.back_off()
+            elif limiter is not None:
+                limiter.reset_back_off()
+
+        if is_overflow and job.retry_count < self.MAX_RETRY:
+            job.retry_count += 1
+            logger.warning(f'{job.fn.__name__} overflow(ret:{ret}). back off {back_off_time}s and retry '
+                           f'({job.retry_count}/{self.MAX_RETRY})')
+            self._retry(job)
+            return ret
+        if is_overflow:
+            logger.error(f'{job.fn.__name__} overflow(ret:{ret}). give up after {job.retry_count} retries')
+        job.future.set_result(ret)
+        return ret
+
+    def _retry(self, job: Job):
+        future = self.put(job)
+        if future is not job.future:  # 그 사이 같은 요청이 다시 들어왔으면 그 작업의 결과를 공유한다
+            future.add_done_callback(partial(_copy_future, job.future))
+
+
+def _copy_future(the_dst: Future, the_src: Future):
+    if the_src.exception() is not None:
+        the_dst.set_exception(the_src.exception())
+    else:
+        the_dst.set_result(the_src.result())
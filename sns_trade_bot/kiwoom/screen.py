@@ -0,0 +1,87 @@
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ScreenPool:
+    """실시간 등록용 화면번호 할당기.
+
+    화면 하나에 MAX_CODE_COUNT 개까지 종목을 채우고, 빈 화면은 다시 쓴다.
+    종목별로 등록된 화면을 기억하므로 실시간 해제 시 해당 화면을 찾을 수 있다.
+    """
+    MAX_CODE_COUNT = 100  # 화면 하나에 실시간 등록할 수 있는 최대 종목 수
+
+    def __init__(self, the_scn_no_list: List[str], the_max_code_count: int = MAX_CODE_COUNT):
+        self.max_code_count = the_max_code_count
+        self.free_scn_no_list = deque(the_scn_no_list)
+        self.scn_code_dic: Dict[str, Set[str]] = {}  # 사용 중인 화면번호 -> 종목코드 set
+        self.code_scn_dic: Dict[str, str] = {}  # 종목코드 -> 화면번호
+
+    def allocate(self, the_code_list: List[str]) -> List[Tuple[str, List[str], str]]:
+        """등록되지 않은 종목들에 화면을 할당한다.
+
+        :return: [(화면번호, 종목코드 list, real_type)]. real_type 은 새 화면이면 "0", 기존 화면에 추가면 "1"
+        """
+        new_code_list = []
+        new_code_set = set()
+        for code in the_code_list:
+            if code not in self.code_scn_dic and code not in new_code_set:
+                new_code_list.append(code)
+                new_code_set.add(code)
+
+        result_list = []
+        start = 0
+        while start < len(new_code_list):
+            scn_no = self._find_scn_no()
+            if scn_no is None:
+                logger.error(f'no free screen. {len(new_code_list) - start} codes are not registered')
+                break
+            code_set = self.scn_code_dic.setdefault(scn_no, set())
+            real_type = '1' if code_set else '0'
+            space = self.max_code_count - len(code_set)
+            chunk = new_code_list[start:start + space]
+            start += space
+            code_set.update(chunk)
+            for code in chunk:
+                self.code_scn_dic[code] = scn_no
+            result_list.append((scn_no, chunk, real_type))
+        return result_list
+
+    def release(self, the_code: str) -> Optional[str]:
+        """종목의 화면 할당을 해제한다. 화면이 비면 다시 쓸 수 있도록 돌려놓는다.
+
+        :return: 종목이 등록되어 있던 화면번호. 등록되지 않은 종목이면 None
+        """
+        scn_no = self.code_scn_dic.pop(the_code, None)
+        if scn_no is None:
+            return None
+        code_set = self.scn_code_dic[scn_no]
+        code_set.discard(the_code)
+        if not code_set:
+            del self.scn_code_dic[scn_no]
+            self.free_scn_no_list.append(scn_no)
+        return scn_no
+
+    def release_all(self) -> List[str]:
+        """모든 할당을 해제하고, 사용 중이던 화면번호 list 를 돌려준다"""
+        scn_no_list = list(self.scn_code_dic.keys())
+        self.free_scn_no_list.extend(scn_no_list)
+        self.scn_code_dic.clear()
+        self.code_scn_dic.clear()
+        return scn_no_list
+
+    def get_scn_no(self, the_code: str) -> Optional[str]:
+        return self.code_scn_dic.get(the_code)
+
+    def get_code_count(self) -> int:
+        return len(self.code_scn_dic)
+
+    def _find_scn_no(self) -> Optional[str]:
+        for scn_no, code_set in self.scn_code_dic.items():
+            if len(code_set) < self.max_code_count:
+                return scn_no
+        if self.free_scn_no_list:
+            return self.free_scn_no_list.popleft()
+        return None
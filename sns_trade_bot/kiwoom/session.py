@@ -0,0 +1,130 @@
+import datetime
+import heapq
+import itertools
+import logging
+import math
+from typing import Callable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def get_sec_of_day() -> float:
+    now = datetime.datetime.now()
+    return now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+
+
+def to_sec(the_time_str: str) -> int:
+    """'HHMMSS' -> 0 시부터의 초"""
+    return int(the_time_str[:2]) * 3600 + int(the_time_str[2:4]) * 60 + int(the_time_str[4:6])
+
+
+def to_time_str(the_sec: float) -> str:
+    sec = int(the_sec)
+    return f'{sec // 3600 % 24:02d}{sec // 60 % 60:02d}{sec % 60:02d}'
+
+
+class SessionScheduler:
+    """장 시각 기준으로 이름 붙은 세션 이벤트를 실행한다.
+
+    이벤트는 (시각, 순서) min-heap 에 쌓고, 가장 이른 이벤트 시각에 타이머 하나만 걸어둔다.
+    타이머가 늦게 오더라도 (실시간 이벤트가 끊긴 경우 등) 지난 이벤트는 다음 poll() 에서 한 번만 실행된다.
+    시계는 the_clock (0 시부터의 초) 에 sync() 로 맞춘 서버 시각과의 차이를 더해서 쓴다.
+    """
+
+    def __init__(self, the_single_shot: Callable[[int, Callable], None],
+                 the_clock: Callable[[], float] = get_sec_of_day):
+        """
+        :param the_single_shot: single_shot(msec, fn). QTimer.singleShot 또는 가상 시계 기준 타이머
+        :param the_clock: 0 시부터의 초
+        """
+        self.single_shot = the_single_shot
+        self.clock = the_clock
+        self.offset = 0.0  # 서버 시각 - the_clock
+        self.event_heap: List[Tuple[int, int, str, Callable]] = []
+        self.name_set: Set[str] = set()  # heap 에 있는 이벤트 이름
+        self.seq = itertools.count()
+        self.started = False
+        self.timer_token = 0  # 마지막으로 건 타이머. 이전 타이머는 무시한다
+
+    def now(self) -> float:
+        return self.clock() + self.offset
+
+    def add(self, the_name: str, the_time_str: str, the_fn: Callable) -> bool:
+        """
+        :return: 같은 이름의 이벤트가 이미 있거나, start() 이후 이미 지난 시각이면 False
+        """
+        if the_name in self.name_set:
+            return False
+        event_sec = to_sec(the_time_str)
+        if self.started and event_sec < self.now():
+            logger.warning(f'"{the_name}" at {the_time_str} is already passed. now:{to_time_str(self.now())}')
+            return False
+        heapq.heappush(self.event_heap, (event_sec, next(self.seq), the_name, the_fn))
+        self.name_set.add(the_name)
+        logger.debug(f'add "{the_name}" at {the_time_str}')
+        if self.started:
+            self._arm()
+        return True
+
+    def start(self):
+        """지금보다 이전 시각의 이벤트는 버리고 타이머를 건다"""
+        now = self.now()
+        while self.event_heap and self.event_heap[0][0] < now:
+            event_sec, _, name, _ = heapq.heappop(self.event_heap)
+            self.name_set.discard(name)
+            logger.info(f'skip passed event "{name}" at {to_time_str(event_sec)}')
+        self.started = True
+        logger.info(f'session started at {to_time_str(now)}. pending:{len(self.event_heap)}')
+        self._arm()
+
+    def stop(self):
+        self.started = False
+        self.timer_token += 1
+
+    def sync(self, the_time_str: str):
+        """서버에서 받은 장 시각 ('HHMMSS') 으로 시계를 맞춘다"""
+        if len(the_time_str) != 6 or not the_time_str.isdigit():
+            return
+        offset = to_sec(the_time_str) - self.clock()
+        if abs(offset - self.offset) >= 1.0:
+            logger.info(f'sync clock. offset:{self.offset:.1f} -> {offset:.1f}')
+            self.offset = offset
+            if self.started:
+                self.timer_token += 1
+                self._arm()
+
+    def poll(self) -> int:
+        """시각이 지난 이벤트를 모두 실행한다
+
+        :return: 실행한 이벤트 수
+        """
+        count = 0
+        now = self.now()
+        while self.started and self.event_heap and self.event_heap[0][0] <= now:
+            event_sec, _, name, fn = heapq.heappop(self.event_heap)
+            self.name_set.discard(name)
+            logger.info(f'session event "{name}" at {to_time_str(event_sec)}. now:{to_time_str(now)}')
+            try:
+                fn()
+            except Exception as e:  # 다른 이벤트는 계속 실행
+                logger.exception(f'failed to run "{name}". {e}')
+            count += 1
+        return count
+
+    def get_pending_list(self) -> List[Tuple[str, str]]:
+        """[(시각, 이름)] 시각 순"""
+        return [(to_time_str(event_sec), name) for event_sec, _, name, _ in sorted(self.event_heap)]
+
+    def _arm(self):
+        if not self.event_heap:
+            return
+        self.timer_token += 1
+        token = self.timer_token
+        msec = max(0, math.ceil((self.event_heap[0][0] - self.now()) * 1000))
+        self.single_shot(msec, lambda: self._on_timer(token))
+
+    def _on_timer(self, the_token: int):
+        if the_token != self.timer_token or not self.started:
+            return
+        self.poll()
+        self._arm()
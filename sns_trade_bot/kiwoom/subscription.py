@@ -0,0 +1,82 @@
+import logging
+from typing import Dict, List
+
+from sns_trade_bot.model.data_manager import DataManager, DataType, ModelListener, HoldType
+from sns_trade_bot.kiwoom.common import REAL_SCN_NO_LIST
+from sns_trade_bot.kiwoom.screen import ScreenPool
+
+logger = logging.getLogger(__name__)
+
+REAL_FID_LIST = '9001;10;13'  # 종목코드,업종코드;현재가;누적거래량
+
+
+class SubscriptionManager(ModelListener):
+    """실시간 등록 관리.
+
+    등록해야 할 (종목코드, FID list) 와 실제 등록된 목록을 따로 들고 있다가, 차이만 SetRealReg() / SetRealRemove() 한다.
+    start() 이후에는 DataManager 의 TABLE_BALANCE 갱신마다 다시 맞춘다. (종목 추가, 청산, 전략 추가 등)
+    """
+
+    def __init__(self, the_data_manager, the_ocx, the_screen_pool: ScreenPool = None):
+        self.data_manager: DataManager = the_data_manager
+        self.ocx = the_ocx
+        self.screen_pool = the_screen_pool if the_screen_pool is not None else ScreenPool(REAL_SCN_NO_LIST)
+        self.desired_dic: Dict[str, str] = {}  # 종목코드 -> FID list
+        self.active_dic: Dict[str, str] = {}  # 종목코드 -> FID list
+        self.enabled = False
+
+    def start(self):
+        logger.info('start real subscription')
+        self.enabled = True
+        self.sync()
+
+    def update_desired(self):
+        self.desired_dic = {code: REAL_FID_LIST for code in self.data_manager.get_code_list(HoldType.TARGET)}
+
+    def sync(self):
+        self.update_desired()
+        remove_list = [code for code, fid_list in self.active_dic.items() if self.desired_dic.get(code) != fid_list]
+        add_dic: Dict[str, List[str]] = {}  # FID list -> 종목코드 list
+        for code, fid_list in self.desired_dic.items():
+            if self.active_dic.get(code) != fid_list:
+                add_dic.setdefault(fid_list, []).append(code)
+        if not remove_list and not add_dic:
+            return
+        logger.info(f'remove:{len(remove_list)}, add:{sum(len(v) for v in add_dic.values())}')
+
+        for code in remove_list:
+            self._remove(code)
+        for fid_list, code_list in add_dic.items():
+            self._add(code_list, fid_list)
+
+    def get_active_code_list(self) -> List[str]:
+        return list(self.active_dic.keys())
+
+    def _add(self, the_code_list: List[str], the_fid_list: str):
+        for scn_no, code_list, real_type in self.screen_pool.allocate(the_code_list):
+            # real_type 0: 최초 등록, 1: 같은 화면에 종목 추가
+            ret = self.ocx.set_real_reg(scn_no, ';'.join(code_list), the_fid_list, real_type)
+            if ret != 0:
+                logger.error(f'failed to set_real_reg. scn_no:{scn_no}, ret:{ret}')
+                for code in code_list:
+                    self.screen_pool.release(code)
+                continue
+            for code in code_list:
+                self.active_dic[code] = the_fid_list
+
+    def _remove(self, the_code: str):
+        del self.active_dic[the_code]
+        scn_no = self.screen_pool.release(the_code)
+        if scn_no is not None:
+            self.ocx.set_real_remove(scn_no, the_code)
+
+    # ModelListener
+    def on_data_updated(self, data_type: DataType):
+        if self.enabled and data_type == DataType.TABLE_BALANCE:
+            self.sync()
+
+    def on_buy_signal(self, code: str, qty: int):
+        pass
+
+    def on_sell_signal(self, code: str, qty: int):
+        pass
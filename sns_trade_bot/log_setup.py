@@ -0,0 +1,110 @@
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '../log')
+LOG_FILE_NAME = 'sns_trade_bot.jsonl'
+LOG_LEVEL_ENV = 'SNS_TRADE_BOT_LOG_LEVEL'  # 파일 로그 수준. 예: SNS_TRADE_BOT_LOG_LEVEL=DEBUG
+DEFAULT_LOG_LEVEL = logging.INFO  # DEBUG 면 hot path 의 isEnabledFor() 가 건너뛰지 않는다
+CONSOLE_FORMAT = '%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 한 건을 JSON 한 줄로 만든다. {"t": epoch 초, "lv", "lg": logger 이름, "fn", "ln", "th", "msg", "exc"}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dic = {
+            't': round(record.created, 6),
+            'lv': record.levelname,
+            'lg': record.name,
+            'fn': record.funcName,
+            'ln': record.lineno,
+            'th': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            dic['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            dic['exc'] = record.exc_text
+        return json.dumps(dic, ensure_ascii=False)
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """기본 구현의 format() / record 복사 없이 메시지만 만들어 넘긴다. 포맷은 listener 스레드에서 한다"""
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogListener(logging.handlers.QueueListener):
+    def stop(self):
+        """atexit 과 직접 호출 양쪽에서 불러도 되도록"""
+        if self._thread is not None:
+            super().stop()
+
+
+def gzip_rotator(the_source: str, the_dest: str):
+    with open(the_source, 'rb') as f_in, gzip.open(the_dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(the_source)
+
+
+def create_file_handler(the_log_dir: str = LOG_DIR, the_backup_count: int = 30) -> logging.Handler:
+    """자정마다 sns_trade_bot.jsonl.YYYY-MM-DD.gz 로 압축해서 넘기는 JSON lines 파일 handler"""
+    os.makedirs(the_log_dir, exist_ok=True)
+    handler = logging.handlers.TimedRotatingFileHandler(os.path.join(the_log_dir, LOG_FILE_NAME), when='midnight',
+                                                        backupCount=the_backup_count, encoding='utf-8')
+    handler.namer = lambda name: name + '.gz'
+    handler.rotator = gzip_rotator
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def get_log_level(the_default: int = DEFAULT_LOG_LEVEL) -> int:
+    """LOG_LEVEL_ENV 환경변수 ('DEBUG', 'INFO' 또는 숫자). 없거나 잘못된 값이면 the_default"""
+    value = os.environ.get(LOG_LEVEL_ENV, '').strip().upper()
+    if not value:
+        return the_default
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value)
+    return level if isinstance(level, int) else the_default
+
+
+def setup_logging(the_level: int = None, the_console_level: int = logging.INFO,
+                  the_log_dir: str = LOG_DIR) -> LogListener:
+    """root logger 에는 QueueHandler 만 붙이고, 파일 / 콘솔 쓰기는 QueueListener 스레드에서 한다.
+
+    Qt 스레드에서는 메시지를 만들어 queue 에 넣기만 한다. 종료 시 atexit 에서 남은 로그를 모두 쓴다.
+    root logger 수준은 the_level 과 the_console_level 중 낮은 쪽이다.
+
+    :param the_level: 파일 로그 수준. None 이면 get_log_level()
+    """
+    if the_level is None:
+        the_level = get_log_level()
+    file_handler = create_file_handler(the_log_dir)
+    file_handler.setLevel(the_level)
+    stream_handler = logging.StreamHandler(stream=sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    stream_handler.setLevel(the_console_level)
+
+    log_queue = queue.SimpleQueue()
+    listener = LogListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(min(the_level, the_console_level))
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(LogQueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -1,33 +1,17 @@
 import sys
 import os
 import logging
-from datetime import datetime
 from PyQt5.QtWidgets import QApplication
 from sns_trade_bot.ui.main_window import MainWindow, UiListener
 from sns_trade_bot.kiwoom.manager import Kiwoom
+from sns_trade_bot.kiwoom.recorder import TickRecorder
+from sns_trade_bot.log_setup import setup_logging
 from sns_trade_bot.model.data_manager import DataManager, HoldType, ModelListener, DataType
 from sns_trade_bot.model.condition import Condition, SignalType
 import sns_trade_bot.slack.run
 import threading
 
-# Setup root logger
 logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
-LOG_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../log")
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-file_name = LOG_DIR + "/" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".log"
-
-file_handler = logging.FileHandler(file_name, "a", "utf-8")
-stream_handler = logging.StreamHandler(stream=sys.stdout)
-file_handler.setFormatter(formatter)
-stream_handler.setFormatter(formatter)
-
-logger.addHandler(file_handler)
-logger.addHandler(stream_handler)
-
-logger.info(f'file_name: {file_name}')
 
 
 class Manager(UiListener, ModelListener):
@@ -56,8 +40,7 @@ class Manager(UiListener, ModelListener):
 
     def btn_real_clicked(self):
         logger.info('btn_real_clicked')
-        target_code_list = self.data_manager.get_code_list(HoldType.TARGET)
-        self.kiwoom_manager.set_real_reg(target_code_list)
+        self.kiwoom_manager.start_real()
 
     def btn_code_add_clicked(self, code):
         logger.info(f'btn_code_add_clicked. code: {code}')
@@ -101,6 +84,7 @@ class Manager(UiListener, ModelListener):
 
 
 if __name__ == "__main__":
+    setup_logging()  # 파일 / 콘솔 모두 INFO 부터. 파일을 DEBUG 로 남기려면 SNS_TRADE_BOT_LOG_LEVEL=DEBUG
     logger.info("===== Start SnsTradeBot ======")
 
     # Run slackbot
@@ -111,11 +95,12 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     data_manager = DataManager()
     main_window = MainWindow(data_manager)
-    kiwoom_manager = Kiwoom(data_manager)
+    kiwoom_manager = Kiwoom(data_manager, the_recorder=TickRecorder())
 
     manager = Manager(data_manager, main_window, kiwoom_manager)
     data_manager.add_listener(manager)
     main_window.set_listener(manager)
+    app.aboutToQuit.connect(kiwoom_manager.handler.close)  # 창을 닫아서 끝낼 때도
     kiwoom_manager.tr_connect()
 
     main_window.show()
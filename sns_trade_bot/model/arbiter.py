@@ -0,0 +1,93 @@
+import logging
+from typing import Callable, Dict, List, Optional
+
+from sns_trade_bot.model.order import OrderBook, OrderSide
+
+logger = logging.getLogger(__name__)
+
+
+class PendingSignal:
+    __slots__ = ('stock', 'buy_qty', 'sell_qty', 'strategy_name_list')
+
+    def __init__(self, the_stock):
+        self.stock = the_stock
+        self.buy_qty = 0
+        self.sell_qty = 0
+        self.strategy_name_list: List[str] = []
+
+
+class SignalArbiter:
+    """같은 이벤트 루프 차례에 나온 전략 신호를 종목별로 모아서 주문 하나로 만든다.
+
+    여러 매도 전략이 같은 체결 / 조건검색 이벤트에서 신호를 내거나, 매수와 매도가 같이 나와도 주문은 종목당 하나다.
+    매도 수량은 보유수량 - 미체결 매도수량으로 자른 뒤 매수 수량과 상쇄한다.
+    주문이 되기 전의 수량은 get_pending_qty() 로 Stock.remained_buy_qty / remained_sell_qty 에 더해 보인다.
+    single_shot 이 없으면 신호마다 바로 주문을 만든다.
+    """
+
+    def __init__(self, the_order_book: OrderBook, the_listener_list: list,
+                 the_single_shot: Optional[Callable[[int, Callable], None]] = None):
+        """
+        :param the_listener_list: ModelListener list. 주문을 만든 뒤 on_buy_signal() / on_sell_signal() 로 알린다
+        :param the_single_shot: single_shot(msec, fn). KiwoomEventHandler 가 QTimer.singleShot 또는 가상 타이머를 넣는다
+        """
+        self.order_book = the_order_book
+        self.listener_list = the_listener_list
+        self.single_shot = the_single_shot
+        self.pending_dic: Dict[str, PendingSignal] = {}  # 종목코드 -> 이번 차례에 모인 신호
+        self.is_scheduled = False
+        self.signal_count = 0
+        self.order_count = 0
+
+    def add(self, the_stock, the_side: OrderSide, the_qty: int, the_strategy_name: str):
+        pending = self.pending_dic.get(the_stock.code)
+        if pending is None:
+            pending = self.pending_dic[the_stock.code] = PendingSignal(the_stock)
+        if the_side == OrderSide.BUY:
+            pending.buy_qty += the_qty
+        else:
+            pending.sell_qty += the_qty
+        pending.strategy_name_list.append(the_strategy_name)
+        self.signal_count += 1
+        if self.single_shot is None:
+            self.flush()
+        elif not self.is_scheduled:
+            self.is_scheduled = True
+            self.single_shot(0, self.flush)
+
+    def get_pending_qty(self, the_code: str, the_side: OrderSide) -> int:
+        """이번 차례에 모였지만 아직 주문이 되지 않은 수량"""
+        pending = self.pending_dic.get(the_code)
+        if pending is None:
+            return 0
+        return pending.buy_qty if the_side == OrderSide.BUY else pending.sell_qty
+
+    def flush(self) -> int:
+        """모인 신호를 종목별로 주문 하나로 만든다
+
+        :return: 만든 주문 수
+        """
+        self.is_scheduled = False
+        pending_dic = self.pending_dic
+        self.pending_dic = {}
+        count = 0
+        for code, pending in pending_dic.items():
+            stock = pending.stock
+            sell_qty = min(pending.sell_qty, max(0, stock.qty - stock.remained_sell_qty))
+            net_qty = pending.buy_qty - sell_qty
+            strategy_name = ','.join(pending.strategy_name_list)
+            if len(pending.strategy_name_list) > 1 or sell_qty != pending.sell_qty:
+                logger.info(f'{stock.name}({code}) merge "{strategy_name}". buy:{pending.buy_qty}, '
+                            f'sell:{pending.sell_qty} -> {sell_qty}, net:{net_qty}')
+            if net_qty == 0:
+                continue
+            side = OrderSide.BUY if net_qty > 0 else OrderSide.SELL
+            self.order_book.add(code, side, abs(net_qty), strategy_name)
+            for listener in self.listener_list:
+                if side == OrderSide.BUY:
+                    listener.on_buy_signal(code, net_qty)
+                else:
+                    listener.on_sell_signal(code, -net_qty)
+            count += 1
+        self.order_count += count
+        return count
@@ -0,0 +1,149 @@
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeSet:
+    """한 번에 모아서 보내는 변경 내용.
+
+    field 이름은 Stock 속성 이름이다. (cur_price, qty, name, buy_strategy_dic 등. 미체결 수량은 remained_qty)
+    data_type_list 는 그 사이에 DataManager.set_updated() 로 요청된 DataType. on_data_updated() 로도 알린다.
+    """
+
+    def __init__(self, the_field_dic: Dict[str, Set[str]], the_added_set: Set[str], the_removed_set: Set[str],
+                 the_data_type_list: list):
+        self.field_dic = the_field_dic  # 종목코드 -> 바뀐 field
+        self.added_set = the_added_set  # 새로 추가된 종목코드
+        self.removed_set = the_removed_set  # 지운 종목코드
+        self.data_type_list = the_data_type_list  # 요청된 순서. 중복 없음
+
+    def __str__(self):
+        return f'(changed:{len(self.field_dic)}, added:{len(self.added_set)}, removed:{len(self.removed_set)}, ' \
+               f'data_type:{[data_type.name for data_type in self.data_type_list]})'
+
+    def is_empty(self) -> bool:
+        return not (self.field_dic or self.added_set or self.removed_set or self.data_type_list)
+
+    def get_code_set(self, the_field: str) -> Set[str]:
+        """the_field 가 바뀐 종목코드"""
+        return {code for code, field_set in self.field_dic.items() if the_field in field_set}
+
+
+class ChangeTracker:
+    """종목별로 바뀐 field 를 모았다가 한 차례에 ChangeSet 하나로 listener 에 보낸다.
+
+    처음 표시될 때 single_shot(interval_msec, flush) 을 한 번 걸고, 그 사이의 변경은 모두 같은 ChangeSet 에 합친다.
+    interval_msec 이 0 이면 이벤트 루프 한 차례마다. single_shot 이 없으면 표시할 때마다 바로 보낸다.
+    체결은 가장 자주 오므로 mark_price() 는 종목코드 set 에만 넣고 flush 때 PRICE_FIELD_TUPLE 로 펼친다.
+    QTimer 는 만든 스레드의 이벤트 루프에서만 울리므로, 다른 스레드에서 표시하면 post 로 타이머를 tracker 를 만든 스레드에서 건다.
+    post 가 없으면 타이머를 걸지 않고, 그 스레드에서 다음에 표시할 때 같이 보낸다.
+    """
+    PRICE_FIELD_TUPLE = ('cur_price', 'earning_rate')  # 체결 한 건에 바뀌는 field
+
+    def __init__(self, the_listener: Callable[[ChangeSet], None],
+                 the_single_shot: Optional[Callable[[int, Callable], None]] = None, the_interval_msec: int = 0,
+                 the_post: Optional[Callable[[Callable], None]] = None):
+        """
+        :param the_listener: flush 때 호출. DataManager 가 ModelListener 들에 나눠준다
+        :param the_single_shot: single_shot(msec, fn). KiwoomEventHandler 가 QTimer.singleShot 또는 가상 타이머를 넣는다
+        :param the_post: post(fn). fn 을 tracker 를 만든 스레드에서 실행한다. KiwoomEventHandler 가 MainThreadInvoker.call 을 넣는다
+        """
+        self.listener = the_listener
+        self.single_shot = the_single_shot
+        self.post = the_post
+        self.thread_id = threading.get_ident()  # single_shot 을 걸 스레드
+        self.interval_msec = the_interval_msec
+        self.field_dic: Dict[str, Set[str]] = {}
+        self.price_code_set: Set[str] = set()  # 체결로 가격이 바뀐 종목코드
+        self.added_set: Set[str] = set()
+        self.removed_set: Set[str] = set()
+        self.data_type_list = []
+        self.is_scheduled = False
+        self.flush_count = 0
+
+    def mark(self, the_code: str, the_field: str):
+        field_set = self.field_dic.get(the_code)
+        if field_set is None:
+            self.field_dic[the_code] = {the_field}
+            self._schedule()
+        else:
+            field_set.add(the_field)
+
+    def mark_list(self, the_code: str, the_field_list: Iterable[str]):
+        field_set = self.field_dic.get(the_code)
+        if field_set is None:
+            self.field_dic[the_code] = set(the_field_list)
+            self._schedule()
+        else:
+            field_set.update(the_field_list)
+
+    def mark_price(self, the_code: str):
+        self.price_code_set.add(the_code)
+        if not self.is_scheduled:
+            self._schedule()
+
+    def mark_added(self, the_code: str):
+        self.removed_set.discard(the_code)
+        self.added_set.add(the_code)
+        self._schedule()
+
+    def mark_removed(self, the_code: str):
+        self.field_dic.pop(the_code, None)
+        self.price_code_set.discard(the_code)
+        if the_code in self.added_set:  # 같은 차례에 추가했다가 지운 종목
+            self.added_set.discard(the_code)
+        else:
+            self.removed_set.add(the_code)
+        self._schedule()
+
+    def mark_data_type(self, the_data_type):
+        if the_data_type not in self.data_type_list:
+            self.data_type_list.append(the_data_type)
+        self._schedule()
+
+    def flush(self) -> Optional[ChangeSet]:
+        self.is_scheduled = False
+        field_dic = self.field_dic
+        for code in self.price_code_set:
+            field_set = field_dic.get(code)
+            if field_set is None:
+                field_dic[code] = set(self.PRICE_FIELD_TUPLE)
+            else:
+                field_set.update(self.PRICE_FIELD_TUPLE)
+        change_set = ChangeSet(field_dic, self.added_set, self.removed_set, self.data_type_list)
+        if change_set.is_empty():
+            return None
+        self.field_dic = {}
+        self.price_code_set = set()
+        self.added_set = set()
+        self.removed_set = set()
+        self.data_type_list = []
+        self.flush_count += 1
+        self.listener(change_set)
+        return change_set
+
+    def _schedule(self):
+        if self.single_shot is None:
+            self.flush()
+        elif not self.is_scheduled:
+            if threading.get_ident() == self.thread_id:
+                self._start_timer()
+            elif self.post is not None:
+                self.is_scheduled = True  # post 한 _start_timer() 가 타이머를 건다
+                try:
+                    self.post(self._start_timer)
+                except Exception as e:  # 표시하던 model 변경은 끝까지 하게 둔다
+                    self.is_scheduled = False
+                    logger.exception(f'failed to post. {e}')
+            else:
+                logger.warning('marked from another thread without post. sent with the next change on the owner thread')
+
+    def _start_timer(self):
+        self.is_scheduled = True
+        try:
+            self.single_shot(self.interval_msec, self.flush)
+        except Exception as e:
+            self.is_scheduled = False  # 타이머가 없으면 다음 표시 때 다시 건다
+            logger.exception(f'failed to start timer. {e}')
@@ -1,12 +1,17 @@
 import enum
 import logging
 import os
-import json
 import sys
 from abc import abstractmethod
-from typing import Dict, List
+from typing import Collection, Dict, List
 
+from sns_trade_bot.model.arbiter import SignalArbiter
+from sns_trade_bot.model.change import ChangeSet, ChangeTracker
+from sns_trade_bot.model.journal import Journal
+from sns_trade_bot.model.order import Order, OrderBook, OrderSide
 from sns_trade_bot.model.stock import Stock
+from sns_trade_bot.model.stock_store import PortfolioSummary, StockStore
+from sns_trade_bot.model.strategy_index import StrategyIndex
 from sns_trade_bot.model.condition import Condition, SignalType
 
 
@@ -33,6 +38,10 @@ class ModelListener:
     def on_sell_signal(self, code: str, qty: int):
         pass
 
+    def on_data_changed(self, change_set: ChangeSet):
+        """종목 / field 단위 변경. 바뀐 행만 고치려는 listener 가 구현한다. on_data_updated() 다음에 호출된다"""
+        pass
+
 
 class HoldType(enum.Enum):
     INTEREST = 0
@@ -43,14 +52,24 @@ class HoldType(enum.Enum):
 
 class DataManager:
     SAVE_FILE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../my_stock_list.json')
+    JOURNAL_FIELD_SET = {'name', 'target_qty', 'buy_strategy_dic', 'sell_strategy_dic'}  # Stock.get_dic() 의 값
+    TARGET_BY_STRATEGY = False  # True 면 HoldType.TARGET 은 전략이 있는 종목만. False 면 모든 종목 (UI 현재가 표시용)
 
     def __init__(self):
         self.account: str = '1234'
         self.account_list: List[str] = ['1234', '4567']
         self.cond_dic: Dict[int, Condition] = {1: Condition(1, 'temp1'), 2: Condition(2, 'temp2')}
         self.stock_dic: Dict[str, Stock] = {}
+        self.stock_store = StockStore()  # stock_dic 종목들의 가격 / 수량 컬럼
+        self.change_tracker = ChangeTracker(self._on_changed)  # 바뀐 (종목코드, field) 를 모아서 listener 에 보낸다
+        self.journal = Journal(DataManager.SAVE_FILE_PATH)  # load() 뒤부터 종목 변경을 기록한다
+        self.stock_store.tracker = self.change_tracker
+        self.strategy_index = StrategyIndex()  # 종목코드 -> 활성 전략
+        self.order_book = OrderBook()  # 당일 주문
+        self.order_book.listener = self._on_order_updated
         self.temp_stock_list: List[Stock] = []
         self.listener_list: List[ModelListener] = []
+        self.signal_arbiter = SignalArbiter(self.order_book, self.listener_list)  # 종목별 신호 -> 주문 하나
         self.selected_code_list: List[str] = []
 
     def __str__(self):
@@ -77,8 +96,8 @@ class DataManager:
         self.listener_list.append(the_listener)
 
     def save(self):
+        """snapshot 을 임시 파일에 쓰고 rename 한다. 그동안 쌓인 journal 은 비운다"""
         logger.info('save')
-        f = open(DataManager.SAVE_FILE_PATH, "w", encoding='utf8')
         stock_list = []
         for stock in self.stock_dic.values():
             stock_list.append(stock.get_dic())
@@ -86,67 +105,89 @@ class DataManager:
         for cond in self.cond_dic.values():
             cond_list.append(cond.get_dic())
         data_dic = {'stock_list': stock_list, 'cond_list': cond_list}
-        data = json.dumps(data_dic, ensure_ascii=False, indent=4)
-        f.write(data)
-        f.close()
+        self.journal.write_snapshot(data_dic)
 
     def load(self):
+        """snapshot 을 읽고 그 뒤의 journal 을 다시 적용한다. 이후 종목 / 전략 / 목표보유수량 변경은 journal 에 쓴다"""
         logger.info('load')
-        try:
-            f = open(DataManager.SAVE_FILE_PATH, "r", encoding='utf8')
-        except FileNotFoundError:
+        self.journal.enabled = False
+        data_dic, record_list = self.journal.read()
+        if data_dic is None and not record_list:
             logger.error('FileNotFoundError!!!')
-            return
-        data_dic = json.load(f)
-        stock_list = data_dic['stock_list']
-        logger.info(stock_list)
-        for loaded_stock in stock_list:
-            stock = self.get_stock(loaded_stock['code'])
-            stock.name = loaded_stock['name']
-            stock.target_qty = loaded_stock['target_qty']
-            for k, v in loaded_stock['buy_strategy_dic'].items():
-                stock.add_buy_strategy(k, v)
-            for k, v in loaded_stock['sell_strategy_dic'].items():
-                stock.add_sell_strategy(k, v)
-        cond_list = data_dic['cond_list']
-        for loaded_cond in cond_list:
-            cond = self.get_cond(loaded_cond['index'])
-            cond.name = loaded_cond['name']
-            cond.signal_type = SignalType[loaded_cond['signal_type']]
+        if data_dic is not None:
+            stock_list = data_dic['stock_list']
+            logger.info(f'stocks:{len(stock_list)}')
+            for loaded_stock in stock_list:
+                self._load_stock(loaded_stock)
+            cond_list = data_dic['cond_list']
+            for loaded_cond in cond_list:
+                cond = self.get_cond(loaded_cond['index'])
+                cond.name = loaded_cond['name']
+                cond.signal_type = SignalType[loaded_cond['signal_type']]
+        for record in record_list:
+            if record['op'] == 'stock':
+                self._load_stock(record['stock'])
+            elif record['op'] == 'remove':
+                if record['code'] in self.stock_dic:
+                    self.remove_stock(record['code'])
+        self.change_tracker.flush()  # 불러온 변경은 journal 에 다시 쓰지 않는다
+        self.journal.enabled = True
+        if record_list:
+            self.save()  # 다시 적용한 journal 을 snapshot 으로 합친다
         for listener in self.listener_list:
             listener.on_data_updated(DataType.TABLE_BALANCE)
             listener.on_data_updated(DataType.TABLE_CONDITION)
 
+    def _load_stock(self, the_stock_dic: dict):
+        stock = self.get_stock(the_stock_dic['code'])
+        stock.name = the_stock_dic['name']
+        stock.target_qty = the_stock_dic['target_qty']
+        if stock.buy_strategy_dic:
+            stock.clear_buy_strategy()
+        if stock.sell_strategy_dic:
+            stock.clear_sell_strategy()
+        for k, v in the_stock_dic['buy_strategy_dic'].items():
+            stock.add_buy_strategy(k, v)
+        for k, v in the_stock_dic['sell_strategy_dic'].items():
+            stock.add_sell_strategy(k, v)
+
     def get_stock(self, the_code) -> Stock:
         if the_code not in self.stock_dic:
-            self.stock_dic[the_code] = Stock(self.listener_list, the_code)
+            self.stock_dic[the_code] = Stock(self.listener_list, the_code, the_strategy_index=self.strategy_index,
+                                                the_order_book=self.order_book, the_arbiter=self.signal_arbiter,
+                                                the_store=self.stock_store)
+            self._update_open_qty(the_code)
+            self.change_tracker.mark_added(the_code)
             logger.debug(f'new code {the_code}. create new Stock')
         return self.stock_dic[the_code]
 
     def remove_stock(self, the_code):
         if the_code not in self.stock_dic:
             logger.error(f'unexpected code:{the_code}')
-        del self.stock_dic[the_code]
-
-    def get_code_list(self, the_hold_type):
+        stock = self.stock_dic.pop(the_code)
+        self.stock_store.detach(stock)
+        self.strategy_index.remove(the_code)
+        self.change_tracker.mark_removed(the_code)
+
+    def get_code_list(self, the_hold_type: HoldType) -> Collection[str]:
+        """종목코드 view. StockStore / StrategyIndex 가 바뀔 때마다 고쳐두는 색인이라 O(1) 이다.
+        list 가 필요하면 복사해서 쓴다 (view 는 이후 변경을 그대로 보여준다)
+        """
         if the_hold_type == HoldType.ALL:
             return self.stock_dic.keys()
-        code_list = []
         if the_hold_type == HoldType.INTEREST:
-            for stock in self.stock_dic.values():
-                if stock.qty == 0:
-                    code_list.append(stock.code)
+            return self.stock_store.get_interest_code_list()
         elif the_hold_type == HoldType.HOLDING:
-            for stock in self.stock_dic.values():
-                if stock.qty > 0:
-                    code_list.append(stock.code)
+            return self.stock_store.get_holding_code_list()
         elif the_hold_type == HoldType.TARGET:
-            for stock in self.stock_dic.values():
-                code_list.append(stock.code)  # For now, append all codes for test
-                # TODO: Append the code that has strategy
-                # if len(stock.buy_strategy_dic) or len(stock.sell_strategy_dic):
-                #     code_list.append(stock.code)
-        return code_list
+            if self.TARGET_BY_STRATEGY:
+                return self.strategy_index.get_strategy_code_list()
+            return self.stock_dic.keys()
+        return []
+
+    def get_portfolio_summary(self) -> PortfolioSummary:
+        """보유 종목 수 / 매입금액 / 평가금액. StockStore 의 array 연산으로 구한다"""
+        return self.stock_store.get_summary()
 
     def set_account_list(self, the_account_list):
         self.account_list = the_account_list
@@ -186,14 +227,59 @@ class DataManager:
         for stock in self.temp_stock_list:
             if stock.code not in self.stock_dic:
                 self.stock_dic[stock.code] = stock
+                self.stock_store.attach(stock)
+                self._update_open_qty(stock.code)
+                stock.strategy_index = self.strategy_index
+                stock.order_book = self.order_book
+                stock.arbiter = self.signal_arbiter
+                stock.on_strategy_updated()
+                self.change_tracker.mark_added(stock.code)
         self.temp_stock_list = []
-        for listener in self.listener_list:
-            listener.on_data_updated(DataType.TABLE_BALANCE)
-            listener.on_data_updated(DataType.TABLE_TEMP_STOCK)
+        self.set_updated(DataType.TABLE_BALANCE)
+        self.set_updated(DataType.TABLE_TEMP_STOCK)
 
     def set_updated(self, the_data_type: DataType):
+        """같은 차례의 요청은 한 번으로 합쳐서 ChangeTracker 의 flush 때 알린다"""
+        self.change_tracker.mark_data_type(the_data_type)
+
+    def _on_changed(self, the_change_set: ChangeSet):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'changed. {the_change_set}')
+        if self.journal.enabled:
+            self._write_journal(the_change_set)
+        for data_type in the_change_set.data_type_list:
+            for listener in self.listener_list:
+                listener.on_data_updated(data_type)
         for listener in self.listener_list:
-            listener.on_data_updated(the_data_type)
+            listener.on_data_changed(the_change_set)
+
+    def _write_journal(self, the_change_set: ChangeSet):
+        """저장 대상 (종목 / 전략 / 목표보유수량) 이 바뀐 종목은 get_dic() 전체를 한 줄로 쓴다. 마지막 줄이 이긴다"""
+        record_list = [{'op': 'remove', 'code': code} for code in the_change_set.removed_set]
+        for code, field_set in the_change_set.field_dic.items():
+            if code in the_change_set.added_set or not field_set.isdisjoint(self.JOURNAL_FIELD_SET):
+                stock = self.stock_dic.get(code)
+                if stock is not None:
+                    record_list.append({'op': 'stock', 'stock': stock.get_dic()})
+        for code in the_change_set.added_set:
+            if code not in the_change_set.field_dic and code in self.stock_dic:
+                record_list.append({'op': 'stock', 'stock': self.stock_dic[code].get_dic()})
+        try:
+            self.journal.append(record_list)
+            if self.journal.need_compact():
+                self.save()
+        except OSError as e:
+            logger.error(f'failed to write journal. {e}')
+
+    def _on_order_updated(self, the_order: Order):
+        self._update_open_qty(the_order.code)
+        if the_order.code in self.stock_dic:
+            self.change_tracker.mark(the_order.code, 'remained_qty')
+
+    def _update_open_qty(self, the_code: str):
+        """OrderBook 의 미체결수량을 StockStore 컬럼에 옮겨둔다 (전체 종목 array 연산용)"""
+        self.stock_store.set_open_qty(the_code, self.order_book.get_open_qty(the_code, OrderSide.BUY),
+                                      self.order_book.get_open_qty(the_code, OrderSide.SELL))
 
 
 if __name__ == "__main__":
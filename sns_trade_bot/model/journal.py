@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def dumps_snapshot(the_data_dic: dict) -> str:
+    """종목 하나를 한 줄로 쓴다. indent 를 주면 json 이 C encoder 를 쓰지 못해 종목이 많을 때 느리다"""
+    head_dic = {k: v for k, v in the_data_dic.items() if k != 'stock_list'}
+    head = json.dumps(head_dic, ensure_ascii=False)
+    stock_lines = ',\n'.join(json.dumps(stock_dic, ensure_ascii=False) for stock_dic in the_data_dic['stock_list'])
+    return f'{head[:-1]}{", " if head_dic else ""}"stock_list": [\n{stock_lines}\n]}}\n'
+
+
+class Journal:
+    """snapshot 파일 + append-only journal.
+
+    변경은 journal 에 한 줄씩 (json) 더하고, write_snapshot() 은 임시 파일에 쓴 뒤 rename 해서 바꿔치기한다.
+    snapshot 에는 마지막으로 반영한 journal 번호 (journal_seq) 를 같이 써두므로, rename 뒤 journal 을 비우기 전에
+    죽어도 read() 는 그 뒤의 기록만 돌려준다. 기록을 쓰다 죽어서 잘린 마지막 줄은 버리고, 처음 append() 할 때 파일에서
+    잘라낸다. read() 는 파일을 바꾸지 않으므로 리플레이가 운영 중인 저장 파일을 읽어도 된다.
+
+    append() 는 매번 write 하고 (프로세스가 죽어도 OS 에 남는다), fsync 는 FSYNC_INTERVAL_SEC 에 한 번만 한다.
+    """
+    FSYNC_INTERVAL_SEC = 1.0
+    COMPACT_RECORD_COUNT = 1000  # journal 이 이만큼 쌓이면 snapshot 으로 합친다
+
+    def __init__(self, the_snapshot_path: str, the_journal_path: Optional[str] = None):
+        self.snapshot_path = the_snapshot_path
+        self.journal_path = the_journal_path if the_journal_path is not None else the_snapshot_path + '.journal'
+        self.enabled = False  # DataManager.load() 뒤부터 기록한다
+        self.seq = 0  # 마지막 기록 번호
+        self.record_count = 0  # snapshot 이후 기록 수
+        self.file = None
+        self.last_fsync_time = 0.0
+        self.torn_offset: Optional[int] = None  # 잘린 마지막 줄의 시작. 처음 append() 할 때 여기까지 자른다
+
+    def read(self) -> Tuple[Optional[dict], List[dict]]:
+        """
+        :return: (snapshot. 없으면 None, snapshot 이후 journal 기록)
+        """
+        data_dic = None
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf8') as f:
+                data_dic = json.load(f)
+        except FileNotFoundError:
+            logger.warning(f'no snapshot. {self.snapshot_path}')
+        snapshot_seq = data_dic.get('journal_seq', 0) if data_dic is not None else 0
+        self.seq = snapshot_seq
+        record_list = []
+        good_size = 0  # 마지막 온전한 줄의 끝
+        is_torn = False
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.endswith(b'\n'):  # append() 는 줄 끝까지 한 번에 쓴다. 쓰다가 죽어서 잘린 마지막 줄
+                        logger.warning(f'drop torn journal line {line_no}: {line[:80].decode("utf8", "replace")}')
+                        is_torn = True
+                        break
+                    good_size += len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f'skip broken journal line {line_no}: {line[:80].decode("utf8", "replace")}')
+                        continue
+                    if record['seq'] <= snapshot_seq:  # 이미 snapshot 에 들어간 기록
+                        continue
+                    record_list.append(record)
+                    self.seq = record['seq']
+        except FileNotFoundError:
+            pass
+        self.torn_offset = good_size if is_torn else None
+        self.record_count = len(record_list)
+        logger.info(f'read. snapshot_seq:{snapshot_seq}, journal records:{len(record_list)}')
+        return data_dic, record_list
+
+    def append(self, the_record_list: List[dict]):
+        """기록마다 seq 를 붙여서 한 번에 쓴다"""
+        if not the_record_list:
+            return
+        if self.file is None:
+            if self.torn_offset is not None:
+                os.truncate(self.journal_path, self.torn_offset)  # 잘린 줄에 이어 쓰지 않게 한다
+                self.torn_offset = None
+            self.file = open(self.journal_path, 'a', encoding='utf8')
+        line_list = []
+        for record in the_record_list:
+            self.seq += 1
+            record['seq'] = self.seq
+            line_list.append(json.dumps(record, ensure_ascii=False))
+        self.file.write('\n'.join(line_list) + '\n')
+        self.file.flush()
+        self.record_count += len(the_record_list)
+        now = time.monotonic()
+        if now - self.last_fsync_time >= self.FSYNC_INTERVAL_SEC:
+            os.fsync(self.file.fileno())
+            self.last_fsync_time = now
+
+    def need_compact(self) -> bool:
+        return self.record_count >= self.COMPACT_RECORD_COUNT
+
+    def write_snapshot(self, the_data_dic: dict):
+        """the_data_dic 에 journal_seq 를 넣어 임시 파일에 쓰고 rename 한다. 그 뒤 journal 을 비운다"""
+        the_data_dic['journal_seq'] = self.seq
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf8') as f:
+            f.write(dumps_snapshot(the_data_dic))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self._fsync_dir()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if os.path.exists(self.journal_path):
+            open(self.journal_path, 'w').close()  # 비운다
+        self.torn_offset = None
+        self.record_count = 0
+        logger.info(f'snapshot. stocks:{len(the_data_dic["stock_list"])}, journal_seq:{self.seq}')
+
+    def close(self):
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+
+    def _fsync_dir(self):
+        """rename 을 디스크에 남긴다. Windows 는 디렉터리를 열 수 없으므로 건너뛴다"""
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(self.snapshot_path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,263 @@
+import enum
+import itertools
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class OrderSide(enum.Enum):
+    SELL = '1'  # 매도수구분 '1':매도
+    BUY = '2'  # 매도수구분 '2':매수
+
+
+class OrderStatus(enum.Enum):
+    REQUESTED = 0  # 신호를 받아 주문을 만들었음. 아직 주문번호 없음
+    ACCEPTED = 1  # 접수
+    PARTIAL = 2  # 일부 체결
+    FILLED = 3  # 모두 체결
+    REJECTED = 4  # 주문 실패 (SendOrder 에러, 빈 주문번호)
+    CANCELLED = 5  # 취소 확인
+
+
+OPEN_STATUS_SET = {OrderStatus.REQUESTED, OrderStatus.ACCEPTED, OrderStatus.PARTIAL}
+
+# 현재 상태 -> 바꿀 수 있는 상태. 끝난 주문의 상태는 바꾸지 않는다
+NEXT_STATUS_DIC = {
+    OrderStatus.REQUESTED: {OrderStatus.ACCEPTED, OrderStatus.PARTIAL, OrderStatus.FILLED, OrderStatus.REJECTED,
+                            OrderStatus.CANCELLED},
+    OrderStatus.ACCEPTED: {OrderStatus.PARTIAL, OrderStatus.FILLED, OrderStatus.CANCELLED},
+    OrderStatus.PARTIAL: {OrderStatus.PARTIAL, OrderStatus.FILLED, OrderStatus.CANCELLED},
+    OrderStatus.FILLED: set(),
+    OrderStatus.REJECTED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+
+class Order:
+    __slots__ = ('key', 'code', 'side', 'qty', 'filled_qty', 'fill_price', 'strategy_name', 'order_id', 'status',
+                 'is_sent', 'reason')
+
+    def __init__(self, the_key: int, the_code: str, the_side: OrderSide, the_qty: int, the_strategy_name: str = ''):
+        self.key = the_key  # 주문번호를 받기 전부터 쓰는 내부 번호
+        self.code = the_code  # 종목코드
+        self.side = the_side
+        self.qty = the_qty  # 주문수량
+        self.filled_qty = 0  # 체결량 누계
+        self.fill_price = 0  # 마지막 체결가
+        self.strategy_name = the_strategy_name  # 신호를 낸 전략. 외부에서 낸 주문은 ''
+        self.order_id = ''  # 주문번호
+        self.status = OrderStatus.REQUESTED
+        self.is_sent = False  # SendOrder 요청을 큐에 넣었는지
+        self.reason = ''  # 실패 / 취소 사유
+
+    def __str__(self):
+        return f'({self.key} {self.order_id} {self.code} {self.side.name} {self.filled_qty}/{self.qty} ' \
+               f'{self.status.name} "{self.strategy_name}")'
+
+    @property
+    def remained_qty(self) -> int:
+        """미체결수량. 끝난 주문은 0"""
+        if self.status not in OPEN_STATUS_SET:
+            return 0
+        return self.qty - self.filled_qty
+
+    def is_open(self) -> bool:
+        return self.status in OPEN_STATUS_SET
+
+
+class OrderBook:
+    """당일 주문 목록 (OMS).
+
+    주문은 내부 번호 (key) 로 만들고, 주문번호는 TR 응답이나 접수 체결통보 중 먼저 온 쪽에서 붙인다.
+    주문번호, 종목코드, 상태별 색인과 종목 / 매도수별 미체결수량을 상태가 바뀔 때마다 같이 고치므로
+    신호, 체결통보, 미체결 조회가 모두 전체 종목을 돌지 않는다.
+    SendOrder 결과는 TR 스레드에서 오므로 상태를 바꾸는 메소드는 lock 을 잡는다.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.key_seq = itertools.count(1)
+        self.order_dic: Dict[int, Order] = {}  # key -> Order
+        self.order_id_dic: Dict[str, Order] = {}  # 주문번호 -> Order
+        self.code_dic: Dict[str, Dict[int, Order]] = {}  # 종목코드 -> key -> Order
+        self.status_dic: Dict[OrderStatus, Dict[int, Order]] = {status: {} for status in OrderStatus}
+        self.unbound_dic: Dict[Tuple[str, OrderSide], List[Order]] = {}  # 주문번호를 아직 못 받은 주문. 낸 순서
+        self.open_qty_dic: Dict[Tuple[str, OrderSide], int] = {}  # (종목코드, 매도수) -> 미체결수량 합
+        self.listener: Optional[Callable[[Order], None]] = None  # 주문 상태가 바뀔 때마다 호출
+
+    def __len__(self):
+        return len(self.order_dic)
+
+    def add(self, the_code: str, the_side: OrderSide, the_qty: int, the_strategy_name: str = '') -> Order:
+        with self.lock:
+            order = Order(next(self.key_seq), the_code, the_side, the_qty, the_strategy_name)
+            self.order_dic[order.key] = order
+            self.code_dic.setdefault(the_code, {})[order.key] = order
+            self.status_dic[order.status][order.key] = order
+            self.unbound_dic.setdefault((the_code, the_side), []).append(order)
+            self._add_open_qty(order, order.remained_qty)
+            logger.info(f'new order {order}')
+            self._notify(order)
+            return order
+
+    def get(self, the_key: int) -> Optional[Order]:
+        return self.order_dic.get(the_key)
+
+    def get_by_order_id(self, the_order_id: str) -> Optional[Order]:
+        return self.order_id_dic.get(the_order_id)
+
+    def get_open_qty(self, the_code: str, the_side: OrderSide) -> int:
+        return self.open_qty_dic.get((the_code, the_side), 0)
+
+    def get_order_list(self, the_code: str) -> List[Order]:
+        return list(self.code_dic.get(the_code, {}).values())
+
+    def get_open_order_list(self, the_code: str = None) -> List[Order]:
+        """미체결 주문. the_code 가 없으면 모든 종목"""
+        with self.lock:
+            if the_code is not None:
+                return [order for order in self.code_dic.get(the_code, {}).values() if order.is_open()]
+            order_list = []
+            for status in OPEN_STATUS_SET:
+                order_list.extend(self.status_dic[status].values())
+            order_list.sort(key=lambda order: order.key)
+            return order_list
+
+    def get_status_list(self, the_status: OrderStatus) -> List[Order]:
+        return list(self.status_dic[the_status].values())
+
+    def take_unsent(self, the_code: str, the_side: OrderSide) -> Optional[Order]:
+        """아직 보내지 않은 가장 오래된 주문을 보낸 것으로 표시해서 돌려준다"""
+        with self.lock:
+            for order in self.unbound_dic.get((the_code, the_side), []):
+                if not order.is_sent and order.status == OrderStatus.REQUESTED:
+                    order.is_sent = True
+                    return order
+            return None
+
+    def set_order_id(self, the_key: int, the_order_id: str) -> Optional[Order]:
+        """SendOrder TR 응답. 주문번호가 비어 있으면 주문 실패로 처리한다"""
+        with self.lock:
+            order = self.order_dic.get(the_key)
+            if order is None:
+                logger.warning(f'unknown order key:{the_key}, order_id:"{the_order_id}"')
+                return None
+            if not the_order_id:
+                self.reject(order, 'empty order_id')
+                return order
+            if order.order_id and order.order_id != the_order_id:
+                logger.warning(f'order_id mismatch. {order}, order_id:"{the_order_id}"')
+                return order
+            self._bind(order, the_order_id)
+            return order
+
+    def reject(self, the_order: Order, the_reason: str):
+        with self.lock:
+            the_order.reason = the_reason
+            self._set_status(the_order, OrderStatus.REJECTED)
+
+    def cancel(self, the_order_id: str, the_reason: str = '') -> Optional[Order]:
+        """취소 확인. the_order_id 는 원주문번호"""
+        with self.lock:
+            order = self.order_id_dic.get(the_order_id)
+            if order is None:
+                logger.warning(f'unknown order_id:"{the_order_id}" to cancel')
+                return None
+            order.reason = the_reason
+            self._set_status(order, OrderStatus.CANCELLED)
+            return order
+
+    def on_accepted(self, the_order_id: str, the_code: str, the_side: OrderSide, the_qty: int) -> Order:
+        """접수 체결통보"""
+        with self.lock:
+            order = self._find(the_order_id, the_code, the_side, the_qty)
+            self._set_status(order, OrderStatus.ACCEPTED)
+            return order
+
+    def on_filled(self, the_order_id: str, the_code: str, the_side: OrderSide, the_qty: int, the_remained_qty: int,
+                  the_price: int = 0) -> Order:
+        """체결 체결통보. 체결량 누계는 주문수량 - 미체결수량 으로 맞춘다"""
+        with self.lock:
+            order = self._find(the_order_id, the_code, the_side, the_qty)
+            if order.is_open():
+                if the_price:
+                    order.fill_price = the_price
+                status = OrderStatus.FILLED if the_remained_qty == 0 else OrderStatus.PARTIAL
+                self._set_status(order, status, order.qty - the_remained_qty)
+            return order
+
+    def clear(self):
+        with self.lock:
+            self.order_dic.clear()
+            self.order_id_dic.clear()
+            self.code_dic.clear()
+            for status_dic in self.status_dic.values():
+                status_dic.clear()
+            self.unbound_dic.clear()
+            self.open_qty_dic.clear()
+
+    def _find(self, the_order_id: str, the_code: str, the_side: OrderSide, the_qty: int) -> Order:
+        """주문번호로 찾고, 없으면 같은 종목 / 매도수의 주문번호 없는 주문에 붙인다. 그것도 없으면 HTS 등 외부 주문"""
+        order = self.order_id_dic.get(the_order_id)
+        if order is None:
+            for unbound_order in self.unbound_dic.get((the_code, the_side), []):
+                if unbound_order.status == OrderStatus.REQUESTED:
+                    order = unbound_order
+                    break
+            else:
+                order = self.add(the_code, the_side, the_qty)
+                order.is_sent = True
+            self._bind(order, the_order_id)
+        if the_qty and order.qty != the_qty and order.is_open():  # 서버의 주문수량을 따른다
+            old_remained_qty = order.remained_qty
+            order.qty = the_qty
+            self._add_open_qty(order, order.remained_qty - old_remained_qty)
+        return order
+
+    def _bind(self, the_order: Order, the_order_id: str):
+        if the_order.order_id == the_order_id:
+            return
+        the_order.order_id = the_order_id
+        self.order_id_dic[the_order_id] = the_order
+        self._unbind(the_order)
+        logger.debug(f'bind order_id "{the_order_id}" to {the_order}')
+
+    def _unbind(self, the_order: Order):
+        key = (the_order.code, the_order.side)
+        unbound_list = self.unbound_dic.get(key)
+        if unbound_list is not None and the_order in unbound_list:
+            unbound_list.remove(the_order)
+            if not unbound_list:
+                del self.unbound_dic[key]
+
+    def _set_status(self, the_order: Order, the_status: OrderStatus, the_filled_qty: int = None):
+        if the_status not in NEXT_STATUS_DIC[the_order.status]:
+            logger.warning(f'unexpected status {the_status.name} for {the_order}')
+            return
+        old_remained_qty = the_order.remained_qty
+        del self.status_dic[the_order.status][the_order.key]
+        the_order.status = the_status
+        if the_filled_qty is not None:
+            the_order.filled_qty = the_filled_qty
+        self.status_dic[the_status][the_order.key] = the_order
+        self._add_open_qty(the_order, the_order.remained_qty - old_remained_qty)
+        if the_status not in OPEN_STATUS_SET:
+            self._unbind(the_order)  # 주문번호 없이 끝난 주문은 체결통보에 붙이지 않는다
+        logger.info(f'order {the_order}')
+        self._notify(the_order)
+
+    def _add_open_qty(self, the_order: Order, the_diff: int):
+        if the_diff == 0:
+            return
+        key = (the_order.code, the_order.side)
+        qty = self.open_qty_dic.get(key, 0) + the_diff
+        if qty:
+            self.open_qty_dic[key] = qty
+        else:
+            self.open_qty_dic.pop(key, None)
+
+    def _notify(self, the_order: Order):
+        if self.listener is not None:
+            self.listener(the_order)
@@ -1,30 +1,57 @@
 import logging
 
+from sns_trade_bot.model.order import OrderSide
+from sns_trade_bot.model.stock_store import QtyColumn, StockStore, StoreColumn
+from sns_trade_bot.strategy.registry import StrategyKind, strategy_registry
+
 logger = logging.getLogger(__name__)
 
 
 class Stock:
+    """종목 하나. 가격 / 수량 값은 StockStore 의 자기 행에 있고, 전략과 이름 등만 객체에 둔다"""
     COMMISSION_FACTOR = 0.997  # 대략적으로 수수료 및 세금 고려
 
-    def __init__(self, the_listener_list: list, the_code: str, the_name: str = 'UNDEFINED', the_cur_price: int = 0):
+    cur_price = StoreColumn()  # 현재가
+    top_price = StoreColumn()  # 보유중 최고가
+    buy_price = StoreColumn()  # 매입가
+    qty = QtyColumn()  # 보유수량
+    target_qty = StoreColumn()  # 목표보유수량
+    earning_rate = StoreColumn()  # 수익률 (%)
+
+    def __init__(self, the_listener_list: list, the_code: str, the_name: str = 'UNDEFINED', the_cur_price: int = 0,
+                 the_strategy_index=None, the_order_book=None, the_arbiter=None, the_store: StockStore = None):
+        """
+        :param the_store: DataManager 의 StockStore. None 이면 1 행짜리 store 를 만들고, DataManager 에 추가될 때 옮긴다
+        """
         self.listener_list = the_listener_list
+        self.strategy_index = the_strategy_index  # StrategyIndex. DataManager 에 추가되기 전에는 None
+        self.order_book = the_order_book  # OrderBook. DataManager 에 추가되기 전에는 None
+        self.arbiter = the_arbiter  # SignalArbiter. DataManager 에 추가되기 전에는 None
         self.code = the_code  # 종목코드
-        self.name = the_name  # 종목명
-        self.cur_price = the_cur_price  # 현재가
-        self.top_price = 0  # 보유중 최고가
-        self.buy_price: int = 0  # 매입가
-        self.qty: int = 0  # 보유수량
-        self.earning_rate: float = 0.0  # 수익률 (%)
+        self._name = the_name  # 종목명
+        self.store = the_store if the_store is not None else StockStore(1)
+        self.row = self.store.add(the_code)
+        self.cur_price = the_cur_price
         self.buy_strategy_dic: dict = {}
         self.sell_strategy_dic: dict = {}
-        self.target_qty: int = 0  # 목표보유수량
-        self.remained_buy_qty: int = 0
-        self.remained_sell_qty: int = 0
+        self._remained_buy_qty: int = 0  # order_book 이 없을 때만 쓴다
+        self._remained_sell_qty: int = 0
 
     def __str__(self):
         return f'({self.code} {self.name} {self.cur_price} {self.buy_price} {self.top_price} {self.qty} ' \
                f'{list(self.buy_strategy_dic.keys())} {list(self.sell_strategy_dic.keys())} {self.target_qty})'
 
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, the_name: str):
+        if the_name == self._name:  # TR 응답마다 같은 이름을 다시 넣는다. journal 에 쓰지 않는다
+            return
+        self._name = the_name
+        self._mark_changed('name')
+
     def get_dic(self):
         ret = {
             "code": self.code,
@@ -40,45 +67,79 @@ class Stock:
         return ret
 
     def add_buy_strategy(self, the_strategy_name, the_param_dic):
-        from sns_trade_bot.strategy.buy_just_buy import BuyJustBuy
-        from sns_trade_bot.strategy.buy_on_opening import BuyOnOpening
-        from sns_trade_bot.strategy.buy_on_closing import BuyOnClosing
-        if the_strategy_name == 'buy_just_buy':
-            self.buy_strategy_dic[the_strategy_name] = BuyJustBuy(self, the_param_dic)
-        elif the_strategy_name == 'buy_on_opening':
-            self.buy_strategy_dic[the_strategy_name] = BuyOnOpening(self, the_param_dic)
-        elif the_strategy_name == 'buy_on_closing':
-            self.buy_strategy_dic[the_strategy_name] = BuyOnClosing(self, the_param_dic)
-        else:
-            logger.error(f'unknown buy strategy "{the_strategy_name}" for "{self.name}"')
+        self._add_strategy(StrategyKind.BUY, self.buy_strategy_dic, the_strategy_name, the_param_dic)
 
     def add_sell_strategy(self, the_strategy_name, the_param_dic):
-        from sns_trade_bot.strategy.sell_on_closing import SellOnClosing
-        from sns_trade_bot.strategy.sell_stop_loss import SellStopLoss
-        from sns_trade_bot.strategy.sell_on_condition import SellOnCondition
-        from sns_trade_bot.strategy.sell_just_sell import SellJustSell
-        if the_strategy_name == 'sell_on_closing':
-            self.sell_strategy_dic[the_strategy_name] = SellOnClosing(self, the_param_dic)
-        elif the_strategy_name == 'sell_stop_loss':
-            self.sell_strategy_dic[the_strategy_name] = SellStopLoss(self, the_param_dic)
-        elif the_strategy_name == 'sell_on_condition':
-            self.sell_strategy_dic[the_strategy_name] = SellOnCondition(self, the_param_dic)
-        elif the_strategy_name == SellJustSell.NAME:
-            self.sell_strategy_dic[the_strategy_name] = SellJustSell(self, the_param_dic)
+        self._add_strategy(StrategyKind.SELL, self.sell_strategy_dic, the_strategy_name, the_param_dic)
+
+    def _add_strategy(self, the_kind: StrategyKind, the_strategy_dic: dict, the_strategy_name, the_param_dic):
+        strategy = strategy_registry.create(the_kind, the_strategy_name, self, the_param_dic)
+        if strategy is None:
+            logger.error(f'unknown {the_kind.value} strategy "{the_strategy_name}" for "{self.name}"')
         else:
-            logger.error(f'unknown sell strategy "{the_strategy_name}" for "{self.name}"')
+            the_strategy_dic[the_strategy_name] = strategy
+        self.on_strategy_updated()
+
+    def clear_buy_strategy(self):
+        self.buy_strategy_dic.clear()
+        self.on_strategy_updated()
+
+    def clear_sell_strategy(self):
+        self.sell_strategy_dic.clear()
+        self.on_strategy_updated()
+
+    def on_strategy_updated(self):
+        """전략 추가 / 삭제 / enabled 변경 시 전략 색인을 갱신한다"""
+        if self.strategy_index is not None:
+            self.strategy_index.update(self)
+        self._mark_changed('buy_strategy_dic', 'sell_strategy_dic')
+
+    def _mark_changed(self, *the_field_tuple: str):
+        """StockStore 컬럼이 아닌 속성의 변경을 ChangeTracker 에 표시한다"""
+        if self.store.tracker is not None:
+            self.store.tracker.mark_list(self.code, the_field_tuple)
+
+    @property
+    def remained_buy_qty(self) -> int:
+        """미체결 매수 수량. OrderBook 의 열린 주문 합계 + SignalArbiter 에 모여 아직 주문이 되지 않은 수량"""
+        if self.order_book is None:
+            return self._remained_buy_qty
+        qty = self.order_book.get_open_qty(self.code, OrderSide.BUY)
+        if self.arbiter is not None:
+            qty += self.arbiter.get_pending_qty(self.code, OrderSide.BUY)
+        return qty
+
+    @property
+    def remained_sell_qty(self) -> int:
+        if self.order_book is None:
+            return self._remained_sell_qty
+        qty = self.order_book.get_open_qty(self.code, OrderSide.SELL)
+        if self.arbiter is not None:
+            qty += self.arbiter.get_pending_qty(self.code, OrderSide.SELL)
+        return qty
 
     def on_buy_signal(self, the_strategy_name: str, the_order_qty: int):
+        """SignalArbiter 가 같은 차례의 신호를 모아 주문을 만들고 listener 에 알린다"""
         logger.info(f'buy_signal!! {self.name}({self.code}). strategy:"{the_strategy_name}", qty:{the_order_qty}')
+        if self.arbiter is not None:
+            self.arbiter.add(self, OrderSide.BUY, the_order_qty, the_strategy_name)
+            return
+        self._remained_buy_qty = the_order_qty
         for listener in self.listener_list:
             listener.on_buy_signal(self.code, the_order_qty)
-        self.remained_buy_qty = the_order_qty
 
     def on_sell_signal(self, the_strategy_name: str, the_order_qty: int):
         logger.info(f'sell_signal!! {self.name}({self.code}). strategy:"{the_strategy_name}", qty:{the_order_qty}')
+        if self.arbiter is not None:
+            self.arbiter.add(self, OrderSide.SELL, the_order_qty, the_strategy_name)
+            return
+        self._remained_sell_qty = the_order_qty
         for listener in self.listener_list:
             listener.on_sell_signal(self.code, the_order_qty)
-        self.remained_sell_qty = the_order_qty
+
+    def update_price(self, the_price: int):
+        """실시간 체결. cur_price 와 earning_rate 를 갱신한다"""
+        self.store.set_price(self.row, the_price, self.COMMISSION_FACTOR)
 
     def update_earning_rate(self):
         if self.qty == 0:
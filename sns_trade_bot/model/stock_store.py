@@ -0,0 +1,216 @@
+import logging
+from typing import Dict, KeysView, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (컬럼, dtype). Stock 의 같은 이름 속성이 이 컬럼의 한 행을 읽고 쓴다
+COLUMN_LIST = [
+    ('cur_price', np.int64),  # 현재가
+    ('top_price', np.int64),  # 보유중 최고가
+    ('buy_price', np.int64),  # 매입가
+    ('qty', np.int64),  # 보유수량
+    ('target_qty', np.int64),  # 목표보유수량
+    ('earning_rate', np.float64),  # 수익률 (%)
+    ('remained_buy_qty', np.int64),  # 미체결 매수 수량. OrderBook 의 값을 옮겨둔 것
+    ('remained_sell_qty', np.int64),  # 미체결 매도 수량
+]
+
+
+class StoreColumn:
+    """Stock 속성 -> StockStore 컬럼의 stock.row 행. 값은 numpy scalar 가 아닌 int / float 로 돌려준다
+
+    쓸 때 store 에 ChangeTracker 가 있으면 (종목코드, 컬럼) 을 표시한다.
+    """
+
+    def __set_name__(self, the_owner, the_name):
+        self.name = the_name
+
+    def __get__(self, the_stock, the_owner):
+        if the_stock is None:
+            return self
+        return getattr(the_stock.store, self.name).item(the_stock.row)
+
+    def __set__(self, the_stock, the_value):
+        store = the_stock.store
+        getattr(store, self.name)[the_stock.row] = the_value
+        if store.tracker is not None:
+            store.tracker.mark(the_stock.code, self.name)
+
+
+class QtyColumn(StoreColumn):
+    """보유수량. 쓸 때 StockStore 의 보유 / 관심 종목 색인도 고친다"""
+
+    def __set__(self, the_stock, the_value):
+        store = the_stock.store
+        store.set_qty(the_stock.row, the_value)
+        if store.tracker is not None:
+            store.tracker.mark(the_stock.code, self.name)
+
+
+class PortfolioSummary:
+    def __init__(self, the_count: int, the_buy_amount: int, the_eval_amount: int):
+        self.count = the_count  # 보유 종목 수
+        self.buy_amount = the_buy_amount  # 총매입금액
+        self.eval_amount = the_eval_amount  # 평가금액 (현재가 기준)
+
+    def __str__(self):
+        return f'(count:{self.count}, buy:{self.buy_amount}, eval:{self.eval_amount}, ' \
+               f'earning:{self.get_earning()} ({self.get_earning_rate():.2f}%))'
+
+    def get_earning(self) -> int:
+        return self.eval_amount - self.buy_amount
+
+    def get_earning_rate(self) -> float:
+        return self.get_earning() / self.buy_amount * 100 if self.buy_amount else 0.0
+
+
+class StockStore:
+    """종목별 상태를 컬럼마다 numpy array 하나로 들고 있는다.
+
+    종목코드 -> 행 번호 색인을 두고, Stock 은 자기 행을 가리키는 view 다. 체결 한 건은 array 쓰기 한 번이고,
+    보유 종목 목록이나 평가금액 같은 전체 종목 계산은 Python 객체를 돌지 않고 array 연산으로 한다.
+    지운 행은 valid 를 끄고 다음 add() 때 다시 쓴다. 자리가 모자라면 두 배로 늘린다.
+    보유 (qty > 0) / 관심 (qty == 0) 종목코드는 qty 를 쓸 때마다 고쳐두므로, 목록은 O(1) 로 view 를 돌려준다.
+    그래서 qty 컬럼은 set_qty() 나 Stock.qty 로만 쓴다.
+    """
+
+    def __init__(self, the_capacity: int = 64):
+        self.capacity = max(1, the_capacity)
+        self.row_dic: Dict[str, int] = {}  # 종목코드 -> 행
+        self.code_list: List[Optional[str]] = [None] * self.capacity  # 행 -> 종목코드
+        self.free_row_list: List[int] = list(range(self.capacity - 1, -1, -1))  # pop() 으로 작은 행부터
+        self.valid = np.zeros(self.capacity, dtype=bool)
+        for name, dtype in COLUMN_LIST:
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+        self.holding_dic: Dict[str, None] = {}  # 보유 종목코드. 순서 있는 set 으로 쓴다
+        self.interest_dic: Dict[str, None] = {}  # 관심 (미보유) 종목코드
+        self.tracker = None  # ChangeTracker. DataManager 의 store 만 둔다
+
+    def __len__(self):
+        return len(self.row_dic)
+
+    def __contains__(self, the_code: str):
+        return the_code in self.row_dic
+
+    def add(self, the_code: str) -> int:
+        """
+        :return: 새 행. 이미 있는 종목이면 그 행
+        """
+        row = self.row_dic.get(the_code)
+        if row is not None:
+            return row
+        if not self.free_row_list:
+            self._grow()
+        row = self.free_row_list.pop()
+        for name, _ in COLUMN_LIST:
+            getattr(self, name)[row] = 0
+        self.valid[row] = True
+        self.row_dic[the_code] = row
+        self.code_list[row] = the_code
+        self.interest_dic[the_code] = None
+        return row
+
+    def remove(self, the_code: str):
+        row = self.row_dic.pop(the_code, None)
+        if row is None:
+            return
+        self.valid[row] = False
+        self.code_list[row] = None
+        self.free_row_list.append(row)
+        self.holding_dic.pop(the_code, None)
+        self.interest_dic.pop(the_code, None)
+
+    def get_row(self, the_code: str) -> Optional[int]:
+        return self.row_dic.get(the_code)
+
+    def attach(self, the_stock):
+        """다른 store 의 Stock 을 이 store 로 옮긴다. 값을 복사하고 stock 이 새 행을 가리키게 한다"""
+        if the_stock.store is self:
+            return
+        row = self.add(the_stock.code)
+        for name, _ in COLUMN_LIST:
+            getattr(self, name)[row] = getattr(the_stock.store, name)[the_stock.row]
+        self._update_hold(the_stock.code, self.qty.item(row))
+        the_stock.store = self
+        the_stock.row = row
+
+    def detach(self, the_stock):
+        """이 store 에서 지우는 Stock 을 1 행짜리 store 로 옮긴다. 지운 행을 다른 종목이 다시 써도 값이 섞이지 않도록"""
+        if the_stock.store is not self:
+            return
+        store = StockStore(1)
+        store.attach(the_stock)
+        self.remove(the_stock.code)
+
+    def get_code_list(self, the_mask: np.ndarray = None) -> List[str]:
+        """the_mask 가 True 인 종목코드. 행 순서"""
+        mask = self.valid if the_mask is None else self.valid & the_mask
+        code_list = self.code_list
+        return [code_list[row] for row in np.flatnonzero(mask).tolist()]
+
+    def get_holding_code_list(self) -> KeysView[str]:
+        """보유 종목코드 view. 보유수량이 바뀐 순서"""
+        return self.holding_dic.keys()
+
+    def get_interest_code_list(self) -> KeysView[str]:
+        return self.interest_dic.keys()
+
+    def set_qty(self, the_row: int, the_qty: int):
+        old_qty = self.qty.item(the_row)
+        self.qty[the_row] = the_qty
+        if (old_qty > 0) != (the_qty > 0):
+            self._update_hold(self.code_list[the_row], the_qty)
+
+    def set_open_qty(self, the_code: str, the_buy_qty: int, the_sell_qty: int):
+        row = self.row_dic.get(the_code)
+        if row is not None:
+            self.remained_buy_qty[row] = the_buy_qty
+            self.remained_sell_qty[row] = the_sell_qty
+
+    def set_price(self, the_row: int, the_price: int, the_commission_factor: float):
+        """체결 한 건. 현재가와 수익률을 같이 쓴다 (Stock.cur_price, update_earning_rate() 를 따로 부르는 것보다 빠르다)"""
+        self.cur_price[the_row] = the_price
+        buy_price = self.buy_price.item(the_row)
+        if buy_price and self.qty.item(the_row):
+            self.earning_rate[the_row] = (the_price * the_commission_factor - buy_price) / buy_price * 100
+        else:
+            self.earning_rate[the_row] = 0.0
+        if self.tracker is not None:
+            self.tracker.mark_price(self.code_list[the_row])
+
+    def update_earning_rate(self, the_commission_factor: float):
+        """모든 보유 종목의 수익률을 한 번에 다시 계산한다 (Stock.update_earning_rate() 와 같은 식)"""
+        holding = self.valid & (self.qty > 0) & (self.buy_price > 0)
+        buy_price = self.buy_price[holding]
+        self.earning_rate[:] = 0.0
+        self.earning_rate[holding] = (self.cur_price[holding] * the_commission_factor - buy_price) / buy_price * 100
+
+    def get_summary(self) -> PortfolioSummary:
+        holding = self.valid & (self.qty > 0)
+        qty = self.qty[holding]
+        return PortfolioSummary(int(holding.sum()), int(np.dot(self.buy_price[holding], qty)),
+                                int(np.dot(self.cur_price[holding], qty)))
+
+    def _update_hold(self, the_code: Optional[str], the_qty: int):
+        if the_code is None:
+            return
+        if the_qty > 0:
+            self.interest_dic.pop(the_code, None)
+            self.holding_dic[the_code] = None
+        else:
+            self.holding_dic.pop(the_code, None)
+            self.interest_dic[the_code] = None
+
+    def _grow(self):
+        old_capacity = self.capacity
+        self.capacity = old_capacity * 2
+        for name, _ in COLUMN_LIST + [('valid', bool)]:
+            old_array = getattr(self, name)
+            new_array = np.zeros(self.capacity, dtype=old_array.dtype)
+            new_array[:old_capacity] = old_array
+            setattr(self, name, new_array)
+        self.code_list.extend([None] * old_capacity)
+        self.free_row_list.extend(range(self.capacity - 1, old_capacity - 1, -1))
+        logger.debug(f'grow {old_capacity} -> {self.capacity}')
@@ -0,0 +1,101 @@
+import logging
+from typing import Callable, Dict, KeysView, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StrategyEntry:
+    __slots__ = ('stock', 'sell_list', 'buy_list', 'tick_sell_list')
+
+    def __init__(self, the_stock, the_sell_list: list, the_buy_list: list):
+        self.stock = the_stock
+        self.sell_list = the_sell_list  # 활성 매도 전략
+        self.buy_list = the_buy_list  # 활성 매수 전략
+        # batch 검사 중일 때 체결마다 부를 매도 전략 (BATCH_EVALUATED 전략 제외)
+        self.tick_sell_list = [strategy for strategy in the_sell_list if not strategy.BATCH_EVALUATED]
+
+
+class StrategyIndex:
+    """종목코드별 활성 전략 색인.
+
+    on_price_updated() 를 구현한 활성 전략이 있는 종목만 들고 있으므로, 실시간 체결마다 전략 dict 를 돌며
+    enabled 를 확인할 필요가 없다. TARGET_TIME 이 있는 전략은 시각별로 따로 모아서 on_time() 대상만 찾는다.
+    전략 추가 / 삭제 / enabled 변경 시 Stock 이 update() 를 호출한다.
+    enabled 와 상관없이 전략이 하나라도 있는 종목코드도 따로 들고 있는다. (HoldType.TARGET)
+    """
+
+    def __init__(self):
+        self.entry_dic: Dict[str, StrategyEntry] = {}  # 종목코드 -> on_price_updated() 전략
+        self.time_entry_dic: Dict[str, Dict[str, StrategyEntry]] = {}  # TARGET_TIME -> 종목코드 -> on_time() 전략
+        self.strategy_code_dic: Dict[str, None] = {}  # 전략이 있는 종목코드. 순서 있는 set 으로 쓴다
+        self.time_listener: Optional[Callable[[str], None]] = None  # 새 TARGET_TIME 이 처음 등록될 때 호출
+        self.version = 0  # entry_dic 이 바뀔 때마다 증가. StopLossBatch 가 다시 만들지 판단한다
+
+    def __len__(self):
+        return len(self.entry_dic)
+
+    def get(self, the_code: str) -> Optional[StrategyEntry]:
+        return self.entry_dic.get(the_code)
+
+    def get_time_entry_list(self, the_time_str: str) -> List[StrategyEntry]:
+        return list(self.time_entry_dic.get(the_time_str, {}).values())
+
+    def get_time_list(self) -> List[str]:
+        return list(self.time_entry_dic.keys())
+
+    def get_strategy_code_list(self) -> KeysView[str]:
+        return self.strategy_code_dic.keys()
+
+    def update(self, the_stock):
+        self.version += 1
+        if the_stock.buy_strategy_dic or the_stock.sell_strategy_dic:
+            self.strategy_code_dic[the_stock.code] = None
+        else:
+            self.strategy_code_dic.pop(the_stock.code, None)
+        self._update_time(the_stock)
+        sell_list = self._get_price_strategy_list(the_stock.sell_strategy_dic)
+        buy_list = self._get_price_strategy_list(the_stock.buy_strategy_dic)
+        if not sell_list and not buy_list:
+            if self.entry_dic.pop(the_stock.code, None) is not None:
+                logger.debug(f'no enabled price strategy. remove {the_stock.code}')
+            return
+        self.entry_dic[the_stock.code] = StrategyEntry(the_stock, sell_list, buy_list)
+
+    def remove(self, the_code: str):
+        self.version += 1
+        self.entry_dic.pop(the_code, None)
+        self.strategy_code_dic.pop(the_code, None)
+        for entry_dic in self.time_entry_dic.values():
+            entry_dic.pop(the_code, None)
+
+    def clear(self):
+        self.version += 1
+        self.entry_dic.clear()
+        self.strategy_code_dic.clear()
+        for entry_dic in self.time_entry_dic.values():
+            entry_dic.clear()
+
+    def _update_time(self, the_stock):
+        for entry_dic in self.time_entry_dic.values():
+            entry_dic.pop(the_stock.code, None)
+        time_dic: Dict[str, StrategyEntry] = {}
+        for strategy in the_stock.sell_strategy_dic.values():
+            if strategy.enabled and strategy.TARGET_TIME:
+                time_dic.setdefault(strategy.TARGET_TIME, StrategyEntry(the_stock, [], [])).sell_list.append(strategy)
+        for strategy in the_stock.buy_strategy_dic.values():
+            if strategy.enabled and strategy.TARGET_TIME:
+                time_dic.setdefault(strategy.TARGET_TIME, StrategyEntry(the_stock, [], [])).buy_list.append(strategy)
+        for time_str, entry in time_dic.items():
+            entry_dic = self.time_entry_dic.get(time_str)
+            if entry_dic is None:
+                entry_dic = self.time_entry_dic[time_str] = {}
+                if self.time_listener is not None:
+                    self.time_listener(time_str)
+            entry_dic[the_stock.code] = entry
+
+    @staticmethod
+    def _get_price_strategy_list(the_strategy_dic: dict) -> List:
+        """활성 전략 중 on_price_updated() 를 구현한 전략 list"""
+        from sns_trade_bot.strategy.base import StrategyBase
+        return [strategy for strategy in the_strategy_dic.values()
+                if strategy.enabled and type(strategy).on_price_updated is not StrategyBase.on_price_updated]
@@ -0,0 +1,130 @@
+import logging
+import queue
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(the_value: Optional[str], the_now: Optional[float] = None) -> Optional[float]:
+    """Retry-After 헤더 (초 또는 HTTP-date) 를 기다릴 초로 바꾼다. 없거나 읽을 수 없으면 None
+
+    :param the_now: HTTP-date 와 비교할 현재 시각 (epoch 초). None 이면 time.time()
+    """
+    if not the_value:
+        return None
+    the_value = the_value.strip()
+    if the_value.isdigit():
+        return float(the_value)
+    try:
+        retry_time = parsedate_to_datetime(the_value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        logger.warning(f'invalid Retry-After:"{the_value}"')
+        return None
+    now = time.time() if the_now is None else the_now
+    return max(0.0, retry_time - now)
+
+
+class Notifier:
+    """slack webhook 전송 전용 스레드.
+
+    send() 는 payload 를 큐에 넣고 바로 반환한다. 전송 스레드는 keep-alive 세션 하나를 재사용하고,
+    merge_window 초 안에 들어온 메시지들의 block 을 합쳐 한 번에 보낸다. 실패하면 지수적으로 대기 후 재시도한다.
+    """
+    MERGE_WINDOW = 0.5  # unit: sec
+    MAX_BLOCK_COUNT = 50  # slack 메시지 하나에 넣을 수 있는 최대 block 수
+    MAX_RETRY = 3
+    BACK_OFF_BASE = 0.5  # unit: sec
+    BACK_OFF_MAX = 60.0  # unit: sec. Retry-After 가 이보다 길어도 이만큼만 기다린다
+    TIMEOUT = 5.0  # unit: sec
+
+    def __init__(self, the_url: str, the_merge_window: float = MERGE_WINDOW, the_session: requests.Session = None):
+        self.url = the_url
+        self.merge_window = the_merge_window
+        self.session = the_session if the_session is not None else self._create_session()
+        self.msg_queue = queue.Queue()
+        self.post_count = 0  # 실제 POST 횟수 (재시도 포함)
+        self.sent_count = 0  # 성공한 POST 횟수
+        self.failed_count = 0
+        self.thread = threading.Thread(target=self._run, name='notifier')
+        self.thread.daemon = True
+        self.thread.start()
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def send(self, payload: dict):
+        self.msg_queue.put(payload)
+
+    def flush(self):
+        """큐에 쌓인 메시지를 모두 보낼 때까지 기다린다"""
+        self.msg_queue.join()
+
+    def _run(self):
+        while True:
+            payload_list = [self.msg_queue.get()]
+            deadline = time.monotonic() + self.merge_window
+            while True:
+                remained = deadline - time.monotonic()
+                if remained <= 0:
+                    break
+                try:
+                    payload_list.append(self.msg_queue.get(timeout=remained))
+                except queue.Empty:
+                    break
+            try:
+                for merged in self._merge(payload_list):
+                    self._post(merged)
+            except Exception as e:  # 전송 스레드는 죽지 않아야 함
+                logger.exception(f'unexpected error: {e}')
+            finally:
+                for _ in payload_list:
+                    self.msg_queue.task_done()
+
+    def _merge(self, payload_list: List[dict]) -> List[dict]:
+        merged_list = []
+        block_list = []
+        for payload in payload_list:
+            blocks = payload.get('blocks', [])
+            if block_list and len(block_list) + len(blocks) > self.MAX_BLOCK_COUNT:
+                merged_list.append({'blocks': block_list})
+                block_list = []
+            block_list.extend(blocks)
+        if block_list:
+            merged_list.append({'blocks': block_list})
+        logger.debug(f'merge {len(payload_list)} messages into {len(merged_list)}')
+        return merged_list
+
+    def _post(self, payload: dict) -> bool:
+        for retry in range(self.MAX_RETRY + 1):
+            try:
+                self.post_count += 1
+                response = self.session.post(self.url, json=payload, timeout=self.TIMEOUT)
+                if response.status_code < 400:
+                    self.sent_count += 1
+                    return True
+                logger.warning(f'status_code:{response.status_code}, text:"{response.text}"')
+                retry_after = response.headers.get('Retry-After')
+                if response.status_code < 500 and response.status_code != 429:
+                    break  # 재시도해도 소용없는 요청
+            except requests.RequestException as e:
+                logger.warning(f'failed to post. {e}')
+                retry_after = None
+            if retry < self.MAX_RETRY:
+                back_off_time = parse_retry_after(retry_after)
+                if back_off_time is None:
+                    back_off_time = self.BACK_OFF_BASE * (2 ** retry)
+                time.sleep(min(back_off_time, self.BACK_OFF_MAX))
+        self.failed_count += 1
+        logger.error(f'give up posting message. blocks:{len(payload["blocks"])}')
+        return False
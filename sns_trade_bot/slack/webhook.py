@@ -1,20 +1,39 @@
+import threading
 from typing import List
 
-import requests
 from keys import webhook_url
+from sns_trade_bot.model.order import Order
 from sns_trade_bot.model.stock import Stock
+from sns_trade_bot.model.stock_store import PortfolioSummary
+from sns_trade_bot.slack.notifier import Notifier
 
 
 class MsgSender:
+    """slack 메시지를 만들어 Notifier 에 넘긴다. 전송은 Notifier 스레드에서 하므로 호출 측은 기다리지 않는다."""
+    notifier: Notifier = None
+    notifier_lock = threading.Lock()
+
+    @staticmethod
+    def get_notifier() -> Notifier:
+        with MsgSender.notifier_lock:
+            if MsgSender.notifier is None:
+                MsgSender.notifier = Notifier(webhook_url)
+        return MsgSender.notifier
+
     @staticmethod
-    def send_balance(stock_list: List[Stock]):
+    def send_balance(stock_list: List[Stock], summary: PortfolioSummary = None):
+        """보유수량이 있는 종목만 보낸다. summary 가 있으면 제목에 보유 종목 합계를 붙인다"""
+        title = '현재잔고'
+        if summary is not None:
+            title += f' {summary.count}종목, 매입:{summary.buy_amount}, 평가:{summary.eval_amount}, ' \
+                     f'손익:{summary.get_earning()} ({summary.get_earning_rate():.1f}%)'
         payload = {
             "blocks": [
                 {
                     "type": "section",
                     "text": {
                         "type": "mrkdwn",
-                        "text": "현재잔고"
+                        "text": title
                     }
                 },
                 {
@@ -46,7 +65,14 @@ class MsgSender:
             payload['blocks'].append(block)
             payload['blocks'].append({"type": "divider"})
 
-        requests.post(webhook_url, json=payload)
+        MsgSender.get_notifier().send(payload)
+
+    @staticmethod
+    def send_open_order_list(order_list: List[Order]):
+        """OrderBook.get_open_order_list() 의 미체결 주문"""
+        lines = [f'`{order.code}` {order.side.name} {order.filled_qty}/{order.qty}주 {order.status.name} '
+                 f'order_id:{order.order_id or "-"} {order.strategy_name}' for order in order_list]
+        MsgSender.send_msg(f'미체결주문 {len(order_list)}건\n' + '\n'.join(lines))
 
     @staticmethod
     def send_msg(msg):
@@ -61,7 +87,7 @@ class MsgSender:
                 }
             ]
         }
-        requests.post(webhook_url, json=payload)
+        MsgSender.get_notifier().send(payload)
 
     @staticmethod
     def send_multi_dic_msg(single_dic, multi_dic):
@@ -79,7 +105,7 @@ class MsgSender:
                 }
             ]
         }
-        requests.post(webhook_url, json=payload)
+        MsgSender.get_notifier().send(payload)
 
         payload = {
             "blocks": []
@@ -97,7 +123,7 @@ class MsgSender:
             payload['blocks'].append(block)
             payload['blocks'].append({"type": "divider"})
 
-        requests.post(webhook_url, json=payload)
+        MsgSender.get_notifier().send(payload)
 
 
 if __name__ == "__main__":
@@ -126,4 +152,5 @@ if __name__ == "__main__":
         "당일매매수수료": "80"
     }}
     MsgSender.send_multi_dic_msg(temp_single_dic, temp_multi_dic)
+    MsgSender.get_notifier().flush()
 
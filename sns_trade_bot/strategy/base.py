@@ -6,15 +6,27 @@ logger = logging.getLogger(__name__)
 class StrategyBase:
     NAME = 'strategy_base'
     DEFAULT_PARAM = {}
-    BUY_STRATEGY_LIST = ['buy_on_closing', 'buy_just_buy', 'buy_on_opening']
-    SELL_STRATEGY_LIST = ['sell_stop_loss', 'sell_on_closing', 'sell_on_condition', 'sell_just_sell']
 
-    enabled = True
+    TARGET_TIME = None  # 'HHMMSS'. 이 시각에 on_time() 이 호출된다
+    BATCH_EVALUATED = False  # True 면 체결이 많을 때 on_price_updated() 대신 전체 종목을 한 번에 검사한다
+
+    _enabled = True
 
     def __init__(self, the_stock, the_param_dic):
         self.stock = the_stock
         logger.info("StrategyBase. %s, %s", the_stock.name, str(the_param_dic))
 
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, the_enabled: bool):
+        if self._enabled == the_enabled:
+            return
+        self._enabled = the_enabled
+        self.stock.on_strategy_updated()  # 비활성화된 전략은 실시간 체결 때 호출하지 않도록
+
     def get_param_dic(self):
         return {}
 
@@ -1,9 +1,11 @@
 import logging
 from sns_trade_bot.strategy.base import StrategyBase
+from sns_trade_bot.strategy.registry import StrategyKind, register_strategy
 
 logger = logging.getLogger(__name__)
 
 
+@register_strategy(StrategyKind.BUY)
 class BuyJustBuy(StrategyBase):
     NAME = 'buy_just_buy'
     DEFAULT_BUDGET = 300  # 천원
@@ -17,10 +19,11 @@ class BuyJustBuy(StrategyBase):
         logger.info(f'{self.NAME} strategy created for {self.stock.name}')
 
     def on_price_updated(self):
-        logger.info('JustBuy')
         if self.stock.remained_buy_qty:
-            logger.info(f'remained_buy_qty:{self.stock.remained_buy_qty}. do nothing')
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'remained_buy_qty:{self.stock.remained_buy_qty}. do nothing')
             return
+        logger.info('JustBuy')
 
         self.stock.target_qty = (self.budget * 1000) // self.stock.cur_price
         logger.info(f'budget:{self.budget}, target_qty:{self.stock.target_qty}')
@@ -1,9 +1,11 @@
 import logging
 from sns_trade_bot.strategy.base import StrategyBase
+from sns_trade_bot.strategy.registry import StrategyKind, register_strategy
 
 logger = logging.getLogger(__name__)
 
 
+@register_strategy(StrategyKind.BUY)
 class BuyOnClosing(StrategyBase):
     NAME = 'buy_on_closing'
     DEFAULT_BUDGET = 300  # 천원
@@ -0,0 +1,134 @@
+import importlib
+import logging
+import pkgutil
+from enum import Enum
+from importlib import metadata
+from typing import Dict, List, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+
+class StrategyKind(Enum):
+    BUY = 'buy'
+    SELL = 'sell'
+
+
+registered_class_dic: Dict['StrategyKind', Dict[str, Type]] = {}  # @register_strategy() 로 등록된 class
+
+
+class StrategyRegistry:
+    """전략 이름 -> 전략 class. Stock.add_buy_strategy() / add_sell_strategy(), UI combo box, json 로드가 같이 쓴다
+
+    전략 class 는 모듈에서 @register_strategy() 로 NAME 과 종류를 등록한다.
+    내장 전략은 BUILTIN_PACKAGE 의 모듈 파일 이름으로 찾으므로 전략을 추가할 때 목록을 고칠 필요가 없다.
+    이름 목록은 import 없이 만들 수 있고, 모듈은 그 전략이 처음 필요할 때 import 한다. 한번 찾은 class 는 캐시한다.
+    외부 패키지의 전략은 entry point group ENTRY_POINT_GROUP_DIC 으로 찾는다. 이름은 entry point 이름.
+        [project.entry-points."sns_trade_bot.buy_strategy"]
+        buy_my_strategy = "my_package.buy_my_strategy:BuyMyStrategy"
+    """
+    BUILTIN_PACKAGE = 'sns_trade_bot.strategy'  # 내장 전략 모듈은 이 package 의 buy_*.py / sell_*.py. 모듈 이름이 전략 이름
+    MODULE_PREFIX_DIC = {
+        StrategyKind.BUY: 'buy_',
+        StrategyKind.SELL: 'sell_',
+    }
+    ENTRY_POINT_GROUP_DIC = {
+        StrategyKind.BUY: 'sns_trade_bot.buy_strategy',
+        StrategyKind.SELL: 'sns_trade_bot.sell_strategy',
+    }
+
+    def __init__(self):
+        self.class_dic: Dict[StrategyKind, Dict[str, Type]] = {kind: {} for kind in StrategyKind}
+        self.module_dic: Optional[Dict[StrategyKind, Dict[str, str]]] = None  # 이름 -> 내장 전략 모듈
+        self.entry_point_dic: Optional[Dict[StrategyKind, Dict[str, metadata.EntryPoint]]] = None
+
+    def register(self, the_kind: StrategyKind, the_class: Type):
+        name = the_class.NAME
+        registered = self.class_dic[the_kind].get(name)
+        if registered is not None and registered is not the_class:
+            logger.warning(f'{the_kind.value} strategy "{name}" is replaced. {registered} -> {the_class}')
+        self.class_dic[the_kind][name] = the_class
+
+    def get_class(self, the_kind: StrategyKind, the_name: str) -> Optional[Type]:
+        """
+        :return: 전략 class. 없으면 None
+        """
+        strategy_class = self.class_dic[the_kind].get(the_name)
+        if strategy_class is None:
+            strategy_class = self._load(the_kind, the_name)
+        return strategy_class
+
+    def get_name_list(self, the_kind: StrategyKind) -> List[str]:
+        name_list = list(self._get_module_dic()[the_kind])
+        for name in (list(self.class_dic[the_kind]) + list(registered_class_dic.get(the_kind, {}))
+                     + list(self._get_entry_point_dic()[the_kind])):
+            if name not in name_list:
+                name_list.append(name)
+        return name_list
+
+    def create(self, the_kind: StrategyKind, the_name: str, the_stock, the_param_dic: dict):
+        """
+        :return: 전략 객체. 모르는 이름이면 None
+        """
+        strategy_class = self.get_class(the_kind, the_name)
+        if strategy_class is None:
+            return None
+        return strategy_class(the_stock, the_param_dic)
+
+    def _load(self, the_kind: StrategyKind, the_name: str) -> Optional[Type]:
+        module_name = self._get_module_dic()[the_kind].get(the_name)
+        if module_name is not None:
+            importlib.import_module(module_name)  # 모듈의 @register_strategy() 가 registered_class_dic 에 등록한다
+        strategy_class = registered_class_dic.get(the_kind, {}).get(the_name)
+        if strategy_class is None and module_name is not None:
+            logger.error(f'{the_kind.value} strategy "{the_name}" is not registered by {module_name}')
+            return None
+        if strategy_class is None:
+            entry_point = self._get_entry_point_dic()[the_kind].get(the_name)
+            if entry_point is None:
+                return None
+            try:
+                strategy_class = entry_point.load()
+            except Exception as e:
+                logger.error(f'failed to load {the_kind.value} strategy "{the_name}" from {entry_point.value}. {e}')
+                return None
+        self.class_dic[the_kind][the_name] = strategy_class
+        return strategy_class
+
+    def _get_module_dic(self) -> Dict[StrategyKind, Dict[str, str]]:
+        """BUILTIN_PACKAGE 의 모듈 목록. 모듈을 import 하지 않고 파일 이름만 본다. 이름 순서가 UI combo box 순서"""
+        if self.module_dic is None:
+            package = importlib.import_module(self.BUILTIN_PACKAGE)
+            module_name_list = sorted(module_info.name for module_info in pkgutil.iter_modules(package.__path__)
+                                      if not module_info.ispkg)
+            self.module_dic = {kind: {name: f'{self.BUILTIN_PACKAGE}.{name}' for name in module_name_list
+                                      if name.startswith(prefix)}
+                               for kind, prefix in self.MODULE_PREFIX_DIC.items()}
+        return self.module_dic
+
+    def _get_entry_point_dic(self) -> Dict[StrategyKind, Dict[str, metadata.EntryPoint]]:
+        if self.entry_point_dic is None:
+            self.entry_point_dic = {}
+            for kind, group in self.ENTRY_POINT_GROUP_DIC.items():
+                self.entry_point_dic[kind] = {entry_point.name: entry_point
+                                              for entry_point in get_entry_point_list(group)}
+                if self.entry_point_dic[kind]:
+                    logger.info(f'{kind.value} strategy entry points: {list(self.entry_point_dic[kind])}')
+        return self.entry_point_dic
+
+
+def get_entry_point_list(the_group: str) -> List[metadata.EntryPoint]:
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):  # python 3.10 이상
+        return list(entry_points.select(group=the_group))
+    return list(entry_points.get(the_group, []))  # python 3.8, 3.9 는 group -> list 인 dict
+
+
+strategy_registry = StrategyRegistry()
+
+
+def register_strategy(the_kind: StrategyKind):
+    """전략 class decorator. the_class.NAME 으로 등록한다. StrategyRegistry 는 그 이름이 처음 필요할 때 가져간다"""
+    def decorator(the_class):
+        registered_class_dic.setdefault(the_kind, {})[the_class.NAME] = the_class
+        return the_class
+    return decorator
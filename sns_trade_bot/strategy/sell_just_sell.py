@@ -1,9 +1,11 @@
 import logging
 from sns_trade_bot.strategy.base import StrategyBase
+from sns_trade_bot.strategy.registry import StrategyKind, register_strategy
 
 logger = logging.getLogger(__name__)
 
 
+@register_strategy(StrategyKind.SELL)
 class SellJustSell(StrategyBase):
     NAME = 'sell_just_sell'
     DEFAULT_QTY_PERCENT = 100
@@ -17,10 +19,11 @@ class SellJustSell(StrategyBase):
         logger.info(f'{self.NAME} strategy created for {self.stock.name}')
 
     def on_price_updated(self):
-        logger.info('JustSell')
         if self.stock.remained_sell_qty:
-            logger.info(f'remained_buy_qty:{self.stock.remained_sell_qty}. do nothing')
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'remained_sell_qty:{self.stock.remained_sell_qty}. do nothing')
             return
+        logger.info('JustSell')
 
         order_qty = self.stock.qty * self.qty_percent // 100
         if order_qty == 0:
@@ -1,19 +1,21 @@
 import logging
 from sns_trade_bot.strategy.base import StrategyBase
+from sns_trade_bot.strategy.registry import StrategyKind, register_strategy
 
 logger = logging.getLogger(__name__)
 
 
+@register_strategy(StrategyKind.SELL)
 class SellOnClosing(StrategyBase):
     NAME = 'sell_on_closing'
-    TARGET_TIME = '1518'
+    TARGET_TIME = '151800'  # 장마감 동시호가 시간 되기 전
 
     def __init__(self, the_stock, the_param_dic):
         super().__init__(the_stock, the_param_dic)
         logger.info(f'{self.NAME} strategy created for {self.stock.name}')
 
     def on_time(self, cur_time_str: str):
-        if not cur_time_str.startswith(self.TARGET_TIME):
+        if cur_time_str != self.TARGET_TIME:
             return
 
         logger.info(f'SellOnClosing. time:"{cur_time_str}". {self.stock.name}({self.stock.code}), '
@@ -1,9 +1,11 @@
 import logging
 from sns_trade_bot.strategy.base import StrategyBase
+from sns_trade_bot.strategy.registry import StrategyKind, register_strategy
 
 logger = logging.getLogger(__name__)
 
 
+@register_strategy(StrategyKind.SELL)
 class SellOnCondition(StrategyBase):
     NAME = 'sell_on_condition'
     DEFAULT_THRESHOLD = 1.0  # 1% 이상 수익이 아니라면 팔지 않음
@@ -1,17 +1,21 @@
 import logging
 from sns_trade_bot.strategy.base import StrategyBase
+from sns_trade_bot.strategy.registry import StrategyKind, register_strategy
 
 logger = logging.getLogger(__name__)
 
 
+@register_strategy(StrategyKind.SELL)
 class SellStopLoss(StrategyBase):
     NAME = 'sell_stop_loss'
     DEFAULT_THRESHOLD = -3.0  # unit: %
     DEFAULT_FROM_TOP = -1.5  # unit: %
+    TAKE_PROFIT_RATE = 0.5  # unit: %. 수익률이 이보다 낮으면 손절 (threshold), 높으면 익절 (from_top) 기준
     DEFAULT_PARAM = {
         'threshold': DEFAULT_THRESHOLD,
         'from_top': DEFAULT_FROM_TOP,
     }
+    BATCH_EVALUATED = True  # StopLossBatch
 
     def __init__(self, the_stock, the_param_dic):
         super().__init__(the_stock, the_param_dic)
@@ -31,7 +35,8 @@ class SellStopLoss(StrategyBase):
 
     def on_price_updated(self):
         if self.stock.remained_sell_qty:
-            logger.info(f'remained_buy_qty:{self.stock.remained_sell_qty}. do nothing')
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'remained_sell_qty:{self.stock.remained_sell_qty}. do nothing')
             return
 
         if self.stock.qty == 0:
@@ -43,7 +48,7 @@ class SellStopLoss(StrategyBase):
 
         cur_from_top = (self.stock.cur_price - self.stock.top_price) / self.stock.top_price * 100
 
-        if self.stock.earning_rate < 0.5:  # 손절
+        if self.stock.earning_rate < self.TAKE_PROFIT_RATE:  # 손절
             if self.stock.earning_rate < self.threshold:
                 logger.info(f'StopLoss!!!! name:{self.stock.name}, qty:{self.stock.qty}. '
                             f'cur_price:{self.stock.cur_price}, buy_price:{self.stock.buy_price}, '
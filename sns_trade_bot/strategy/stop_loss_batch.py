@@ -0,0 +1,85 @@
+import logging
+from typing import List
+
+import numpy as np
+
+from sns_trade_bot.model.stock_store import StockStore
+from sns_trade_bot.model.strategy_index import StrategyIndex
+from sns_trade_bot.strategy.sell_stop_loss import SellStopLoss
+
+logger = logging.getLogger(__name__)
+
+
+class StopLossBatch:
+    """활성 SellStopLoss 가 있는 모든 보유 종목을 StockStore 컬럼으로 한 번에 검사한다.
+
+    체결이 tick_rate (건/초) 보다 많이 오면 체결마다 SellStopLoss.on_price_updated() 를 부르지 않고,
+    INTERVAL_MSEC 마다 evaluate() 로 기준을 넘은 종목만 골라 그 전략의 on_price_updated() 를 부른다.
+    top_price 갱신, 손절 / 익절 기준은 SellStopLoss.on_price_updated() 와 같다.
+    검사할 행 / 기준값 array 는 StrategyIndex 가 바뀌었을 때만 다시 만든다.
+    """
+    INTERVAL_MSEC = 200
+    DEFAULT_TICK_RATE = 300  # unit: 건/초
+
+    def __init__(self, the_store: StockStore, the_strategy_index: StrategyIndex,
+                 the_tick_rate: float = DEFAULT_TICK_RATE):
+        self.store = the_store
+        self.strategy_index = the_strategy_index
+        self.tick_rate = the_tick_rate  # 이보다 체결이 많으면 batch 로 검사
+        self.active = False  # True 면 체결마다 SellStopLoss 를 부르지 않는다
+        self.tick_count = 0  # 이번 INTERVAL_MSEC 동안 받은 체결 수
+        self.is_armed = False  # 타이머를 걸어두었는지
+        self.version = -1
+        self.strategy_list: List[SellStopLoss] = []
+        self.row_array = np.zeros(0, dtype=np.intp)
+        self.threshold_array = np.zeros(0)
+        self.from_top_array = np.zeros(0)
+
+    def on_timer(self) -> List[SellStopLoss]:
+        """INTERVAL_MSEC 마다. 지난 구간의 체결 수로 batch 여부를 정하고, batch 중이었으면 검사한다
+
+        :return: 기준을 넘은 전략
+        """
+        self.is_armed = False
+        was_active = self.active
+        rate = self.tick_count * 1000 / self.INTERVAL_MSEC
+        self.tick_count = 0
+        self.active = rate >= self.tick_rate
+        if self.active != was_active:
+            logger.info(f'stop loss batch {"on" if self.active else "off"}. tick rate:{rate:.0f}/s')
+        return self.evaluate() if was_active else []
+
+    def evaluate(self) -> List[SellStopLoss]:
+        if self.version != self.strategy_index.version:
+            self._rebuild()
+        if len(self.strategy_list) == 0:
+            return []
+        store = self.store
+        row_array = self.row_array
+        cur_price = store.cur_price[row_array]
+        eligible = (store.qty[row_array] > 0) & (store.remained_sell_qty[row_array] == 0) & (cur_price > 0)
+        top_price = np.maximum(store.top_price[row_array], cur_price)
+        store.top_price[row_array[eligible]] = top_price[eligible]
+
+        cur_from_top = (cur_price - top_price) / np.maximum(top_price, 1) * 100
+        earning_rate = store.earning_rate[row_array]
+        is_hit = np.where(earning_rate < SellStopLoss.TAKE_PROFIT_RATE,
+                          earning_rate < self.threshold_array,  # 손절
+                          cur_from_top < self.from_top_array)  # 익절
+        strategy_list = self.strategy_list
+        return [strategy_list[i] for i in np.flatnonzero(eligible & is_hit).tolist()]
+
+    def _rebuild(self):
+        strategy_list = []
+        for entry in self.strategy_index.entry_dic.values():
+            if entry.stock.store is not self.store:
+                continue
+            for strategy in entry.sell_list:
+                if isinstance(strategy, SellStopLoss):
+                    strategy_list.append(strategy)
+        self.strategy_list = strategy_list
+        self.row_array = np.array([strategy.stock.row for strategy in strategy_list], dtype=np.intp)
+        self.threshold_array = np.array([strategy.threshold for strategy in strategy_list], dtype=np.float64)
+        self.from_top_array = np.array([strategy.from_top for strategy in strategy_list], dtype=np.float64)
+        self.version = self.strategy_index.version
+        logger.debug(f'rebuild. strategies:{len(strategy_list)}')
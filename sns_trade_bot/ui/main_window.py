@@ -1,14 +1,17 @@
 import logging
 import os
 import sys
+from typing import List
+from sns_trade_bot.model.change import ChangeSet
 from sns_trade_bot.model.data_manager import DataManager, ModelListener, DataType
 from sns_trade_bot.model.condition import Condition, SignalType
-from sns_trade_bot.strategy.base import StrategyBase
+from sns_trade_bot.strategy.registry import StrategyKind, strategy_registry
+from sns_trade_bot.ui.table_model import BalanceTableModel, ButtonDelegate, ConditionTableModel, SignalTypeDelegate
 from abc import abstractmethod
 
 from PyQt5 import uic
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import pyqtSlot
+from PyQt5.QtCore import QModelIndex, QSortFilterProxyModel, pyqtSlot
 
 logger = logging.getLogger(__name__)
 
@@ -72,7 +75,8 @@ class MainWindow(QMainWindow, ModelListener):
     btn_stock_remove: QPushButton
 
     btn_refresh_condition: QPushButton
-    table_condition = None
+    table_condition: QTableView
+    table_balance: QTableView
 
     btn_load: QPushButton
     btn_save: QPushButton
@@ -91,10 +95,23 @@ class MainWindow(QMainWindow, ModelListener):
         self.btn_code_add.clicked.connect(self._on_btn_code_add_clicked)
         self.btn_stock_remove.clicked.connect(self._on_btn_stock_remove_clicked)
         self.btn_temp_code_add.clicked.connect(self.data_manager.add_all_temp_stock)
-        self.combo_buy.addItems(StrategyBase.BUY_STRATEGY_LIST)
-        self.combo_sell.addItems(StrategyBase.SELL_STRATEGY_LIST)
+        self.combo_buy.addItems(strategy_registry.get_name_list(StrategyKind.BUY))
+        self.combo_sell.addItems(strategy_registry.get_name_list(StrategyKind.SELL))
         self.selected_balance = []
 
+        self.balance_model = BalanceTableModel(self.data_manager, self)
+        self.balance_proxy_model = QSortFilterProxyModel(self)  # 정렬은 proxy 에서. model 의 행 순서는 그대로
+        self.balance_proxy_model.setSourceModel(self.balance_model)
+        self.table_balance.setModel(self.balance_proxy_model)
+        self.table_balance.selectionModel().selectionChanged.connect(self.on_table_balance_selection_changed)
+
+        self.condition_model = ConditionTableModel(self.data_manager, self)
+        self.table_condition.setModel(self.condition_model)
+        self.table_condition.setItemDelegateForColumn(ConditionTableModel.SIGNAL_TYPE_COLUMN, SignalTypeDelegate(self))
+        self.table_condition.setItemDelegateForColumn(ConditionTableModel.BUTTON_COLUMN, ButtonDelegate(self))
+        self.table_condition.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        self.table_condition.clicked.connect(self._on_table_condition_clicked)
+
     def set_listener(self, the_listener):
         self.listener = the_listener
         self.combo_account.currentTextChanged.connect(self.listener.account_changed)
@@ -104,55 +121,45 @@ class MainWindow(QMainWindow, ModelListener):
         self.btn_refresh_condition.clicked.connect(self.listener.btn_refresh_condition_list_clicked)
         self.btn_register_condition.clicked.connect(self.listener.btn_register_condition_list_clicked)
         self.btn_test.clicked.connect(self.listener.btn_test_clicked)
+        self.condition_model.signal_type_listener = self.listener.combo_signal_type_changed
 
     def _on_btn_code_add_clicked(self):
         code = self.edit_code.text()
         self.listener.btn_code_add_clicked(code)
         self.edit_code.setText('')
 
+    def _get_selected_code_list(self) -> List[str]:
+        code_list = []
+        for proxy_index in self.table_balance.selectionModel().selectedRows():
+            row = self.balance_proxy_model.mapToSource(proxy_index).row()
+            code_list.append(self.balance_model.code_list[row])
+        return code_list
+
     def _on_btn_stock_remove_clicked(self):
-        items = self.table_balance.selectedItems()
-        for item in items:
-            if item.column() == 0:  # 종목코드
-                code = item.text()
-                self.data_manager.remove_stock(code)
-                logger.info(f'remove {code}')
+        for code in self._get_selected_code_list():
+            self.data_manager.remove_stock(code)
+            logger.info(f'remove {code}')
         self.data_manager.set_updated(DataType.TABLE_BALANCE)
 
+    def _on_table_condition_clicked(self, the_index: QModelIndex):
+        if the_index.column() == ConditionTableModel.BUTTON_COLUMN and self.listener is not None:
+            self.listener.btn_query_condition_clicked(self.condition_model.get_condition(the_index.row()))
+
     @pyqtSlot(str)
     def on_combo_buy_strategy_changed(self, strategy):
         logger.info(f'on_combo_buy_strategy_changed: {strategy}')
-        from sns_trade_bot.strategy.buy_just_buy import BuyJustBuy
-        from sns_trade_bot.strategy.buy_on_opening import BuyOnOpening
-        from sns_trade_bot.strategy.buy_on_closing import BuyOnClosing
-        if strategy == "buy_just_buy":
-            default_param = BuyJustBuy.DEFAULT_PARAM
-        elif strategy == "buy_on_opening":
-            default_param = BuyOnOpening.DEFAULT_PARAM
-        elif strategy == "buy_on_closing":
-            default_param = BuyOnClosing.DEFAULT_PARAM
-        else:
+        strategy_class = strategy_registry.get_class(StrategyKind.BUY, strategy)
+        if strategy_class is None:
             return
-        self.ui.txt_buy_param.setText(str(default_param))
+        self.ui.txt_buy_param.setText(str(strategy_class.DEFAULT_PARAM))
 
     @pyqtSlot(str)
     def on_combo_sell_strategy_changed(self, strategy):
         logger.info(f'on_combo_sell_strategy_changed: {strategy}')
-        from sns_trade_bot.strategy.sell_on_closing import SellOnClosing
-        from sns_trade_bot.strategy.sell_on_condition import SellOnCondition
-        from sns_trade_bot.strategy.sell_stop_loss import SellStopLoss
-        from sns_trade_bot.strategy.sell_just_sell import SellJustSell
-        if strategy == "sell_on_closing":
-            default_param = SellOnClosing.DEFAULT_PARAM
-        elif strategy == "sell_on_condition":
-            default_param = SellOnCondition.DEFAULT_PARAM
-        elif strategy == "sell_stop_loss":
-            default_param = SellStopLoss.DEFAULT_PARAM
-        elif strategy == "sell_just_sell":
-            default_param = SellJustSell.DEFAULT_PARAM
-        else:
+        strategy_class = strategy_registry.get_class(StrategyKind.SELL, strategy)
+        if strategy_class is None:
             return
-        self.ui.txt_sell_param.setText(str(default_param))
+        self.ui.txt_sell_param.setText(str(strategy_class.DEFAULT_PARAM))
 
     @pyqtSlot()
     def on_btn_buy_strategy_add_clicked(self):
@@ -161,13 +168,10 @@ class MainWindow(QMainWindow, ModelListener):
         param_dic = eval(self.txt_buy_param.text())
         logger.info(f"전략: {strategy_str}, param_dic: {param_dic}")
 
-        items = self.table_balance.selectedItems()
-        for item in items:
-            if item.column() == 0:  # 종목코드
-                code = item.text()
-                stock = self.data_manager.get_stock(code)
-                stock.add_buy_strategy(strategy_str, param_dic)
-                logger.info(f'{code}: {strategy_str}')
+        for code in self._get_selected_code_list():
+            stock = self.data_manager.get_stock(code)
+            stock.add_buy_strategy(strategy_str, param_dic)
+            logger.info(f'{code}: {strategy_str}')
         self.data_manager.set_updated(DataType.TABLE_BALANCE)
 
     @pyqtSlot()
@@ -177,57 +181,32 @@ class MainWindow(QMainWindow, ModelListener):
         param_dic = eval(self.txt_sell_param.text())
         logger.info(f"전략: {strategy_str}, param_dic: {param_dic}")
 
-        items = self.table_balance.selectedItems()
-        for item in items:
-            if item.column() == 0:  # 종목코드
-                code = item.text()
-                stock = self.data_manager.get_stock(code)
-                stock.add_sell_strategy(strategy_str, param_dic)
-                logger.info(f'{code}: {strategy_str}')
+        for code in self._get_selected_code_list():
+            stock = self.data_manager.get_stock(code)
+            stock.add_sell_strategy(strategy_str, param_dic)
+            logger.info(f'{code}: {strategy_str}')
         self.data_manager.set_updated(DataType.TABLE_BALANCE)
         pass
 
     @pyqtSlot()
     def on_btn_buy_strategy_clear_clicked(self):
         logger.info('on_btn_buy_strategy_clear_clicked')
-        items = self.table_balance.selectedItems()
-        for item in items:
-            if item.column() == 0:  # 종목코드
-                code = item.text()
-                stock = self.data_manager.get_stock(code)
-                stock.buy_strategy_dic.clear()
+        for code in self._get_selected_code_list():
+            stock = self.data_manager.get_stock(code)
+            stock.clear_buy_strategy()
         self.data_manager.set_updated(DataType.TABLE_BALANCE)
 
     @pyqtSlot()
     def on_btn_sell_strategy_clear_clicked(self):
         logger.info('on_btn_sell_strategy_clear_clicked')
-        items = self.table_balance.selectedItems()
-        for item in items:
-            if item.column() == 0:  # 종목코드
-                code = item.text()
-                stock = self.data_manager.get_stock(code)
-                stock.sell_strategy_dic.clear()
+        for code in self._get_selected_code_list():
+            stock = self.data_manager.get_stock(code)
+            stock.clear_sell_strategy()
         self.data_manager.set_updated(DataType.TABLE_BALANCE)
 
-    @pyqtSlot()
     def on_table_balance_selection_changed(self):
-        items = self.table_balance.selectedItems()
-        self.data_manager.selected_code_list = []
-        for item in items:
-            if item.column() == 0:  # 종목코드
-                code = item.text()
-                self.data_manager.selected_code_list.append(code)
-                logger.debug(f'{code}: {item.row()} {item.column()} {item.text()}')
-
-    @pyqtSlot(QTableWidgetItem)
-    def on_table_balance_item_changed(self, item):
-        if item.column() == 5:  # 목표보유수량
-            row = item.row()
-            target_qty = int(item.text())
-            code_item = self.table_balance.item(row, 0)
-            code = code_item.text()
-            stock = self.data_manager.get_stock(code)
-            stock.target_qty = target_qty
+        self.data_manager.selected_code_list = self._get_selected_code_list()
+        logger.debug(f'selected: {self.data_manager.selected_code_list}')
 
     # ModelListener
     def on_buy_signal(self, code: str, qty: int):
@@ -243,48 +222,9 @@ class MainWindow(QMainWindow, ModelListener):
             self.combo_account.addItems(self.data_manager.account_list)
             self.combo_account.setCurrentIndex(self.ui.combo_account.findText(self.data_manager.account))
         elif data_type == DataType.TABLE_BALANCE:
-            header = ["종목코드", "종목명", "현재가", "매입가", "보유수량", "목표보유수량", "수익률", "매수전략", "매도전략"]
-            self.table_balance.setSortingEnabled(False)
-            self.table_balance.clear()
-            self.table_balance.setColumnCount(len(header))
-            self.table_balance.setHorizontalHeaderLabels(header)
-            self.table_balance.setRowCount(len(self.data_manager.stock_dic))
-            for i, stock in enumerate(self.data_manager.stock_dic.values()):
-                self.table_balance.setItem(i, 0, QTableWidgetItem(stock.code))
-                self.table_balance.setItem(i, 1, QTableWidgetItem(stock.name))
-                self.table_balance.setItem(i, 2, QTableWidgetItem(str(stock.cur_price)))
-                self.table_balance.setItem(i, 3, QTableWidgetItem(str(stock.buy_price)))
-                self.table_balance.setItem(i, 4, QTableWidgetItem(str(stock.qty)))
-                self.table_balance.setItem(i, 5, QTableWidgetItem(str(stock.target_qty)))
-                self.table_balance.setItem(i, 6, QTableWidgetItem(str(stock.earning_rate)))
-                self.table_balance.setItem(i, 7, QTableWidgetItem(str(list(stock.buy_strategy_dic.keys()))))
-                self.table_balance.setItem(i, 8, QTableWidgetItem(str(list(stock.sell_strategy_dic.keys()))))
-            self.table_balance.setSortingEnabled(True)
+            self.balance_model.sync()  # 바뀐 칸은 on_data_changed() 에서 고친다
         elif data_type == DataType.TABLE_CONDITION:
-            header = ["인덱스", "조건명", "신호종류", "요청버튼"]
-            self.table_condition.setColumnCount(len(header))
-            self.table_condition.setHorizontalHeaderLabels(header)
-            self.table_condition.setRowCount(len(self.data_manager.cond_dic))
-            for i, condition in enumerate(self.data_manager.cond_dic.values()):
-                def combo_callback(c):
-                    return lambda signal_index: self.listener.combo_signal_type_changed(c, signal_index)
-
-                def btn_callback(c):
-                    return lambda: self.listener.btn_query_condition_clicked(c)
-
-                self.table_condition.setItem(i, 0, QTableWidgetItem(str(condition.index)))
-                self.table_condition.setItem(i, 1, QTableWidgetItem(condition.name))
-
-                combo = QComboBox()
-                combo.addItems(SignalType.__members__.keys())
-                combo.setCurrentText(condition.signal_type.name)
-                combo.currentIndexChanged.connect(combo_callback(condition))
-                self.table_condition.setCellWidget(i, 2, combo)
-
-                button = QPushButton('조회 및 요청')
-                button.clicked.connect(btn_callback(condition))
-                self.table_condition.setCellWidget(i, 3, button)
-
+            self.condition_model.reset()
         elif data_type == DataType.TABLE_TEMP_STOCK:
             header = ["종목코드", "종목명"]
             self.table_temp_stock.setColumnCount(len(header))
@@ -296,6 +236,9 @@ class MainWindow(QMainWindow, ModelListener):
         else:
             logger.error(f"unexpected data_type: {data_type}")
 
+    def on_data_changed(self, change_set: ChangeSet):
+        self.balance_model.apply(change_set)
+
 
 if __name__ == "__main__":
     logger = logging.getLogger()
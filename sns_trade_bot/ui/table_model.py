@@ -0,0 +1,247 @@
+import logging
+from typing import Callable, Dict, List, Optional, Set
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from PyQt5.QtWidgets import QApplication, QComboBox, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+from sns_trade_bot.model.change import ChangeSet, ChangeTracker
+from sns_trade_bot.model.condition import Condition, SignalType
+
+logger = logging.getLogger(__name__)
+
+# table_balance 컬럼. (헤더, ChangeSet 의 field, 값). 숫자는 숫자로 돌려줘야 정렬이 숫자 순서다
+BALANCE_COLUMN_LIST = [
+    ('종목코드', 'code', lambda stock: stock.code),
+    ('종목명', 'name', lambda stock: stock.name),
+    ('현재가', 'cur_price', lambda stock: stock.cur_price),
+    ('매입가', 'buy_price', lambda stock: stock.buy_price),
+    ('보유수량', 'qty', lambda stock: stock.qty),
+    ('목표보유수량', 'target_qty', lambda stock: stock.target_qty),
+    ('수익률', 'earning_rate', lambda stock: round(stock.earning_rate, 2)),
+    ('매수전략', 'buy_strategy_dic', lambda stock: str(list(stock.buy_strategy_dic.keys()))),
+    ('매도전략', 'sell_strategy_dic', lambda stock: str(list(stock.sell_strategy_dic.keys()))),
+    # OrderBook 에서 바로 읽는다
+    ('미체결(매수/매도)', 'remained_qty', lambda stock: f'{stock.remained_buy_qty}/{stock.remained_sell_qty}'),
+]
+
+
+class BalanceTableModel(QAbstractTableModel):
+    """table_balance 의 model. DataManager.stock_dic 의 종목이 한 행씩이다.
+
+    apply() 로 받은 ChangeSet 에서 바뀐 칸만 dataChanged 로 알린다. 체결마다 바뀌는 가격 컬럼은 바뀐 종목을 모아두었다가
+    PRICE_REPAINT_MSEC 마다 한 번 알리므로, 종목이 많아도 화면 갱신이 체결 처리 (같은 Qt thread) 를 늦추지 않는다.
+    """
+    PRICE_REPAINT_MSEC = 200  # 가격 컬럼은 최대 5 Hz
+    TARGET_QTY_COLUMN = 5  # 편집 가능
+
+    def __init__(self, the_data_manager, the_parent=None):
+        super().__init__(the_parent)
+        self.data_manager = the_data_manager
+        self.code_list: List[str] = list(the_data_manager.stock_dic.keys())  # 행 -> 종목코드
+        self.row_dic: Dict[str, int] = {code: row for row, code in enumerate(self.code_list)}
+        self.column_dic: Dict[str, int] = {field: column for column, (_, field, _) in enumerate(BALANCE_COLUMN_LIST)}
+        self.price_column_list = sorted(self.column_dic[field] for field in ChangeTracker.PRICE_FIELD_TUPLE)
+        self.pending_price_code_set: Set[str] = set()  # 아직 알리지 않은 가격 변경
+        self.price_timer = QTimer(self)
+        self.price_timer.setSingleShot(True)
+        self.price_timer.timeout.connect(self.flush_price)
+
+    def rowCount(self, the_parent=QModelIndex()) -> int:
+        return 0 if the_parent.isValid() else len(self.code_list)
+
+    def columnCount(self, the_parent=QModelIndex()) -> int:
+        return 0 if the_parent.isValid() else len(BALANCE_COLUMN_LIST)
+
+    def headerData(self, the_section, the_orientation, the_role=Qt.DisplayRole):
+        if the_role == Qt.DisplayRole and the_orientation == Qt.Horizontal:
+            return BALANCE_COLUMN_LIST[the_section][0]
+        return super().headerData(the_section, the_orientation, the_role)
+
+    def data(self, the_index: QModelIndex, the_role=Qt.DisplayRole):
+        if the_role not in (Qt.DisplayRole, Qt.EditRole) or not the_index.isValid():
+            return None
+        stock = self.data_manager.stock_dic.get(self.code_list[the_index.row()])
+        if stock is None:
+            return None
+        return BALANCE_COLUMN_LIST[the_index.column()][2](stock)
+
+    def flags(self, the_index: QModelIndex):
+        flags = super().flags(the_index)
+        if the_index.column() == self.TARGET_QTY_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, the_index: QModelIndex, the_value, the_role=Qt.EditRole) -> bool:
+        if the_role != Qt.EditRole or the_index.column() != self.TARGET_QTY_COLUMN:
+            return False
+        stock = self.get_stock(the_index.row())
+        try:
+            stock.target_qty = int(the_value)
+        except ValueError:
+            logger.error(f'invalid target_qty "{the_value}" for {stock.code}')
+            return False
+        self.dataChanged.emit(the_index, the_index)
+        return True
+
+    def get_stock(self, the_row: int):
+        return self.data_manager.stock_dic[self.code_list[the_row]]
+
+    def get_row(self, the_code: str) -> Optional[int]:
+        return self.row_dic.get(the_code)
+
+    def sync(self):
+        """stock_dic 과 행이 다르면 다시 만든다. ChangeSet 을 놓친 경우를 위한 것이라 보통은 아무 일도 하지 않는다"""
+        code_list = list(self.data_manager.stock_dic.keys())
+        if code_list == self.code_list:
+            return
+        logger.debug(f'reset. rows:{len(self.code_list)} -> {len(code_list)}')
+        self.beginResetModel()
+        self.code_list = code_list
+        self.row_dic = {code: row for row, code in enumerate(code_list)}
+        self.pending_price_code_set.clear()
+        self.endResetModel()
+
+    def apply(self, the_change_set: ChangeSet):
+        for code in the_change_set.removed_set:
+            self._remove_row(code)
+        added_list = [code for code in self.data_manager.stock_dic if code in the_change_set.added_set
+                      and code not in self.row_dic]
+        if added_list:
+            first_row = len(self.code_list)
+            self.beginInsertRows(QModelIndex(), first_row, first_row + len(added_list) - 1)
+            for row, code in enumerate(added_list, first_row):
+                self.code_list.append(code)
+                self.row_dic[code] = row
+            self.endInsertRows()
+
+        column_dic = self.column_dic
+        for code, field_set in the_change_set.field_dic.items():
+            row = self.row_dic.get(code)
+            if row is None:
+                continue
+            column_list = []
+            for field in field_set:
+                if field in ChangeTracker.PRICE_FIELD_TUPLE:
+                    self.pending_price_code_set.add(code)
+                elif field in column_dic:
+                    column_list.append(column_dic[field])
+            if column_list:
+                self.dataChanged.emit(self.index(row, min(column_list)), self.index(row, max(column_list)))
+        if self.pending_price_code_set and not self.price_timer.isActive():
+            self.price_timer.start(self.PRICE_REPAINT_MSEC)
+
+    def flush_price(self):
+        """모아둔 가격 변경을 연속된 행 묶음마다 dataChanged 한 번으로 알린다"""
+        row_list = sorted(self.row_dic[code] for code in self.pending_price_code_set if code in self.row_dic)
+        self.pending_price_code_set.clear()
+        first_column = self.price_column_list[0]
+        last_column = self.price_column_list[-1]
+        start = 0
+        for i in range(1, len(row_list) + 1):
+            if i == len(row_list) or row_list[i] != row_list[i - 1] + 1:
+                self.dataChanged.emit(self.index(row_list[start], first_column),
+                                      self.index(row_list[i - 1], last_column))
+                start = i
+
+    def _remove_row(self, the_code: str):
+        row = self.row_dic.get(the_code)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.code_list[row]
+        self.row_dic = {code: i for i, code in enumerate(self.code_list)}
+        self.endRemoveRows()
+        self.pending_price_code_set.discard(the_code)
+
+
+class ConditionTableModel(QAbstractTableModel):
+    """table_condition 의 model. 신호종류는 SignalTypeDelegate 의 combo box 로 고치고, 요청버튼은 ButtonDelegate 가 그린다.
+    행마다 widget 을 만들지 않는다.
+    """
+    HEADER_LIST = ["인덱스", "조건명", "신호종류", "요청버튼"]
+    SIGNAL_TYPE_COLUMN = 2
+    BUTTON_COLUMN = 3
+    BUTTON_TEXT = '조회 및 요청'
+
+    def __init__(self, the_data_manager, the_parent=None):
+        super().__init__(the_parent)
+        self.data_manager = the_data_manager
+        self.cond_list: List[Condition] = list(the_data_manager.cond_dic.values())
+        self.signal_type_listener: Optional[Callable[[Condition, int], None]] = None  # UiListener 가 정해진 뒤에 넣는다
+
+    def rowCount(self, the_parent=QModelIndex()) -> int:
+        return 0 if the_parent.isValid() else len(self.cond_list)
+
+    def columnCount(self, the_parent=QModelIndex()) -> int:
+        return 0 if the_parent.isValid() else len(self.HEADER_LIST)
+
+    def headerData(self, the_section, the_orientation, the_role=Qt.DisplayRole):
+        if the_role == Qt.DisplayRole and the_orientation == Qt.Horizontal:
+            return self.HEADER_LIST[the_section]
+        return super().headerData(the_section, the_orientation, the_role)
+
+    def data(self, the_index: QModelIndex, the_role=Qt.DisplayRole):
+        if the_role not in (Qt.DisplayRole, Qt.EditRole) or not the_index.isValid():
+            return None
+        condition = self.cond_list[the_index.row()]
+        column = the_index.column()
+        if column == 0:
+            return condition.index
+        elif column == 1:
+            return condition.name
+        elif column == self.SIGNAL_TYPE_COLUMN:
+            return condition.signal_type.name
+        return self.BUTTON_TEXT
+
+    def flags(self, the_index: QModelIndex):
+        flags = super().flags(the_index)
+        if the_index.column() == self.SIGNAL_TYPE_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, the_index: QModelIndex, the_value, the_role=Qt.EditRole) -> bool:
+        """the_value: SignalType 의 값 (combo box index)"""
+        if the_role != Qt.EditRole or the_index.column() != self.SIGNAL_TYPE_COLUMN:
+            return False
+        condition = self.cond_list[the_index.row()]
+        if self.signal_type_listener is not None:
+            self.signal_type_listener(condition, int(the_value))
+        else:
+            condition.signal_type = SignalType(int(the_value))
+        self.dataChanged.emit(the_index, the_index)
+        return True
+
+    def get_condition(self, the_row: int) -> Condition:
+        return self.cond_list[the_row]
+
+    def reset(self):
+        self.beginResetModel()
+        self.cond_list = list(self.data_manager.cond_dic.values())
+        self.endResetModel()
+
+
+class SignalTypeDelegate(QStyledItemDelegate):
+    """신호종류 편집용 combo box. 편집하는 동안만 만든다"""
+
+    def createEditor(self, the_parent, the_option, the_index):
+        combo = QComboBox(the_parent)
+        combo.addItems(SignalType.__members__.keys())
+        combo.activated.connect(lambda _: self.commitData.emit(combo))
+        return combo
+
+    def setEditorData(self, the_editor: QComboBox, the_index: QModelIndex):
+        the_editor.setCurrentText(the_index.data())
+
+    def setModelData(self, the_editor: QComboBox, the_model, the_index: QModelIndex):
+        the_model.setData(the_index, the_editor.currentIndex())
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """버튼 모양만 그린다. 누르는 것은 view 의 clicked 로 받는다"""
+
+    def paint(self, the_painter, the_option, the_index: QModelIndex):
+        button = QStyleOptionButton()
+        button.rect = the_option.rect
+        button.text = the_index.data()
+        button.state = QStyle.State_Enabled | QStyle.State_Raised
+        QApplication.style().drawControl(QStyle.CE_PushButton, button, the_painter)
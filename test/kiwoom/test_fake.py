@@ -0,0 +1,117 @@
+import logging
+import sys
+import unittest
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.common import ErrCode, Fid, JobType, RqName, ScnNo, TrCode, get_order_rq_name
+from sns_trade_bot.kiwoom.event import KiwoomEventHandler
+from sns_trade_bot.kiwoom.fake import FakeKiwoomOcx
+from sns_trade_bot.kiwoom.request import TrRequester
+from sns_trade_bot.kiwoom.scheduler import TrScheduler
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.model.order import OrderSide, OrderStatus
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestFakeKiwoomOcx(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager()
+        self.ocx = FakeKiwoomOcx(the_seed=1)
+        self.ocx.create_market(30)
+        # 실제보다 느슨한 제한으로 FakeKiwoomOcx 의 -200 을 받아보도록
+        self.scheduler = TrScheduler({JobType.QUERY: [(10, 1.0)]}, self.ocx.clock, self.ocx.advance)
+        self.requester = TrRequester(self.data_manager, self.ocx, self.scheduler)
+        self.handler = KiwoomEventHandler(self.data_manager, self.ocx, self.requester, Mock())
+        self.ocx.set_event_handler(self.handler)
+
+    def pump(self):
+        while self.scheduler.qsize() or self.ocx.pending_count():
+            if self.scheduler.qsize():
+                self.scheduler.run_once()
+            self.ocx.run()
+
+    def test_balance_pages(self):
+        for code in list(self.ocx.stock_dic.keys())[:25]:
+            self.ocx.set_holding(code, 10, 1000)
+        self.requester.account_detail()
+        self.pump()
+
+        self.assertEqual(25, len(self.data_manager.stock_dic))  # PAGE_SIZE 20 -> 2 페이지
+        self.assertTrue(all(stock.qty == 10 for stock in self.data_manager.stock_dic.values()))
+
+    def test_market_time_without_time(self):
+        self.handler.session.clock = lambda: 32100.0  # 08:55:00
+        self.ocx.fire_real_data('', '장시작시간', {Fid.장운영구분.value: '0', Fid.체결시간.value: ''})
+        self.assertEqual(0.0, self.handler.session.offset)  # 빈 시각으로 시계를 옮기지 않는다
+
+        self.ocx.fire_real_data('', '장시작시간', {Fid.장운영구분.value: '0', Fid.체결시간.value: '085510'})
+        self.assertEqual(10.0, self.handler.session.offset)
+
+    def test_rate_limit(self):
+        for _ in range(5):
+            self.assertEqual(0, self.ocx.comm_rq_data(RqName.BALANCE.value, TrCode.계좌평가현황요청.value, 0,
+                                                      ScnNo.BALANCE.value))
+        ret = self.ocx.comm_rq_data(RqName.BALANCE.value, TrCode.계좌평가현황요청.value, 0, ScnNo.BALANCE.value)
+        self.assertEqual(ErrCode.OP_ERR_SISE_OVERFLOW, ret)
+
+        self.ocx.advance(1.0)
+        ret = self.ocx.comm_rq_data(RqName.BALANCE.value, TrCode.계좌평가현황요청.value, 0, ScnNo.BALANCE.value)
+        self.assertEqual(ErrCode.OP_ERR_NONE, ret)
+
+        # 스케쥴러는 -200 을 받으면 기다렸다가 다시 요청한다
+        code_list = list(self.ocx.stock_dic.keys())
+        for code in code_list[:8]:
+            self.requester.code_info(code)
+        self.pump()
+        self.assertEqual(8, len(self.data_manager.stock_dic))
+        self.assertGreater(self.ocx.overflow_count, 1)
+
+    def test_order(self):
+        code = '100000'
+        self.ocx.set_holding(code, 10, 1000)
+        self.requester.account_detail()
+        self.pump()
+        self.assertEqual(10, self.data_manager.stock_dic[code].qty)
+
+        self.ocx.send_order(RqName.ORDER.value, ScnNo.ORDER.value, self.data_manager.account, 2, code, 10, 0, '03', '')
+        self.pump()
+        self.assertNotIn(code, self.data_manager.stock_dic)  # 청산 완료
+        self.assertEqual(1, len(self.ocx.today_trade_list))
+        order_list = self.data_manager.order_book.get_order_list(code)  # 신호 없이 낸 주문도 체결통보로 기록
+        self.assertEqual(1, len(order_list))
+        self.assertEqual(OrderStatus.FILLED, order_list[0].status)
+
+    def test_order_book(self):
+        code = '100000'
+        stock = self.data_manager.get_stock(code)
+        stock.on_buy_signal('buy_just_buy', 5)
+        self.data_manager.signal_arbiter.flush()  # 이벤트 루프 없이 바로 주문을 만든다
+        order = self.data_manager.order_book.take_unsent(code, OrderSide.BUY)
+        self.ocx.send_order(get_order_rq_name(order.key), ScnNo.ORDER.value, self.data_manager.account, 1, code, 5,
+                            0, '03', '')
+        self.pump()
+        self.assertNotEqual('', order.order_id)
+        self.assertEqual(OrderStatus.FILLED, order.status)
+        self.assertEqual(5, order.filled_qty)
+        self.assertEqual(0, stock.remained_buy_qty)
+        self.assertEqual(5, stock.qty)
+
+    def test_real_data(self):
+        stock = self.data_manager.get_stock('100001')
+        self.ocx.set_real_reg(ScnNo.REAL.value, '100001', '9001;10;13', '0')
+        self.ocx.push_tick(0.1, '100001', 12340)
+        self.ocx.push_tick(0.2, '100002', 5000)  # 등록되지 않은 종목
+        self.ocx.run()
+        self.assertEqual(12340, stock.cur_price)
+        self.assertEqual(1, self.ocx.dispatch_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import logging
+import sys
+import threading
+import time
+import unittest
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from sns_trade_bot.kiwoom.invoker import MainThreadInvoker
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.model.order import OrderSide, OrderStatus
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestMainThreadInvoker(unittest.TestCase):
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.data_manager = DataManager()
+        self.data_manager.change_tracker.single_shot = QTimer.singleShot  # KiwoomEventHandler 와 같게
+        self.invoker = MainThreadInvoker()
+        self.change_set_list = []
+        self.data_manager.change_tracker.listener = self.change_set_list.append
+
+    def process_events_until(self, the_fn, the_timeout=2.0):
+        deadline = time.monotonic() + the_timeout
+        while not the_fn() and time.monotonic() < deadline:
+            self.app.processEvents()
+        return the_fn()
+
+    def test_reject_from_tr_thread(self):
+        stock = self.data_manager.get_stock('000001')
+        order = self.data_manager.order_book.add(stock.code, OrderSide.BUY, 3)
+        self.assertTrue(self.process_events_until(lambda: self.change_set_list))
+        self.change_set_list.clear()
+
+        # Kiwoom._on_order_sent() 처럼 TR 스레드의 future 콜백에서 실패 처리
+        thread = threading.Thread(target=lambda: self.invoker.call(
+            lambda: self.data_manager.order_book.reject(order, 'send_order ret:-1')))
+        thread.start()
+        thread.join()
+        self.assertNotEqual(OrderStatus.REJECTED, order.status)  # Qt 스레드의 이벤트 루프에서 처리한다
+
+        self.assertTrue(self.process_events_until(lambda: self.change_set_list))
+        self.assertEqual(OrderStatus.REJECTED, order.status)
+        self.assertEqual({'000001': {'remained_qty'}}, self.change_set_list[-1].field_dic)
+        self.assertFalse(self.data_manager.change_tracker.is_scheduled)
+
+        stock.name = '다음 변경'  # 이후 변경도 계속 알린다
+        self.assertTrue(self.process_events_until(lambda: len(self.change_set_list) == 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import logging
+import sys
+import unittest
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.common import RqName, TrCode
+from sns_trade_bot.kiwoom.pager import TrPager
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestPager(unittest.TestCase):
+    def setUp(self):
+        self.call_list = []
+        self.page_list = [['A000001', 'A000002'], ['A000003']]
+        self.cur_page = 0
+
+        def get_comm_data(tr_code, record_name, index, item_name):
+            self.call_list.append(('get_comm_data', index))
+            return self.page_list[self.cur_page][index] if item_name == '종목코드' else '0'
+
+        self.ocx = Mock()
+        self.ocx.get_comm_data = Mock(side_effect=get_comm_data)
+        self.ocx.get_repeat_cnt = Mock(side_effect=lambda tr_code, record_name: len(self.page_list[self.cur_page]))
+        self.request = Mock(side_effect=lambda is_next: self.call_list.append(('request', is_next)))
+        self.pager = TrPager(self.ocx)
+        self.pager.register(RqName.BALANCE.value, self.request)
+
+    def test_on_page(self):
+        tr_code = TrCode.계좌평가현황요청.value
+        code_list = []
+
+        # page 0: 같은 화면의 버퍼를 덮지 않도록 행을 모두 읽은 뒤 다음 페이지 요청
+        rows = self.pager.on_page(RqName.BALANCE.value, tr_code, '', '2', ['종목코드'])
+        self.assertEqual([('get_comm_data', 0), ('get_comm_data', 1), ('request', 2)], self.call_list)
+        code_list.extend(row['종목코드'] for row in rows)
+        self.assertEqual(1, self.pager.get_page(RqName.BALANCE.value))
+        self.assertFalse(self.pager.is_last_page(RqName.BALANCE.value))
+
+        # page 1: 마지막 페이지
+        self.cur_page = 1
+        rows = self.pager.on_page(RqName.BALANCE.value, tr_code, '', '0', ['종목코드'])
+        code_list.extend(row['종목코드'] for row in rows)
+
+        self.assertEqual(['A000001', 'A000002', 'A000003'], code_list)
+        self.request.assert_called_once_with(2)
+        self.assertEqual(0, self.pager.get_page(RqName.BALANCE.value))
+        self.assertTrue(self.pager.is_last_page(RqName.BALANCE.value))
+
+    def test_max_page(self):
+        self.pager.MAX_PAGE = 3
+        for _ in range(3):
+            self.pager.on_page(RqName.BALANCE.value, TrCode.계좌평가현황요청.value, '', '2', ['종목코드'])
+
+        # page 0, 1 에서만 다음 페이지를 요청하고 MAX_PAGE 번째 페이지에서 멈춘다
+        self.assertEqual(self.pager.MAX_PAGE - 1, self.request.call_count)
+        self.assertTrue(self.pager.is_last_page(RqName.BALANCE.value))
+
+
+if __name__ == '__main__':
+    unittest.main()
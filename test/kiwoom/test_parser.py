@@ -0,0 +1,72 @@
+import logging
+import sys
+import unittest
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.common import Fid
+from sns_trade_bot.kiwoom.parser import ChejanRecord, RealParser, StockTick, format_real_data
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestRealParser(unittest.TestCase):
+    def setUp(self):
+        self.parser = RealParser()
+
+    def test_stock_tick(self):
+        # 실제 OpenAPI 에서 받은 주식체결 real_data (뒤에 FID 가 더 붙어 있음)
+        real_data = '090001\t-37200\t-550\t-1.46\t-37250\t-37200\t-10\t1531190\t57330\t+37800\t+37900\t-37100\t5' \
+                    '\t-512345\t-19123\t74.95\t0.58\t-0.12\t91.02\t9600\t2\t0\t000000\t000000\t0\t1\t2'
+        tick = self.parser.parse('주식체결', real_data)
+        self.assertEqual(90001, tick.time)
+        self.assertEqual(37200, tick.price)
+        self.assertEqual(-10, tick.volume)
+        self.assertEqual(1531190, tick.total_volume)
+        self.assertEqual(37250, tick.ask)
+        self.assertEqual(37200, tick.bid)
+        self.assertEqual('91.02', self.parser.get_value('주식체결', Fid.체결강도))
+
+        tick2 = self.parser.parse('주식체결', format_real_data('주식체결', {
+            Fid.체결시간.value: '090002', Fid.현재가.value: '+37300', Fid.거래량.value: '+3'}))
+        self.assertIs(tick, tick2)  # record 를 다시 쓴다
+        self.assertEqual((90002, 37300, 3, 0), (tick.time, tick.price, tick.volume, tick.ask))
+
+    def test_market_time(self):
+        market_time = self.parser.parse('장시작시간', '3\t090000\t000000')
+        self.assertEqual((3, 90000, 0), (market_time.market_type, market_time.time, market_time.remained_time))
+
+    def test_fallback(self):
+        self.assertIsNone(self.parser.parse('주식체결', '090001\t+100'))  # 값 개수가 모자람
+        self.assertIsNone(self.parser.parse('주식호가잔량', '090001'))
+
+        get_fn = Mock(side_effect=lambda fid: {Fid.체결시간: '090003', Fid.현재가: '-500'}.get(fid, ''))
+        tick = self.parser.parse_by_fid('주식체결', get_fn)
+        self.assertEqual((90003, 500), (tick.time, tick.price))
+        self.assertEqual(len(StockTick.FIELD_LIST), get_fn.call_count)  # record 가 쓰는 FID 만 COM 으로 읽는다
+
+
+class TestChejanRecord(unittest.TestCase):
+    def test_get(self):
+        chejan_dic = {Fid.종목코드.value: 'A005930', Fid.보유수량.value: '5', Fid.매입단가.value: '81000', 99999: 'x'}
+        get_fn = Mock(side_effect=lambda fid: chejan_dic.get(fid, ''))
+        chejan = ChejanRecord(get_fn, ';'.join(str(fid) for fid in chejan_dic))
+
+        self.assertEqual('A005930', chejan.get(Fid.종목코드))
+        self.assertEqual(5, chejan.get_int(Fid.보유수량))
+        self.assertEqual(5, chejan.get_int(Fid.보유수량))
+        self.assertEqual(2, get_fn.call_count)  # 같은 FID 는 한 번만 읽는다
+
+        self.assertEqual(chejan_dic, chejan.get_dic())
+        self.assertEqual(4, get_fn.call_count)
+        chejan.dump(logger)
+        self.assertEqual(4, get_fn.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
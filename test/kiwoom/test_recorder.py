@@ -0,0 +1,106 @@
+import datetime
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.common import Fid
+from sns_trade_bot.kiwoom.event import KiwoomEventHandler
+from sns_trade_bot.kiwoom.fake import FakeKiwoomOcx
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.kiwoom.recorder import TickRecorder, load_ticks, get_tick_path, TICK_STRUCT, REAL_TYPE_ID_DIC, \
+    get_event_path, load_events
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestTickRecorder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = int(datetime.datetime(2021, 3, 2, 9, 0, 0).timestamp() * 1e9)
+        self.recorder = TickRecorder(self.temp_dir.name, 60.0, lambda: self.now)
+
+    def tearDown(self):
+        self.recorder.close()
+        self.temp_dir.cleanup()
+
+    def test_record(self):
+        self.recorder.record('', '장시작시간', 90000, 3, 0)
+        self.recorder.record('005930', '주식체결', 90001, -81000, 10)
+        self.recorder.record('000660', '주식체결', 90001, 130000, -5)
+        self.recorder.record('005930', '주식체결', 90002, 81100, 1)
+        self.recorder.flush()
+
+        tick_path, _ = get_tick_path(self.temp_dir.name, '20210302')
+        self.assertEqual(4 * TICK_STRUCT.size, os.path.getsize(tick_path))
+        tick_array, code_list = load_ticks(tick_path)
+        self.assertEqual(['', '005930', '000660'], code_list)
+        self.assertEqual([0, 1, 2, 1], list(tick_array['code_id']))
+        self.assertEqual([3, -81000, 130000, 81100], list(tick_array['price']))
+        self.assertEqual(REAL_TYPE_ID_DIC['장시작시간'], tick_array['real_type'][0])
+        self.assertEqual(self.now, tick_array['recv_ns'][-1])
+
+    def test_next_day(self):
+        self.recorder.record('005930', '주식체결', 153000, 81000, 10)
+        self.now += int(datetime.timedelta(days=1).total_seconds() * 1e9)
+        self.recorder.record('000660', '주식체결', 90000, 130000, 5)
+        self.recorder.flush()
+
+        tick_array, code_list = load_ticks(get_tick_path(self.temp_dir.name, '20210303')[0])
+        self.assertEqual(['000660'], code_list)  # 거래일마다 code_id 를 새로 붙인다
+        self.assertEqual(1, len(tick_array))
+
+    def test_close_on_exit(self):
+        handler = KiwoomEventHandler(DataManager(), FakeKiwoomOcx(), Mock(), Mock(), self.recorder)
+        self.recorder.record('005930', '주식체결', 153000, 81000, 10)
+        handler._exit()
+
+        self.assertIsNone(self.recorder.tick_file)
+        tick_path, _ = get_tick_path(self.temp_dir.name, '20210302')
+        self.assertEqual(TICK_STRUCT.size, os.path.getsize(tick_path))  # 버퍼에 있던 레코드도 남는다
+
+    def test_chejan_fetched_fid(self):
+        ocx = FakeKiwoomOcx()
+        ocx.set_event_handler(KiwoomEventHandler(DataManager(), ocx, Mock(), Mock(), self.recorder))
+        chejan = {Fid.종목코드.value: 'A005930', Fid.보유수량.value: '3', Fid.매입단가.value: '81000',
+                  Fid.종목명.value: '삼성전자', Fid.매도_매수구분.value: '2', Fid.당일총매도손일.value: '0'}
+        event_logger = logging.getLogger('sns_trade_bot.kiwoom.event')
+        event_logger.setLevel(logging.INFO)  # DEBUG 면 dump 하느라 모든 FID 를 읽는다
+        try:
+            ocx.fire_chejan('1', chejan)
+        finally:
+            event_logger.setLevel(logging.NOTSET)
+        self.recorder.flush()
+
+        event_list = load_events(get_event_path(get_tick_path(self.temp_dir.name, '20210302')[0]))
+        self.assertEqual(1, len(event_list))
+        self.assertEqual(';'.join(str(fid) for fid in chejan), event_list[0]['fid_list'])
+        self.assertNotIn(str(Fid.당일총매도손일.value), event_list[0]['fid_dic'])  # 읽지 않은 FID 는 기록하지 않는다
+        self.assertEqual('3', event_list[0]['fid_dic'][str(Fid.보유수량.value)])
+
+    def test_partial_record(self):
+        self.recorder.record('005930', '주식체결', 90000, 81000, 10)
+        self.recorder.close()
+        tick_path, _ = get_tick_path(self.temp_dir.name, '20210302')
+        with open(tick_path, 'ab') as f:
+            f.write(b'\x00' * 5)  # 쓰다가 죽은 레코드
+
+        self.assertEqual(1, len(load_ticks(tick_path)[0]))
+        self.recorder = TickRecorder(self.temp_dir.name, 60.0, lambda: self.now)
+        self.recorder.record('005930', '주식체결', 90001, 81100, 1)
+        self.recorder.flush()
+        tick_array, code_list = load_ticks(tick_path)
+        self.assertEqual([81000, 81100], list(tick_array['price']))
+        self.assertEqual(['005930'], code_list)
+
+
+if __name__ == '__main__':
+    unittest.main()
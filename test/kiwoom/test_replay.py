@@ -0,0 +1,76 @@
+import datetime
+import logging
+import sys
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.common import Fid
+from sns_trade_bot.kiwoom.recorder import TickRecorder, get_tick_path
+from sns_trade_bot.kiwoom.replay import ReplayEngine
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestReplayEngine(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = int(datetime.datetime(2021, 3, 2, 8, 59, 0).timestamp() * 1e9)
+        recorder = TickRecorder(self.temp_dir.name, 60.0, lambda: self.now)
+
+        def at(the_hhmmss: str):
+            t = datetime.datetime(2021, 3, 2, int(the_hhmmss[:2]), int(the_hhmmss[2:4]), int(the_hhmmss[4:]))
+            self.now = int(t.timestamp() * 1e9)
+
+        at('085900')
+        recorder.record('', '장시작시간', 85900, 3, 100)
+        at('090000')
+        recorder.record('005930', '주식체결', 90000, 81000, 10)
+        at('090001')
+        recorder.record_event('chejan', {'gubun': '1', 'fid_dic': {
+            Fid.종목코드.value: 'A005930', Fid.종목명.value: '삼성전자', Fid.보유수량.value: '5',
+            Fid.매도_매수구분.value: '2', Fid.매입단가.value: '81000'}})
+        at('151802')
+        recorder.record('005930', '주식체결', 151802, -80000, 3)
+        recorder.close()
+        self.tick_path = get_tick_path(self.temp_dir.name, '20210302')[0]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_replay(self):
+        engine = ReplayEngine(self.tick_path)
+        stock = engine.data_manager.get_stock('005930')
+        stock.cur_price = 81000
+        stock.add_buy_strategy('buy_on_opening', {'budget': 405})
+        stock.add_sell_strategy('sell_on_closing', {})
+        listener = Mock()
+        engine.data_manager.add_listener(listener)
+
+        stat = engine.run()
+
+        self.assertEqual(4, stat.event_count)
+        self.assertAlmostEqual((15 * 3600 + 18 * 60 + 2) - (8 * 3600 + 59 * 60), stat.virtual_time)
+        listener.on_buy_signal.assert_called_once_with('005930', 5)  # 08:59:00
+        listener.on_sell_signal.assert_called_once_with('005930', 5)  # 체결 이벤트로 보유수량이 생긴 뒤 15:18:00
+        self.assertFalse(stock.buy_strategy_dic['buy_on_opening'].enabled)
+        self.assertFalse(stock.sell_strategy_dic['sell_on_closing'].enabled)
+        self.assertEqual(5, stock.qty)
+        self.assertEqual(80000, stock.cur_price)
+
+    def test_timer(self):
+        engine = ReplayEngine(self.tick_path)
+        call_list = []
+        engine.handler.single_shot(1000, lambda: call_list.append(engine.ocx.get_time_str()))
+        engine.run()
+        self.assertEqual(['085901'], call_list)  # 가상 시계 기준 1초 후
+
+
+if __name__ == '__main__':
+    unittest.main()
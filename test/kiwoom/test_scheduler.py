@@ -0,0 +1,193 @@
+import logging
+import sys
+import unittest
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.common import Job, JobType, JobPriority, ErrCode
+from sns_trade_bot.kiwoom.request import TrRequester
+from sns_trade_bot.kiwoom.scheduler import TrScheduler, TokenBucket, RateLimiter
+from sns_trade_bot.model.data_manager import DataManager, DataType
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(5, 1.0, self.clock)
+        for _ in range(5):
+            self.assertEqual(0.0, bucket.get_wait_time())
+            bucket.consume()
+        self.assertAlmostEqual(0.2, bucket.get_wait_time())
+        self.clock.sleep(0.2)
+        self.assertEqual(0.0, bucket.get_wait_time())
+
+    def test_rate_limit(self):
+        scheduler = TrScheduler({JobType.QUERY: [(5, 1.0)]}, self.clock, self.clock.sleep)
+        for i in range(10):
+            scheduler.put(Job(lambda: 0, job_type=JobType.QUERY))
+        scheduler.put(Job(lambda: 0))  # JobType.NONE 은 제한 없음
+        while scheduler.qsize():
+            scheduler.run_once(block=False)
+
+        # 5개는 바로, 나머지 5개는 0.2초 간격
+        self.assertAlmostEqual(1.0, self.clock.now)
+        stats = scheduler.get_stats()
+        self.assertEqual(10, stats['QUERY']['count'])
+        self.assertEqual(1, stats['NONE']['count'])
+        self.assertEqual(0, stats['queue_depth'])
+
+    def test_back_off_on_overflow(self):
+        scheduler = TrScheduler({JobType.QUERY: [(5, 1.0)]}, self.clock, self.clock.sleep)
+        ret_list = [ErrCode.OP_ERR_SISE_OVERFLOW.value, ErrCode.OP_ERR_NONE.value]
+
+        def request():
+            return ret_list.pop(0)
+
+        scheduler.put(Job(request, job_type=JobType.QUERY))
+        scheduler.run_once(block=False)
+        self.assertEqual(1, scheduler.qsize())  # retry
+        scheduler.run_once(block=False)
+
+        self.assertEqual(0, len(ret_list))
+        self.assertGreaterEqual(self.clock.now, RateLimiter.BACK_OFF_BASE)
+        self.assertEqual(1, scheduler.get_stats()['QUERY']['overflow_count'])
+
+    def test_priority(self):
+        scheduler = TrScheduler({}, self.clock, self.clock.sleep)
+        done_list = []
+        scheduler.put(Job(done_list.append, 'msg', priority=JobPriority.NOTIFICATION))
+        scheduler.put(Job(done_list.append, 'query', job_type=JobType.QUERY))
+        scheduler.put(Job(done_list.append, 'order', job_type=JobType.ORDER))
+        while scheduler.qsize():
+            scheduler.run_once(block=False)
+
+        self.assertEqual(['order', 'query', 'msg'], done_list)
+
+    def test_aging(self):
+        scheduler = TrScheduler({}, self.clock, self.clock.sleep)
+        done_list = []
+        scheduler.put(Job(done_list.append, 'msg', priority=JobPriority.NOTIFICATION))
+        self.clock.sleep(TrScheduler.AGING_TIME * 4)
+        scheduler.put(Job(done_list.append, 'order', job_type=JobType.ORDER))
+        while scheduler.qsize():
+            scheduler.run_once(block=False)
+
+        self.assertEqual(['msg', 'order'], done_list)
+
+    def test_skip_rate_limited_lane(self):
+        scheduler = TrScheduler({JobType.ORDER: [(1, 1.0)]}, self.clock, self.clock.sleep)
+        done_list = []
+        scheduler.put(Job(done_list.append, 'order1', job_type=JobType.ORDER))
+        scheduler.put(Job(done_list.append, 'order2', job_type=JobType.ORDER))
+        scheduler.put(Job(done_list.append, 'query', job_type=JobType.QUERY))
+        while scheduler.qsize():
+            scheduler.run_once(block=False)
+
+        self.assertEqual(['order1', 'query', 'order2'], done_list)
+
+    def test_skip_rate_limited_head(self):
+        scheduler = TrScheduler({JobType.CONDITION: [(1, 1.0)]}, self.clock, self.clock.sleep)
+        done_list = []
+        scheduler.put(Job(done_list.append, 'cond1', job_type=JobType.CONDITION))
+        scheduler.put(Job(done_list.append, 'cond2', job_type=JobType.CONDITION))  # 같은 QUERY lane
+        scheduler.put(Job(done_list.append, 'query1', job_type=JobType.QUERY))
+        scheduler.put(Job(done_list.append, 'query2', job_type=JobType.QUERY))
+        while scheduler.qsize():
+            scheduler.run_once(block=False)
+
+        self.assertEqual(['cond1', 'query1', 'query2', 'cond2'], done_list)
+        self.assertAlmostEqual(1.0, self.clock.now)
+
+    def test_coalesce(self):
+        scheduler = TrScheduler({}, self.clock, self.clock.sleep)
+        ocx = Mock()
+        ocx.comm_rq_data = Mock(return_value=0)
+        ocx.comm_kw_rq_data = Mock(return_value=0)
+        requester = TrRequester(DataManager(), ocx, scheduler)
+
+        future1 = requester.account_detail()
+        future2 = requester.account_detail()
+        requester.multi_code_info(['000001', '000002'])
+        requester.multi_code_info(['000002', '000003'])
+        self.assertIs(future1, future2)
+        self.assertEqual(2, scheduler.qsize())
+
+        while scheduler.qsize():
+            scheduler.run_once(block=False)
+
+        self.assertEqual(0, future1.result(timeout=0))
+        ocx.comm_rq_data.assert_called_once()
+        ocx.comm_kw_rq_data.assert_called_once()
+        self.assertEqual('000001;000002;000003', ocx.comm_kw_rq_data.call_args[0][0])
+        self.assertEqual(2, scheduler.get_stats()['coalesced_count'])
+
+        # 실행이 끝난 요청은 다시 큐에 들어간다
+        self.assertIsNot(future1, requester.account_detail())
+
+    def test_multi_code_info_chunk(self):
+        scheduler = TrScheduler({}, self.clock, self.clock.sleep)
+        ocx = Mock()
+        ocx.comm_kw_rq_data = Mock(side_effect=[0, 0, ErrCode.OP_ERR_RQ_STRING_FAIL])
+        requester = TrRequester(DataManager(), ocx, scheduler)
+
+        future = requester.multi_code_info([f'{i:06d}' for i in range(250)])
+        while scheduler.qsize():
+            scheduler.run_once(block=False)
+
+        self.assertEqual(3, future.result(timeout=0))
+        count_list = [call[0][2] for call in ocx.comm_kw_rq_data.call_args_list]
+        scn_no_list = [call[0][5] for call in ocx.comm_kw_rq_data.call_args_list]
+        self.assertEqual([100, 100, 50], count_list)
+        self.assertEqual(3, len(set(scn_no_list)))
+
+        # 실패한 chunk 는 응답을 기다리지 않는다
+        self.assertEqual(2, requester.interest_remained_count)
+        self.assertFalse(requester.on_interest_chunk_received())
+        self.assertTrue(requester.on_interest_chunk_received())
+
+    def test_last_chunk_failed(self):
+        scheduler = TrScheduler({}, self.clock, self.clock.sleep)
+        ocx = Mock()
+        ocx.comm_kw_rq_data = Mock(side_effect=[0, ErrCode.OP_ERR_RQ_STRING_FAIL])
+        data_manager = DataManager()
+        listener = Mock()
+        data_manager.add_listener(listener)
+        requester = TrRequester(data_manager, ocx, scheduler)
+        post_list = []
+        requester.post = post_list.append
+
+        requester.multi_code_info([f'{i:06d}' for i in range(150)])
+        while ocx.comm_kw_rq_data.call_count < 1:
+            scheduler.run_once(block=False)
+        self.assertFalse(requester.on_interest_chunk_received())  # 첫 chunk 의 응답
+        while scheduler.qsize():
+            scheduler.run_once(block=False)  # 마지막 chunk 는 요청 실패
+
+        self.assertEqual(1, len(post_list))
+        listener.on_data_updated.assert_not_called()  # TR 스레드에서는 갱신하지 않는다
+        post_list.pop()()
+        listener.on_data_updated.assert_called_once_with(DataType.TABLE_BALANCE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import logging
+import sys
+import unittest
+
+from sns_trade_bot.kiwoom.screen import ScreenPool
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestScreenPool(unittest.TestCase):
+    def test_allocate(self):
+        pool = ScreenPool(['2222', '2223', '2224'], 3)
+
+        result_list = pool.allocate(['000001', '000002'])
+        self.assertEqual([('2222', ['000001', '000002'], '0')], result_list)
+
+        # 이미 등록된 종목은 제외하고, 남은 자리부터 채운다
+        result_list = pool.allocate(['000002', '000003', '000004', '000005'])
+        self.assertEqual([('2222', ['000003'], '1'), ('2223', ['000004', '000005'], '0')], result_list)
+        self.assertEqual('2223', pool.get_scn_no('000005'))
+        self.assertEqual(5, pool.get_code_count())
+
+    def test_release(self):
+        pool = ScreenPool(['2222', '2223'], 2)
+        pool.allocate(['000001', '000002', '000003'])
+
+        self.assertEqual('2223', pool.release('000003'))
+        self.assertIsNone(pool.release('000003'))
+
+        # 빈 화면은 다시 쓴다
+        self.assertEqual([('2223', ['000004'], '0')], pool.allocate(['000004']))
+
+    def test_no_free_screen(self):
+        pool = ScreenPool(['2222'], 2)
+        result_list = pool.allocate(['000001', '000002', '000003'])
+        self.assertEqual([('2222', ['000001', '000002'], '0')], result_list)
+        self.assertIsNone(pool.get_scn_no('000003'))
+
+
+if __name__ == '__main__':
+    unittest.main()
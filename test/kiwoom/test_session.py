@@ -0,0 +1,72 @@
+import heapq
+import logging
+import sys
+import unittest
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.session import SessionScheduler, to_sec
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestSessionScheduler(unittest.TestCase):
+    def setUp(self):
+        self.now = to_sec('084500')
+        self.timer_heap = []
+        self.session = SessionScheduler(self.single_shot, lambda: self.now)
+
+    def single_shot(self, the_msec, the_fn):
+        heapq.heappush(self.timer_heap, (self.now + the_msec / 1000, len(self.timer_heap), the_fn))
+
+    def run_until(self, the_time_str):
+        end = to_sec(the_time_str)
+        while self.timer_heap and self.timer_heap[0][0] <= end:
+            timer_time, _, fn = heapq.heappop(self.timer_heap)
+            self.now = max(self.now, timer_time)
+            fn()
+        self.now = end
+
+    def test_order(self):
+        call_list = []
+        self.session.add('b', '152200', lambda: call_list.append('b'))
+        self.session.add('a', '085000', lambda: call_list.append('a'))
+        self.session.add('passed', '084000', lambda: call_list.append('passed'))
+        self.assertFalse(self.session.add('a', '090000', Mock()))  # 같은 이름
+        self.session.start()
+        self.assertEqual([('085000', 'a'), ('152200', 'b')], self.session.get_pending_list())
+
+        self.run_until('153000')
+        self.assertEqual(['a', 'b'], call_list)
+        self.assertFalse(self.session.add('late', '152000', Mock()))
+
+    def test_missed_window(self):
+        fn = Mock()
+        self.session.add('sell_on_closing', '151800', fn)
+        self.session.start()
+        self.run_until('151759')
+        fn.assert_not_called()
+
+        # 15:17:59 ~ 15:18:30 사이 타이머가 오지 않았다가 (실시간 이벤트도 없음) 다음 poll() 에서 한 번만 실행
+        self.timer_heap.clear()
+        self.now = to_sec('151830')
+        self.session.poll()
+        self.session.poll()
+        fn.assert_called_once_with()
+
+    def test_sync(self):
+        fn = Mock()
+        self.session.add('open', '090000', fn)
+        self.session.start()
+        self.session.sync('085958')  # 서버 시각이 로컬 시계보다 빠름
+        self.run_until('084503')
+        fn.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import logging
+import sys
+import unittest
+from unittest.mock import Mock
+
+from sns_trade_bot.kiwoom.screen import ScreenPool
+from sns_trade_bot.kiwoom.subscription import SubscriptionManager
+from sns_trade_bot.model.data_manager import DataManager, DataType
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestSubscriptionManager(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager()
+        self.ocx = Mock()
+        self.ocx.set_real_reg = Mock(return_value=0)
+        self.subscription = SubscriptionManager(self.data_manager, self.ocx, ScreenPool(['2222', '2223'], 2))
+        self.data_manager.add_listener(self.subscription)
+
+    def test_delta(self):
+        self.data_manager.get_stock('000001')
+        self.data_manager.set_updated(DataType.TABLE_BALANCE)
+        self.ocx.set_real_reg.assert_not_called()  # start() 전에는 등록하지 않음
+
+        self.subscription.start()
+        self.ocx.set_real_reg.assert_called_once_with('2222', '000001', '9001;10;13', '0')
+
+        # 추가된 종목만 같은 화면에 추가 등록
+        self.ocx.set_real_reg.reset_mock()
+        self.data_manager.get_stock('000002')
+        self.data_manager.get_stock('000003')
+        self.data_manager.set_updated(DataType.TABLE_BALANCE)
+        self.assertEqual([(('2222', '000002', '9001;10;13', '1'),), (('2223', '000003', '9001;10;13', '0'),)],
+                         [call[:1] for call in self.ocx.set_real_reg.call_args_list])
+
+        # 청산된 종목은 등록된 화면에서 해제
+        self.ocx.set_real_reg.reset_mock()
+        self.data_manager.remove_stock('000003')
+        self.data_manager.set_updated(DataType.TABLE_BALANCE)
+        self.ocx.set_real_remove.assert_called_once_with('2223', '000003')
+        self.ocx.set_real_reg.assert_not_called()
+        self.assertEqual(['000001', '000002'], self.subscription.get_active_code_list())
+
+    def test_failed_reg(self):
+        self.ocx.set_real_reg = Mock(side_effect=[-1, 0])
+        self.data_manager.get_stock('000001')
+        self.subscription.start()
+        self.assertEqual([], self.subscription.get_active_code_list())
+
+        # 실패한 종목은 다음 갱신 때 다시 등록
+        self.data_manager.set_updated(DataType.TABLE_BALANCE)
+        self.assertEqual(['000001'], self.subscription.get_active_code_list())
+
+
+if __name__ == '__main__':
+    unittest.main()
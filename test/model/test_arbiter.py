@@ -0,0 +1,96 @@
+import logging
+import sys
+import unittest
+from sns_trade_bot.model.data_manager import DataManager, DataType, ModelListener
+from sns_trade_bot.model.order import OrderSide
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class SignalListener(ModelListener):
+    def __init__(self):
+        self.signal_list = []
+
+    def on_data_updated(self, data_type: DataType):
+        pass
+
+    def on_buy_signal(self, code: str, qty: int):
+        self.signal_list.append(('buy', code, qty))
+
+    def on_sell_signal(self, code: str, qty: int):
+        self.signal_list.append(('sell', code, qty))
+
+
+class TestSignalArbiter(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager()
+        self.listener = SignalListener()
+        self.data_manager.add_listener(self.listener)
+        self.timer_list = []
+        self.arbiter = self.data_manager.signal_arbiter
+        self.arbiter.single_shot = lambda msec, fn: self.timer_list.append(fn)
+        self.stock = self.data_manager.get_stock('000001')
+        self.stock.qty = 10
+
+    def run_timer(self):
+        timer_list = self.timer_list
+        self.timer_list = []
+        for fn in timer_list:
+            fn()
+
+    def test_merge_sell(self):
+        self.stock.on_sell_signal('sell_stop_loss', 10)
+        self.stock.on_sell_signal('sell_on_condition', 10)
+        self.stock.on_sell_signal('sell_just_sell', 10)
+        self.assertEqual(1, len(self.timer_list))  # 차례마다 한 번만 건다
+        self.assertEqual([], self.listener.signal_list)
+
+        self.run_timer()
+        self.assertEqual([('sell', '000001', 10)], self.listener.signal_list)  # 보유수량으로 자른다
+        order = self.data_manager.order_book.take_unsent('000001', OrderSide.SELL)
+        self.assertEqual('sell_stop_loss,sell_on_condition,sell_just_sell', order.strategy_name)
+        self.assertEqual(10, self.stock.remained_sell_qty)
+
+        self.stock.on_sell_signal('sell_on_closing', 10)  # 이미 모두 매도 주문 중
+        self.run_timer()
+        self.assertEqual(1, len(self.listener.signal_list))
+
+    def test_net(self):
+        other_stock = self.data_manager.get_stock('000002')
+        self.stock.on_buy_signal('buy_just_buy', 3)
+        self.stock.on_sell_signal('sell_stop_loss', 10)
+        other_stock.on_buy_signal('buy_just_buy', 5)
+        other_stock.on_sell_signal('sell_just_sell', 5)  # 보유수량 0
+        self.run_timer()
+        self.assertEqual([('sell', '000001', 7), ('buy', '000002', 5)], self.listener.signal_list)
+        self.assertEqual(2, self.arbiter.order_count)
+        self.assertEqual(4, self.arbiter.signal_count)
+
+    def test_pending_qty(self):
+        self.stock.on_buy_signal('buy_just_buy', 3)
+        self.assertEqual(3, self.stock.remained_buy_qty)  # 주문이 되기 전에도 전략이 볼 수 있다
+        self.assertEqual(0, self.stock.remained_sell_qty)
+        self.stock.on_sell_signal('sell_stop_loss', 4)
+        self.assertEqual(4, self.stock.remained_sell_qty)
+
+        self.run_timer()
+        self.assertEqual([('sell', '000001', 1)], self.listener.signal_list)
+        self.assertEqual(0, self.stock.remained_buy_qty)
+        self.assertEqual(1, self.stock.remained_sell_qty)
+
+    def test_offset(self):
+        self.stock.on_buy_signal('buy_just_buy', 10)
+        self.stock.on_sell_signal('sell_just_sell', 10)
+        self.run_timer()
+        self.assertEqual([], self.listener.signal_list)
+        self.assertEqual(0, len(self.data_manager.order_book))
+
+
+if __name__ == '__main__':
+    unittest.main()
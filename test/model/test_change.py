@@ -0,0 +1,137 @@
+import logging
+import sys
+import threading
+import unittest
+from sns_trade_bot.model.change import ChangeSet
+from sns_trade_bot.model.data_manager import DataManager, DataType, ModelListener
+from sns_trade_bot.model.stock import Stock
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class ChangeListener(ModelListener):
+    def __init__(self):
+        self.data_type_list = []
+        self.change_set_list = []
+
+    def on_data_updated(self, data_type: DataType):
+        self.data_type_list.append(data_type)
+
+    def on_buy_signal(self, code: str, qty: int):
+        pass
+
+    def on_sell_signal(self, code: str, qty: int):
+        pass
+
+    def on_data_changed(self, change_set: ChangeSet):
+        self.change_set_list.append(change_set)
+
+
+class TestChangeTracker(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager()
+        self.timer_list = []
+        self.data_manager.change_tracker.single_shot = lambda msec, fn: self.timer_list.append(fn)
+        self.listener = ChangeListener()
+        self.data_manager.add_listener(self.listener)
+
+    def flush(self):
+        self.assertEqual(1, len(self.timer_list))  # 한 차례에 타이머는 한 번만
+        self.timer_list.pop()()
+
+    def test_coalesce(self):
+        stock = self.data_manager.get_stock('000001')
+        self.flush()
+
+        stock.update_price(1000)
+        stock.update_price(1010)
+        stock.name = '테스트'
+        stock.add_sell_strategy('sell_stop_loss', {})
+        self.data_manager.set_updated(DataType.TABLE_BALANCE)
+        self.data_manager.set_updated(DataType.TABLE_BALANCE)
+        self.assertEqual([], self.listener.data_type_list)  # 아직 알리지 않는다
+        self.flush()
+
+        self.assertEqual([DataType.TABLE_BALANCE], self.listener.data_type_list)
+        change_set = self.listener.change_set_list[-1]
+        self.assertEqual({'000001': {'cur_price', 'earning_rate', 'name', 'buy_strategy_dic', 'sell_strategy_dic'}},
+                         change_set.field_dic)
+        self.assertEqual({'000001'}, change_set.get_code_set('cur_price'))
+        self.assertEqual(2, len(self.listener.change_set_list))
+        self.data_manager.change_tracker.flush()  # 바뀐 게 없으면 보내지 않는다
+        self.assertEqual(2, len(self.listener.change_set_list))
+
+    def test_added_and_removed(self):
+        self.data_manager.get_stock('000001')
+        self.data_manager.get_stock('000002').qty = 5
+        self.data_manager.remove_stock('000002')  # 같은 차례에 추가했다가 지운 종목은 알리지 않는다
+        self.flush()
+        change_set = self.listener.change_set_list[-1]
+        self.assertEqual({'000001'}, change_set.added_set)
+        self.assertEqual(set(), change_set.removed_set)
+        self.assertNotIn('000002', change_set.field_dic)
+
+        self.data_manager.remove_stock('000001')
+        self.flush()
+        self.assertEqual({'000001'}, self.listener.change_set_list[-1].removed_set)
+
+    def test_order(self):
+        stock = self.data_manager.get_stock('000001')
+        self.flush()
+        stock.on_buy_signal('buy_just_buy', 3)
+        self.data_manager.signal_arbiter.flush()
+        self.flush()
+        self.assertEqual({'000001': {'remained_qty'}}, self.listener.change_set_list[-1].field_dic)
+
+    def mark_from_thread(self, the_code: str):
+        thread = threading.Thread(target=lambda: self.data_manager.get_stock(the_code))
+        thread.start()
+        thread.join()
+
+    def test_other_thread(self):
+        tracker = self.data_manager.change_tracker
+        self.mark_from_thread('000001')  # post 가 없으면 타이머를 걸지 않고 is_scheduled 도 남기지 않는다
+        self.assertEqual([], self.timer_list)
+        self.assertFalse(tracker.is_scheduled)
+
+        post_list = []
+        tracker.post = post_list.append
+        self.mark_from_thread('000002')
+        self.assertEqual([], self.timer_list)  # 그 스레드에서는 타이머를 걸지 않는다
+        self.assertEqual(1, len(post_list))
+        post_list.pop()()  # tracker 를 만든 스레드에서 실행
+        self.flush()
+        self.assertEqual({'000001', '000002'}, self.listener.change_set_list[-1].added_set)
+        self.assertFalse(tracker.is_scheduled)
+
+    def test_single_shot_failed(self):
+        tracker = self.data_manager.change_tracker
+
+        def single_shot(msec, fn):
+            raise RuntimeError('no event loop')
+        tracker.single_shot = single_shot
+        self.data_manager.get_stock('000001')  # 종목 추가는 끝까지 한다
+        self.assertFalse(tracker.is_scheduled)  # 다음 표시 때 다시 건다
+
+        tracker.single_shot = lambda msec, fn: self.timer_list.append(fn)
+        self.data_manager.set_updated(DataType.TABLE_BALANCE)
+        self.flush()
+        self.assertEqual({'000001'}, self.listener.change_set_list[-1].added_set)
+
+    def test_add_all_temp_stock(self):
+        self.data_manager.temp_stock_list = [Stock(self.data_manager.listener_list, '000003', '임시')]
+        self.data_manager.add_all_temp_stock()
+        self.assertEqual([], self.listener.data_type_list)  # set_updated() 로 flush 때 알린다
+        self.flush()
+        self.assertEqual([DataType.TABLE_BALANCE, DataType.TABLE_TEMP_STOCK], self.listener.data_type_list)
+        self.assertEqual({'000003'}, self.listener.change_set_list[-1].added_set)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.model.journal import Journal
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.temp_dir.name, 'my_stock_list.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_data_manager(self) -> DataManager:
+        data_manager = DataManager()
+        data_manager.journal = Journal(self.snapshot_path)
+        data_manager.load()
+        return data_manager
+
+    def test_replay_after_crash(self):
+        data_manager = self.create_data_manager()
+        stock = data_manager.get_stock('000001')
+        stock.name = '테스트'
+        stock.add_sell_strategy('sell_stop_loss', {'threshold': -2.0})
+        data_manager.save()
+        stock.target_qty = 7
+        stock.add_buy_strategy('buy_just_buy', {'budget': 100})
+        data_manager.get_stock('000002')
+        data_manager.remove_stock('000002')
+        data_manager.get_stock('000003').clear_sell_strategy()
+        data_manager.journal.file.close()  # save() 없이 죽은 경우
+
+        loaded = self.create_data_manager()
+        self.assertEqual(['000001', '000003'], list(loaded.stock_dic.keys()))
+        loaded_stock = loaded.stock_dic['000001']
+        self.assertEqual('테스트', loaded_stock.name)
+        self.assertEqual(7, loaded_stock.target_qty)
+        self.assertEqual(-2.0, loaded_stock.sell_strategy_dic['sell_stop_loss'].threshold)
+        self.assertEqual(['buy_just_buy'], list(loaded_stock.buy_strategy_dic.keys()))
+        self.assertEqual(0, loaded.journal.record_count)  # 다시 적용한 journal 은 snapshot 으로 합쳤다
+        self.assertEqual(0, os.path.getsize(loaded.journal.journal_path))
+
+    def test_broken_and_old_record(self):
+        data_manager = self.create_data_manager()
+        data_manager.get_stock('000001').target_qty = 3
+        data_manager.save()
+        data_manager.get_stock('000001').target_qty = 5
+        data_manager.journal.file.close()
+        with open(data_manager.journal.journal_path, 'a', encoding='utf8') as f:
+            f.write(json.dumps({'seq': 1, 'op': 'remove', 'code': '000001'}) + '\n')  # snapshot 에 이미 들어간 번호
+            f.write('{"seq": 100, "op": "sto')  # 쓰다가 죽은 줄
+
+        loaded = self.create_data_manager()
+        self.assertEqual(5, loaded.stock_dic['000001'].target_qty)
+
+    def test_append_after_torn_line(self):
+        data_manager = self.create_data_manager()
+        data_manager.get_stock('000001').target_qty = 3
+        data_manager.save()
+        data_manager.journal.close()
+        journal_path = data_manager.journal.journal_path
+        with open(journal_path, 'a', encoding='utf8') as f:
+            f.write('{"seq": 100, "op": "sto')  # 쓰다가 죽은 줄. 다시 적용할 기록은 없다
+
+        torn_size = os.path.getsize(journal_path)
+        loaded = self.create_data_manager()
+        self.assertEqual(torn_size, os.path.getsize(journal_path))  # 읽기만 해서는 파일을 바꾸지 않는다 (리플레이)
+        loaded.get_stock('000001').target_qty = 5  # 처음 쓸 때 잘린 줄을 지운다
+        loaded.journal.close()
+
+        reloaded = self.create_data_manager()
+        self.assertEqual(5, reloaded.stock_dic['000001'].target_qty)
+
+    def test_same_name(self):
+        data_manager = self.create_data_manager()
+        data_manager.get_stock('000001').name = '테스트'
+        data_manager.save()
+        seq = data_manager.journal.seq
+
+        data_manager.get_stock('000001').name = '테스트'  # 잔고 / 관심종목 TR 응답마다 같은 이름을 다시 넣는다
+        self.assertEqual(seq, data_manager.journal.seq)
+        self.assertEqual(0, data_manager.journal.record_count)
+        self.assertEqual(0, os.path.getsize(data_manager.journal.journal_path))
+
+    def test_compact(self):
+        data_manager = self.create_data_manager()
+        data_manager.journal.COMPACT_RECORD_COUNT = 3
+        stock = data_manager.get_stock('000001')
+        stock.target_qty = 1
+        self.assertEqual(2, data_manager.journal.record_count)
+        stock.target_qty = 2  # 3 번째 기록에서 snapshot
+        self.assertEqual(0, data_manager.journal.record_count)
+        with open(self.snapshot_path, 'r', encoding='utf8') as f:
+            data_dic = json.load(f)
+        self.assertEqual(3, data_dic['journal_seq'])
+        self.assertEqual(2, data_dic['stock_list'][0]['target_qty'])
+        self.assertFalse(os.path.exists(self.snapshot_path + '.tmp'))
+
+    def test_not_loaded(self):
+        data_manager = DataManager()
+        data_manager.journal = Journal(self.snapshot_path)
+        data_manager.get_stock('000001').target_qty = 1
+        self.assertFalse(os.path.exists(data_manager.journal.journal_path))  # load() 전에는 쓰지 않는다
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import logging
+import sys
+import unittest
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.model.order import OrderSide, OrderStatus
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager()
+        self.order_book = self.data_manager.order_book
+        self.stock = self.data_manager.get_stock('000001')
+
+    def test_signal_to_filled(self):
+        self.stock.on_buy_signal('buy_just_buy', 10)
+        self.assertEqual(10, self.stock.remained_buy_qty)
+        order = self.order_book.take_unsent('000001', OrderSide.BUY)
+        self.assertEqual(OrderStatus.REQUESTED, order.status)
+        self.assertEqual('buy_just_buy', order.strategy_name)
+        self.assertIsNone(self.order_book.take_unsent('000001', OrderSide.BUY))
+
+        self.order_book.set_order_id(order.key, '0000001')
+        self.assertIs(order, self.order_book.get_by_order_id('0000001'))
+        self.order_book.on_accepted('0000001', '000001', OrderSide.BUY, 10)
+        self.assertEqual(OrderStatus.ACCEPTED, order.status)
+
+        self.order_book.on_filled('0000001', '000001', OrderSide.BUY, 10, 4, 1000)
+        self.assertEqual(OrderStatus.PARTIAL, order.status)
+        self.assertEqual(6, order.filled_qty)
+        self.assertEqual(4, self.stock.remained_buy_qty)
+        self.assertEqual([order], self.order_book.get_open_order_list())
+
+        self.order_book.on_filled('0000001', '000001', OrderSide.BUY, 10, 0, 1010)
+        self.assertEqual(OrderStatus.FILLED, order.status)
+        self.assertEqual(0, self.stock.remained_buy_qty)
+        self.assertEqual([], self.order_book.get_open_order_list())
+        self.assertEqual([order], self.order_book.get_status_list(OrderStatus.FILLED))
+
+        self.order_book.on_filled('0000001', '000001', OrderSide.BUY, 10, 2)  # 끝난 주문은 그대로
+        self.assertEqual(OrderStatus.FILLED, order.status)
+        self.assertEqual(0, self.stock.remained_buy_qty)
+
+    def test_chejan_before_tr(self):
+        """접수 체결통보가 TR 응답보다 먼저 와도 같은 주문에 붙는다"""
+        self.stock.qty = 5
+        self.stock.on_sell_signal('sell_stop_loss', 5)
+        order = self.order_book.take_unsent('000001', OrderSide.SELL)
+        self.order_book.on_accepted('0000002', '000001', OrderSide.SELL, 3)  # 보유수량만큼 줄어든 주문
+        self.assertEqual('0000002', order.order_id)
+        self.assertEqual(3, self.stock.remained_sell_qty)
+
+        self.order_book.set_order_id(order.key, '0000002')
+        self.assertEqual(OrderStatus.ACCEPTED, order.status)
+        self.assertEqual(1, len(self.order_book))
+
+    def test_rejected(self):
+        self.stock.on_buy_signal('buy_just_buy', 10)
+        order = self.order_book.take_unsent('000001', OrderSide.BUY)
+        self.order_book.set_order_id(order.key, '')
+        self.assertEqual(OrderStatus.REJECTED, order.status)
+        self.assertEqual(0, self.stock.remained_buy_qty)
+
+        # 주문번호 없이 끝난 주문에는 체결통보를 붙이지 않는다
+        external_order = self.order_book.on_accepted('0000003', '000001', OrderSide.BUY, 1)
+        self.assertIsNot(order, external_order)
+        self.assertEqual(1, self.stock.remained_buy_qty)
+
+    def test_cancel(self):
+        self.stock.on_buy_signal('buy_just_buy', 10)
+        order = self.order_book.take_unsent('000001', OrderSide.BUY)
+        self.order_book.on_accepted('0000004', '000001', OrderSide.BUY, 10)
+        self.order_book.on_filled('0000004', '000001', OrderSide.BUY, 10, 7)
+        self.order_book.cancel('0000004', '매수취소')
+        self.assertEqual(OrderStatus.CANCELLED, order.status)
+        self.assertEqual(3, order.filled_qty)
+        self.assertEqual(0, self.stock.remained_buy_qty)
+
+    def test_open_order_by_code(self):
+        other_stock = self.data_manager.get_stock('000002')
+        other_stock.qty = 2
+        self.stock.on_buy_signal('buy_just_buy', 10)
+        other_stock.on_sell_signal('sell_just_sell', 2)
+        self.assertEqual(1, len(self.order_book.get_open_order_list('000002')))
+        self.assertEqual(OrderSide.SELL, self.order_book.get_open_order_list('000002')[0].side)
+        self.assertEqual(2, len(self.order_book.get_open_order_list()))
+
+
+if __name__ == '__main__':
+    unittest.main()
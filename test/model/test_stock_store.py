@@ -0,0 +1,126 @@
+import logging
+import sys
+import unittest
+from sns_trade_bot.model.data_manager import DataManager, HoldType
+from sns_trade_bot.model.stock import Stock
+from sns_trade_bot.model.stock_store import StockStore
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestStockStore(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager()
+        self.store = self.data_manager.stock_store
+
+    def test_row_view(self):
+        stock = self.data_manager.get_stock('000001')
+        stock.cur_price = 1000
+        stock.qty = 3
+        self.assertEqual(1000, self.store.cur_price[stock.row])
+        self.assertEqual(3, self.store.qty[stock.row])
+        self.assertIs(int, type(stock.qty))  # numpy scalar 가 아니어야 json 으로 저장된다
+
+        stock.buy_price = 900
+        stock.update_price(1100)
+        self.assertEqual(1100, stock.cur_price)
+        self.assertAlmostEqual((1100 * Stock.COMMISSION_FACTOR - 900) / 900 * 100, stock.earning_rate)
+
+    def test_grow_and_reuse(self):
+        store = StockStore(2)
+        row_list = [store.add(f'{i:06d}') for i in range(5)]
+        self.assertEqual([0, 1, 2, 3, 4], row_list)
+        self.assertEqual(8, store.capacity)
+        self.assertEqual(0, store.add('000000'))  # 이미 있는 종목
+
+        store.qty[1] = 10
+        store.remove('000001')
+        self.assertEqual(1, store.add('000009'))  # 지운 행을 다시 쓴다
+        self.assertEqual(0, store.qty[1])
+
+    def test_remove_stock(self):
+        stock = self.data_manager.get_stock('000001')
+        stock.qty = 5
+        row = stock.row
+        self.data_manager.remove_stock('000001')
+        self.assertIsNot(self.store, stock.store)
+        self.assertEqual(5, stock.qty)  # 지운 뒤에도 값은 그대로 읽힌다
+
+        other_stock = self.data_manager.get_stock('000002')
+        self.assertEqual(row, other_stock.row)
+        self.assertEqual(0, other_stock.qty)
+        self.assertEqual(5, stock.qty)
+
+    def test_temp_stock(self):
+        temp_stock = Stock(self.data_manager.listener_list, '000003', 'temp', 2000)
+        self.assertIsNot(self.store, temp_stock.store)
+        self.data_manager.set_temp_stock_list([temp_stock])
+        self.data_manager.add_all_temp_stock()
+        self.assertIs(self.store, temp_stock.store)
+        self.assertEqual(2000, self.store.cur_price[temp_stock.row])
+
+    def test_code_list_and_summary(self):
+        for i, (qty, buy_price, cur_price) in enumerate([(0, 0, 500), (10, 1000, 1100), (2, 5000, 4000)]):
+            stock = self.data_manager.get_stock(f'{i:06d}')
+            stock.qty = qty
+            stock.buy_price = buy_price
+            stock.cur_price = cur_price
+        self.assertEqual(['000000'], list(self.data_manager.get_code_list(HoldType.INTEREST)))
+        self.assertEqual(['000001', '000002'], list(self.data_manager.get_code_list(HoldType.HOLDING)))
+
+        summary = self.data_manager.get_portfolio_summary()
+        self.assertEqual(2, summary.count)
+        self.assertEqual(20000, summary.buy_amount)
+        self.assertEqual(19000, summary.eval_amount)
+        self.assertEqual(-1000, summary.get_earning())
+
+    def test_hold_index(self):
+        holding = self.data_manager.get_code_list(HoldType.HOLDING)
+        interest = self.data_manager.get_code_list(HoldType.INTEREST)
+        stock = self.data_manager.get_stock('000001')
+        self.data_manager.get_stock('000002')
+        self.assertEqual({'000001', '000002'}, set(interest))
+        stock.qty = 10  # 잔고통보 / 잔고 TR
+        self.assertEqual(['000001'], list(holding))  # view 라 다시 부르지 않아도 바뀐다
+        self.assertEqual(['000002'], list(interest))
+        stock.qty = 0
+        self.assertEqual([], list(holding))
+
+        stock.qty = 3
+        self.data_manager.remove_stock('000001')
+        self.assertEqual([], list(holding))
+        temp_stock = Stock(self.data_manager.listener_list, '000003', 'temp')
+        temp_stock.qty = 5
+        self.data_manager.set_temp_stock_list([temp_stock])
+        self.data_manager.add_all_temp_stock()
+        self.assertEqual(['000003'], list(holding))
+
+    def test_target(self):
+        stock = self.data_manager.get_stock('000001')
+        self.data_manager.get_stock('000002')
+        self.assertEqual(['000001', '000002'], list(self.data_manager.get_code_list(HoldType.TARGET)))
+
+        self.data_manager.TARGET_BY_STRATEGY = True
+        target = self.data_manager.get_code_list(HoldType.TARGET)
+        self.assertEqual([], list(target))
+        stock.add_sell_strategy('sell_stop_loss', {})
+        stock.sell_strategy_dic['sell_stop_loss'].enabled = False  # 비활성 전략도 대상
+        self.assertEqual(['000001'], list(target))
+        stock.clear_sell_strategy()
+        self.assertEqual([], list(target))
+
+    def test_open_qty(self):
+        stock = self.data_manager.get_stock('000001')
+        stock.on_buy_signal('buy_just_buy', 7)
+        self.assertEqual(7, self.store.remained_buy_qty[stock.row])
+        self.assertEqual(7, stock.remained_buy_qty)
+
+
+if __name__ == '__main__':
+    unittest.main()
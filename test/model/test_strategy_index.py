@@ -0,0 +1,65 @@
+import logging
+import sys
+import unittest
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.model.stock import Stock
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestStrategyIndex(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager()
+        self.index = self.data_manager.strategy_index
+
+    def test_add_strategy(self):
+        stock = self.data_manager.get_stock('000001')
+        self.assertIsNone(self.index.get('000001'))
+
+        stock.add_sell_strategy('sell_on_closing', {})  # on_time 만 구현
+        self.assertIsNone(self.index.get('000001'))
+
+        stock.add_sell_strategy('sell_stop_loss', {})
+        stock.add_buy_strategy('buy_just_buy', {})
+        entry = self.index.get('000001')
+        self.assertIs(stock, entry.stock)
+        self.assertEqual([stock.sell_strategy_dic['sell_stop_loss']], entry.sell_list)
+        self.assertEqual([stock.buy_strategy_dic['buy_just_buy']], entry.buy_list)
+
+    def test_disable_strategy(self):
+        stock = self.data_manager.get_stock('000001')
+        stock.add_buy_strategy('buy_just_buy', {})
+        stock.cur_price = 1000
+        stock.buy_strategy_dic['buy_just_buy'].on_price_updated()  # 매수 신호 후 enabled = False
+        self.assertIsNone(self.index.get('000001'))
+
+    def test_clear_and_remove(self):
+        stock = self.data_manager.get_stock('000001')
+        stock.add_buy_strategy('buy_just_buy', {})
+        stock.add_sell_strategy('sell_stop_loss', {})
+        stock.clear_buy_strategy()
+        self.assertEqual([], self.index.get('000001').buy_list)
+        stock.clear_sell_strategy()
+        self.assertIsNone(self.index.get('000001'))
+
+        stock.add_sell_strategy('sell_stop_loss', {})
+        self.data_manager.remove_stock('000001')
+        self.assertIsNone(self.index.get('000001'))
+
+    def test_add_temp_stock(self):
+        stock = Stock(self.data_manager.listener_list, '000002', 'temp')
+        stock.add_buy_strategy('buy_just_buy', {})
+        self.assertEqual(0, len(self.index))
+        self.data_manager.set_temp_stock_list([stock])
+        self.data_manager.add_all_temp_stock()
+        self.assertIs(stock, self.index.get('000002').stock)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import logging
+import sys
+import threading
+import unittest
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sns_trade_bot.slack.notifier import Notifier, parse_retry_after
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class SlackStubHandler(BaseHTTPRequestHandler):
+    """slack webhook 대신 요청을 기록하고, server.status_list 에 있는 상태코드를 차례로 응답한다.
+    (상태코드, Retry-After) 이면 Retry-After 헤더도 보낸다
+    """
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        body = json.loads(self.rfile.read(length))
+        self.server.request_list.append((self.client_address, body))
+        status = self.server.status_list.pop(0) if self.server.status_list else 200
+        status, retry_after = status if isinstance(status, tuple) else (status, None)
+        response = b'ok'
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header('Retry-After', retry_after)
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def msg_payload(msg):
+    return {"blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": msg}}]}
+
+
+class TestNotifier(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), SlackStubHandler)
+        self.server.request_list = []
+        self.server.status_list = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/webhook'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_merge(self):
+        notifier = Notifier(self.url, 0.2)
+        for i in range(3):
+            notifier.send(msg_payload(f'msg{i}'))
+        notifier.flush()
+
+        self.assertEqual(1, len(self.server.request_list))
+        blocks = self.server.request_list[0][1]['blocks']
+        self.assertEqual(['msg0', 'msg1', 'msg2'], [block['text']['text'] for block in blocks])
+
+    def test_keep_alive(self):
+        notifier = Notifier(self.url, 0.0)
+        notifier.send(msg_payload('first'))
+        notifier.flush()
+        notifier.send(msg_payload('second'))
+        notifier.flush()
+
+        self.assertEqual(2, len(self.server.request_list))
+        self.assertEqual(self.server.request_list[0][0], self.server.request_list[1][0])  # 같은 연결 재사용
+
+    def test_retry(self):
+        self.server.status_list = [500, 429]
+        notifier = Notifier(self.url, 0.0)
+        notifier.BACK_OFF_BASE = 0.01
+        notifier.send(msg_payload('retry'))
+        notifier.flush()
+
+        self.assertEqual(3, len(self.server.request_list))
+        self.assertEqual(0, notifier.failed_count)
+        self.assertEqual(3, notifier.post_count)
+        self.assertEqual(1, notifier.sent_count)  # 성공한 것만
+
+    def test_retry_after_date(self):
+        self.server.status_list = [(429, formatdate(usegmt=True)), (503, 'soon')]  # 이미 지난 시각, 잘못된 값
+        notifier = Notifier(self.url, 0.0)
+        notifier.BACK_OFF_BASE = 0.01
+        notifier.send(msg_payload('retry'))
+        notifier.flush()
+
+        self.assertEqual(3, len(self.server.request_list))  # 버리지 않고 다시 보낸다
+        self.assertEqual(1, notifier.sent_count)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(3.0, parse_retry_after('3'))
+        self.assertEqual(30.0, parse_retry_after('Wed, 21 Oct 2015 07:28:30 GMT', 1445412480.0))
+        self.assertEqual(0.0, parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', 1445412480.0 + 60))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
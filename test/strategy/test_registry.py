@@ -0,0 +1,66 @@
+import logging
+import sys
+import unittest
+from importlib import metadata
+from unittest.mock import patch
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.strategy.base import StrategyBase
+from sns_trade_bot.strategy.registry import StrategyKind, StrategyRegistry, get_entry_point_list, \
+    strategy_registry
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class BuyDummy(StrategyBase):
+    NAME = 'buy_dummy'
+
+
+class TestStrategyRegistry(unittest.TestCase):
+    def test_name_list(self):
+        # sns_trade_bot/strategy 의 buy_*.py / sell_*.py 를 import 없이 찾는다
+        self.assertEqual(['buy_just_buy', 'buy_on_closing', 'buy_on_opening'],
+                         strategy_registry.get_name_list(StrategyKind.BUY)[:3])
+        self.assertEqual(['sell_just_sell', 'sell_on_closing', 'sell_on_condition', 'sell_stop_loss'],
+                         strategy_registry.get_name_list(StrategyKind.SELL)[:4])
+        self.assertNotIn('stop_loss_batch', strategy_registry.get_name_list(StrategyKind.SELL))
+
+    def test_entry_point_fallback(self):
+        group = StrategyRegistry.ENTRY_POINT_GROUP_DIC[StrategyKind.BUY]
+        entry_point = metadata.EntryPoint('buy_ext', 'my_package.buy_ext:BuyExt', group)
+        group_dic = {group: [entry_point]}  # python 3.8, 3.9 의 entry_points() 는 dict
+        with patch.object(metadata, 'entry_points', return_value=group_dic):
+            self.assertEqual([entry_point], get_entry_point_list(group))
+            self.assertEqual([], get_entry_point_list('unknown'))
+            self.assertIn('buy_ext', StrategyRegistry().get_name_list(StrategyKind.BUY))
+
+    def test_lazy_load(self):
+        registry = StrategyRegistry()
+        self.assertEqual({}, registry.class_dic[StrategyKind.SELL])
+        from sns_trade_bot.strategy.sell_stop_loss import SellStopLoss
+        self.assertIs(SellStopLoss, registry.get_class(StrategyKind.SELL, SellStopLoss.NAME))
+        self.assertEqual({SellStopLoss.NAME: SellStopLoss}, registry.class_dic[StrategyKind.SELL])  # 캐시
+        self.assertIsNone(registry.get_class(StrategyKind.BUY, SellStopLoss.NAME))
+        self.assertIsNone(registry.get_class(StrategyKind.SELL, 'unknown'))
+
+    def test_register(self):
+        registry = StrategyRegistry()
+        registry.register(StrategyKind.BUY, BuyDummy)
+        self.assertIs(BuyDummy, registry.get_class(StrategyKind.BUY, BuyDummy.NAME))
+        self.assertIn(BuyDummy.NAME, registry.get_name_list(StrategyKind.BUY))
+
+    def test_stock(self):
+        stock = DataManager().get_stock('000001')
+        stock.add_buy_strategy('buy_just_buy', {'budget': 100})
+        stock.add_sell_strategy('unknown', {})
+        self.assertEqual(100, stock.buy_strategy_dic['buy_just_buy'].budget)
+        self.assertEqual({}, stock.sell_strategy_dic)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import logging
+import random
+import sys
+import unittest
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.strategy.sell_stop_loss import SellStopLoss
+from sns_trade_bot.strategy.stop_loss_batch import StopLossBatch
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestStopLossBatch(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager()
+        self.batch = StopLossBatch(self.data_manager.stock_store, self.data_manager.strategy_index, 100)
+
+    def add_stock(self, the_code: str, the_buy_price: int, the_qty: int = 10):
+        stock = self.data_manager.get_stock(the_code)
+        stock.buy_price = the_buy_price
+        stock.qty = the_qty
+        stock.update_price(the_buy_price)
+        stock.add_sell_strategy(SellStopLoss.NAME, SellStopLoss.DEFAULT_PARAM)
+        return stock
+
+    def test_evaluate(self):
+        loss_stock = self.add_stock('000001', 10000)
+        top_stock = self.add_stock('000002', 10000)
+        keep_stock = self.add_stock('000003', 10000)
+        self.assertEqual([], self.batch.evaluate())
+
+        loss_stock.update_price(9600)  # -4.3% < -3.0%
+        top_stock.update_price(11000)
+        keep_stock.update_price(9800)
+        self.assertEqual([loss_stock], [strategy.stock for strategy in self.batch.evaluate()])
+        self.assertEqual(11000, top_stock.top_price)
+
+        top_stock.update_price(10800)  # 최고가 대비 -1.8% < -1.5%
+        hit_list = self.batch.evaluate()
+        self.assertEqual([loss_stock, top_stock], [strategy.stock for strategy in hit_list])
+
+        loss_stock.on_sell_signal(SellStopLoss.NAME, loss_stock.qty)  # 매도 주문 중인 종목은 제외
+        self.assertEqual([top_stock], [strategy.stock for strategy in self.batch.evaluate()])
+
+    def test_same_as_per_tick(self):
+        rand = random.Random(0)
+        stock_list = [self.add_stock(f'{i:06d}', 10000) for i in range(50)]
+        for _ in range(5):
+            for stock in stock_list:
+                stock.update_price(rand.randrange(9500, 10500, 10))
+            batch_set = {strategy.stock.code for strategy in self.batch.evaluate()}
+            tick_set = set()
+            for stock in stock_list:
+                strategy = stock.sell_strategy_dic[SellStopLoss.NAME]
+                if stock.earning_rate < SellStopLoss.TAKE_PROFIT_RATE:
+                    is_hit = stock.earning_rate < strategy.threshold
+                else:
+                    is_hit = (stock.cur_price - stock.top_price) / stock.top_price * 100 < strategy.from_top
+                if is_hit:
+                    tick_set.add(stock.code)
+            self.assertEqual(tick_set, batch_set)
+
+    def test_on_timer(self):
+        stock = self.add_stock('000001', 10000)
+        stock.update_price(9000)
+        self.batch.tick_count = 100  # 200 ms 에 100 건 -> 500 건/초
+        self.assertEqual([], self.batch.on_timer())  # 이번 구간은 체결마다 검사했다
+        self.assertTrue(self.batch.active)
+
+        self.batch.tick_count = 1
+        self.assertEqual(1, len(self.batch.on_timer()))  # batch 로 검사한 구간
+        self.assertFalse(self.batch.active)
+
+    def test_rebuild(self):
+        stock = self.add_stock('000001', 10000)
+        stock.update_price(9000)
+        self.assertEqual(1, len(self.batch.evaluate()))
+        stock.clear_sell_strategy()
+        self.assertEqual([], self.batch.evaluate())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import gzip
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sns_trade_bot.log_setup import LOG_FILE_NAME, LOG_LEVEL_ENV, create_file_handler, get_log_level, setup_logging
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestLogSetup(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root_handler_list = list(logger.handlers)
+        self.root_level = logger.level
+
+    def tearDown(self):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        for handler in self.root_handler_list:
+            logger.addHandler(handler)
+        logger.setLevel(self.root_level)
+        self.temp_dir.cleanup()
+
+    def test_json_lines(self):
+        listener = setup_logging(logging.INFO, logging.CRITICAL, self.temp_dir.name)
+        test_logger = logging.getLogger('test_log_setup')
+        test_logger.debug('skipped')
+        test_logger.info('price:%d', 1000)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            test_logger.exception('failed')
+        listener.stop()
+        listener.stop()  # atexit 에서 한 번 더 불려도 괜찮아야 함
+
+        with open(os.path.join(self.temp_dir.name, LOG_FILE_NAME), encoding='utf-8') as f:
+            line_list = [json.loads(line) for line in f]
+        self.assertEqual(['price:1000', 'failed'], [line['msg'] for line in line_list])
+        self.assertEqual('test_log_setup', line_list[0]['lg'])
+        self.assertIn('ValueError: boom', line_list[1]['exc'])
+
+    def test_log_level(self):
+        with patch.dict(os.environ, {LOG_LEVEL_ENV: ''}):
+            listener = setup_logging(None, logging.CRITICAL, self.temp_dir.name)
+            listener.stop()
+            self.assertFalse(logger.isEnabledFor(logging.DEBUG))  # 기본값은 INFO. hot path 의 debug 를 건너뛴다
+        with patch.dict(os.environ, {LOG_LEVEL_ENV: 'debug'}):
+            self.assertEqual(logging.DEBUG, get_log_level())
+        with patch.dict(os.environ, {LOG_LEVEL_ENV: 'verbose'}):
+            self.assertEqual(logging.INFO, get_log_level())
+
+    def test_rotate(self):
+        handler = create_file_handler(self.temp_dir.name)
+        handler.emit(logging.LogRecord('test', logging.INFO, __file__, 1, 'before rotate', None, None))
+        handler.doRollover()
+        handler.close()
+        gz_list = [name for name in os.listdir(self.temp_dir.name) if name.endswith('.gz')]
+        self.assertEqual(1, len(gz_list))
+        with gzip.open(os.path.join(self.temp_dir.name, gz_list[0]), 'rt', encoding='utf-8') as f:
+            self.assertEqual('before rotate', json.loads(f.readline())['msg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
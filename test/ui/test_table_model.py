@@ -0,0 +1,75 @@
+import logging
+import sys
+import unittest
+
+from PyQt5.QtWidgets import QApplication
+from sns_trade_bot.model.data_manager import DataManager
+from sns_trade_bot.ui.table_model import BalanceTableModel
+
+logger = logging.getLogger()
+logger.level = logging.DEBUG
+if not logger.hasHandlers():
+    stream_handler = logging.StreamHandler(sys.stdout)
+    f = logging.Formatter('%(asctime)s[%(levelname)8s](%(filename)20s:%(lineno)-4s %(funcName)-35s) %(message)s')
+    stream_handler.setFormatter(f)
+    logger.addHandler(stream_handler)
+
+
+class TestBalanceTableModel(unittest.TestCase):
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.data_manager = DataManager()
+        self.timer_list = []
+        self.data_manager.change_tracker.single_shot = lambda msec, fn: self.timer_list.append(fn)
+        self.model = BalanceTableModel(self.data_manager)
+        self.data_manager.add_listener(self)
+        self.changed_list = []
+        self.model.dataChanged.connect(
+            lambda top_left, bottom_right: self.changed_list.append((top_left.row(), top_left.column(),
+                                                                     bottom_right.row(), bottom_right.column())))
+
+    # ModelListener
+    def on_data_updated(self, data_type):
+        pass
+
+    def on_data_changed(self, change_set):
+        self.model.apply(change_set)
+
+    def flush(self):
+        while self.timer_list:
+            self.timer_list.pop()()
+
+    def test_row(self):
+        for i in range(3):
+            self.data_manager.get_stock(f'00000{i}')
+        self.flush()
+        self.assertEqual(3, self.model.rowCount())
+        self.data_manager.remove_stock('000001')
+        self.flush()
+        self.assertEqual(['000000', '000002'], self.model.code_list)
+        self.assertEqual(1, self.model.get_row('000002'))
+
+    def test_changed_cell(self):
+        stock_list = [self.data_manager.get_stock(f'00000{i}') for i in range(4)]
+        self.flush()
+        self.model.flush_price()
+        stock_list[1].name = '테스트'
+        stock_list[3].qty = 5
+        self.flush()
+        self.assertEqual([(1, 1, 1, 1)], [changed for changed in self.changed_list if changed[0] == 1])
+        self.assertIn((3, 4, 3, 4), self.changed_list)  # 보유수량 컬럼만
+
+        self.changed_list.clear()
+        for stock in stock_list[:2] + stock_list[3:]:
+            stock.update_price(1000)
+            stock.update_price(1010)
+        self.flush()
+        self.assertEqual([], self.changed_list)  # 가격은 모았다가
+        self.assertTrue(self.model.price_timer.isActive())
+        self.model.flush_price()
+        self.assertEqual([(0, 2, 1, 6), (3, 2, 3, 6)], self.changed_list)  # 연속된 행끼리 한 번
+        self.assertEqual(1010, self.model.index(3, 2).data())
+
+
+if __name__ == '__main__':
+    unittest.main()